@@ -1,4 +0,0 @@
-from sincere_singularities.data.savestates import SaveStates
-
-# Load SaveStates Database
-save_states = SaveStates()
@@ -1,15 +1,122 @@
+import argparse
 import os
+from pathlib import Path
 
 import dotenv
 
+from sincere_singularities.app import app
 from sincere_singularities.bot import bot
+from sincere_singularities.data.indexes import explain_hot_queries, format_query_plans
+from sincere_singularities.scoring.backend_report import compare_backends, format_reports
+from sincere_singularities.scoring.model import MODEL_NAME, minilm_model
+from sincere_singularities.scoring.model_store import MODEL_DIR, prepare_model
+from sincere_singularities.startup import (
+    STARTUP_IMPORT_BUDGET_MS,
+    STARTUP_READY_BUDGET_MS,
+    format_startup_report,
+    measure_startup,
+    over_budget,
+    write_importtime_log,
+)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments. `command` is None when the bot should be run.
+    """
+    parser = argparse.ArgumentParser(prog="sincere_singularities", description="Restaurant Rush: Kitchen Chaos")
+    subparsers = parser.add_subparsers(dest="command")
+
+    prepare_model_parser = subparsers.add_parser(
+        "prepare-model",
+        help="Download (or copy) the MiniLM model into the local model store.",
+    )
+    prepare_model_parser.add_argument("--model-name", default=MODEL_NAME, help="The name of the model.")
+    prepare_model_parser.add_argument(
+        "--model-dir", type=Path, default=MODEL_DIR, help="The directory of the model store."
+    )
+    prepare_model_parser.add_argument(
+        "--source", type=Path, help="Copy the model from this directory instead of downloading it."
+    )
+    prepare_model_parser.add_argument("--sha256", help="The checksum the model must have.")
+
+    compare_backends_parser = subparsers.add_parser(
+        "compare-backends",
+        help="Compare the accuracy and latency of the embedding backends on the game's strings.",
+    )
+    compare_backends_parser.add_argument("--reference", default="torch", help="The reference backend.")
+    compare_backends_parser.add_argument("--repeats", type=int, default=3, help="Repeats of the latency measurement.")
+
+    subparsers.add_parser(
+        "check-indexes",
+        help="Explain the hot database queries and fail if any of them scans a whole collection.",
+    )
+
+    startup_benchmark_parser = subparsers.add_parser(
+        "startup-benchmark",
+        help="Measure how long importing the bot and starting its services take, and fail if it's over budget.",
+    )
+    startup_benchmark_parser.add_argument("--repeats", type=int, default=3, help="The amount of runs.")
+    startup_benchmark_parser.add_argument(
+        "--import-budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS, help="How long importing may take."
+    )
+    startup_benchmark_parser.add_argument(
+        "--ready-budget-ms",
+        type=float,
+        default=STARTUP_READY_BUDGET_MS,
+        help="How long importing and starting the services may take.",
+    )
+    startup_benchmark_parser.add_argument(
+        "--importtime-log", type=Path, help="Write the `-X importtime` output of the last run to this file."
+    )
+
+    return parser.parse_args()
 
 
 def main() -> None:
-    """Load .env, and run the bot."""
+    """Load .env, and run the bot (or a maintenance command)."""
     dotenv.load_dotenv()
+    arguments = parse_arguments()
+
+    if arguments.command == "prepare-model":
+        model_path = prepare_model(arguments.model_name, arguments.model_dir, arguments.source, arguments.sha256)
+        print(f"The {arguments.model_name} model is stored at {model_path}")
+        return
+
+    if arguments.command == "compare-backends":
+        if not minilm_model.wait_until_ready():
+            raise SystemExit(f"Couldn't load the model: {minilm_model.error}")
+        assert minilm_model.model
+        print(format_reports(compare_backends(minilm_model.model, arguments.reference, arguments.repeats)))
+        return
+
+    if arguments.command == "check-indexes":
+        plans = explain_hot_queries(app.storage_backend)
+        print(format_query_plans(plans))
+        if collection_scans := [plan.query.name for plan in plans if plan.collection_scan]:
+            raise SystemExit(f"These queries scan a whole collection: {', '.join(collection_scans)}")
+        return
+
+    if arguments.command == "startup-benchmark":
+        report = measure_startup(arguments.repeats)
+        print(format_startup_report(report))
+        if arguments.importtime_log:
+            write_importtime_log(report, arguments.importtime_log)
+        if exceeded := over_budget(report, arguments.import_budget_ms, arguments.ready_budget_ms):
+            raise SystemExit(f"Startup is over budget: {', '.join(exceeded)}")
+        return
+
     token = os.getenv("BOT_TOKEN")
-    bot.run(token)
+    # Creating the services: the model is loaded, the database's health is checked and the game states are flushed in
+    # the background
+    app.start()
+    try:
+        bot.run(token)
+    finally:
+        app.close()
 
 
 if __name__ == "__main__":
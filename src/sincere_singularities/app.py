@@ -0,0 +1,88 @@
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from sincere_singularities.data.db import DbClient, db_executor, default_storage_backend
+from sincere_singularities.data.leaderboard import AsyncLeaderboard, Leaderboard
+from sincere_singularities.data.savestates import AsyncSaveStates, SaveStates
+from sincere_singularities.scoring.executor import scoring_executor
+from sincere_singularities.scoring.model import minilm_model
+from sincere_singularities.utils import load_restaurants
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+    from sincere_singularities.data.backends import StorageBackend
+
+
+class App:
+    """
+    The services of the bot, each created when it's first used.
+
+    Importing the package doesn't create any of them, so it neither touches the database nor parses the data files.
+    `start` creates them and starts their background work (in `main`, before the bot connects to Discord), and
+    `close` stops it.
+    """
+
+    @cached_property
+    def storage_backend(self) -> "StorageBackend":
+        """StorageBackend: Where the collections are stored, selected by DB_BACKEND."""
+        return default_storage_backend()
+
+    @cached_property
+    def save_states(self) -> SaveStates:
+        """SaveStates: The game states of the players."""
+        return SaveStates(client=DbClient(self.storage_backend))
+
+    @cached_property
+    def async_save_states(self) -> AsyncSaveStates:
+        """AsyncSaveStates: The game states, for the game modules (database round trips don't block the event loop)."""
+        return AsyncSaveStates(self.save_states)
+
+    @cached_property
+    def leaderboard(self) -> Leaderboard:
+        """Leaderboard: The ranking of the players, kept up to date from the coin changes of the save states."""
+        return Leaderboard(self.save_states)
+
+    @cached_property
+    def async_leaderboard(self) -> AsyncLeaderboard:
+        """AsyncLeaderboard: The ranking of the players, for the game modules."""
+        return AsyncLeaderboard(self.leaderboard)
+
+    @cached_property
+    def faker(self) -> "Faker":
+        """Faker: Generates the names and addresses of the customers."""
+        # Imported here, importing Faker loads every locale's providers
+        from faker import Faker
+
+        return Faker()
+
+    def start(self) -> None:
+        """
+        Create the services and start their background work.
+
+        The model is loaded in the background (orders are scored with a lexical fallback until it's ready), the health
+        of the database is checked in the background, and the cached game states are flushed in the background.
+        """
+        load_restaurants()
+        self.storage_backend.start_heartbeat()
+        self.save_states.start_flushing()
+        # The leaderboard listens to the coin changes from the start
+        _ = self.async_leaderboard
+        _ = self.faker
+        # Last, importing torch in the background competes with the other services for the GIL
+        minilm_model.start_loading()
+
+    def close(self) -> None:
+        """Stop the background work, then write the remaining changes of the game states and close the database."""
+        scoring_executor.shutdown()
+        # Waiting for the pending database calls, then writing the remaining dirty game states
+        db_executor.shutdown()
+        # Only the services that were created have to be closed
+        if "save_states" in self.__dict__:
+            self.save_states.close()
+        if "storage_backend" in self.__dict__:
+            self.storage_backend.close()
+
+
+# The application container
+app = App()
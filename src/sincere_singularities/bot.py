@@ -5,10 +5,12 @@ import disnake
 from disnake import ApplicationCommandInteraction, Embed, Intents, Member, MessageInteraction, TextChannel
 from disnake.ext import commands
 
-from sincere_singularities import save_states
+from sincere_singularities.app import app
 from sincere_singularities.modules.conditions import ConditionManager
+from sincere_singularities.modules.leaderboard import create_leaderboard_embed
 from sincere_singularities.modules.order_queue import OrderQueue
 from sincere_singularities.modules.restaurants_view import Restaurants
+from sincere_singularities.modules.session import PlayerSession
 
 # Load Disnake Related Objects
 intents = Intents.default()
@@ -76,6 +78,18 @@ async def clear_threads(interaction: ApplicationCommandInteraction) -> None:
         await thread.delete()
 
 
+@bot.slash_command(name="leaderboard", description="Shows the players with the most coins.")
+async def leaderboard(interaction: ApplicationCommandInteraction) -> None:
+    """
+    Show the players with the most coins, and the rank of the user.
+
+    Args:
+        interaction (ApplicationCommandInteraction): The Disnake application command interaction.
+    """
+    embed = await create_leaderboard_embed(interaction.user.id)
+    await interaction.response.send_message(embed=embed)
+
+
 class IntroductionView(disnake.ui.View):
     """View for the introduction to the game."""
 
@@ -101,7 +115,7 @@ async def start_game(interaction: ApplicationCommandInteraction) -> None:
         return
 
     try:
-        save_states.load_game_state(interaction.user.id)
+        await app.async_save_states.load_game_state(interaction.user.id)
     except ValueError:
         embed = Embed(
             title="Introduction",
@@ -146,18 +160,21 @@ async def start_the_game(interaction: ApplicationCommandInteraction | MessageInt
         interaction (ApplicationCommandInteraction | MessageInteraction): The interaction that led to the start of
             the game.
     """
+    # Loading the user's state once for the whole game
+    session = await PlayerSession.new(interaction.user.id)
     # Start order queue
-    order_queue = await OrderQueue.new(interaction)
+    order_queue = await OrderQueue.new(interaction, session)
     if not order_queue:
         # Return if we can't start the game (the user is already warned)
         return
     # Load Restaurants
     condition_manager = ConditionManager(order_queue)
-    restaurants = Restaurants(interaction, order_queue, condition_manager)
+    restaurants = Restaurants(interaction, order_queue, condition_manager, session)
     condition_manager.restaurants = restaurants
 
     # Sending start menu
-    await interaction.response.send_message(embed=restaurants.embeds[0], view=restaurants.view, ephemeral=True)
+    view = restaurants.create_view()
+    await interaction.response.send_message(embed=view.embeds[0], view=view, ephemeral=True)
 
     # Spawning orders
     task = asyncio.create_task(order_queue.start_orders())
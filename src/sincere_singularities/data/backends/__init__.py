@@ -0,0 +1,78 @@
+import os
+from collections.abc import Callable
+
+from dotenv import load_dotenv
+
+from sincere_singularities.data.backends.base import (
+    BulkResult,
+    DeleteOperation,
+    FindOptions,
+    StorageBackend,
+    UpdateOperation,
+    UpdateResult,
+    WriteOperation,
+)
+
+load_dotenv()
+
+DB_BACKEND = os.getenv("DB_BACKEND") or "mongodb"
+
+
+def _create_mongo_backend() -> StorageBackend:
+    # Imported when it's used, the connection manager imports this package (through the indexes)
+    from sincere_singularities.data.backends.mongo import MongoBackend
+
+    return MongoBackend()
+
+
+def _create_sqlite_backend() -> StorageBackend:
+    from sincere_singularities.data.backends.sqlite import SqliteBackend
+
+    return SqliteBackend()
+
+
+def _create_memory_backend() -> StorageBackend:
+    from sincere_singularities.data.backends.memory import MemoryBackend
+
+    return MemoryBackend()
+
+
+STORAGE_BACKENDS: dict[str, Callable[[], StorageBackend]] = {
+    "mongodb": _create_mongo_backend,
+    "sqlite": _create_sqlite_backend,
+    "memory": _create_memory_backend,
+}
+
+
+def create_storage_backend(name: str) -> StorageBackend:
+    """
+    Create a storage backend by its name.
+
+    Args:
+        name (str): The name of the backend (see STORAGE_BACKENDS).
+
+    Raises:
+        ValueError: Raised when there's no backend with that name.
+
+    Returns:
+        StorageBackend: The backend.
+    """
+    try:
+        backend_factory = STORAGE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Storage backend named {name!r} doesn't exist") from None
+    return backend_factory()
+
+
+__all__ = [
+    "DB_BACKEND",
+    "STORAGE_BACKENDS",
+    "BulkResult",
+    "DeleteOperation",
+    "FindOptions",
+    "StorageBackend",
+    "UpdateOperation",
+    "UpdateResult",
+    "WriteOperation",
+    "create_storage_backend",
+]
@@ -0,0 +1,220 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+
+@dataclass
+class BulkResult:
+    """Summary of a bulk write"""
+
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    upserted: int = 0
+    deleted: int = 0
+
+    def __add__(self, other: "BulkResult") -> "BulkResult":
+        return BulkResult(
+            inserted=self.inserted + other.inserted,
+            matched=self.matched + other.matched,
+            modified=self.modified + other.modified,
+            upserted=self.upserted + other.upserted,
+            deleted=self.deleted + other.deleted,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class UpdateOperation:
+    """Apply update operators (e.g. $set or $inc) to the first element matching the filter, in a bulk write."""
+
+    query: dict[str, Any]
+    update: dict[str, Any]
+    upsert: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class DeleteOperation:
+    """Delete the first element matching the filter, in a bulk write."""
+
+    query: dict[str, Any]
+
+
+WriteOperation = UpdateOperation | DeleteOperation
+
+
+@dataclass(frozen=True, slots=True)
+class UpdateResult:
+    """The result of updating one element."""
+
+    matched: bool
+    modified: bool = False
+    upserted: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class FindOptions:
+    """How the found elements are shaped, ordered and limited."""
+
+    projection: dict[str, Any] | None = None
+    sort: list[tuple[str, int]] = field(default_factory=list)
+    # 0 doesn't limit the amount of elements
+    limit: int = 0
+    # The amount of elements fetched per round trip, 0 leaves it to the backend
+    batch_size: int = 0
+
+
+class StorageBackend(Protocol):
+    """
+    Where the collections of the game are stored.
+
+    Filters, update operators and projections use MongoDB's syntax. The local backends only understand the subset the
+    game uses: equality and comparisons in filters, and $set, $setOnInsert, $inc and $addToSet in updates.
+    """
+
+    name: str
+
+    @property
+    def healthy(self) -> bool | None:
+        """Whether the storage was reachable the last time it was checked (None if it wasn't checked yet)."""
+        ...
+
+    def find_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Find the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            projection (dict[str, Any] | None, optional): The fields to return. Defaults to None, every field.
+
+        Returns:
+            dict[str, Any] | None: The element, None if no element matches.
+        """
+        ...
+
+    def find(
+        self, collection: str, query: dict[str, Any], options: FindOptions | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream the elements matching a filter, fetching them in batches while they're iterated.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order, limit and batch size. Defaults to None.
+
+        Returns:
+            Iterator[dict[str, Any]]: The elements.
+        """
+        ...
+
+    def count(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Count the elements matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of matching elements.
+        """
+        ...
+
+    def insert_one(self, collection: str, document: dict[str, Any]) -> None:
+        """
+        Insert an element.
+
+        Args:
+            collection (str): Collection name.
+            document (dict[str, Any]): The element.
+        """
+        ...
+
+    def update_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> UpdateResult:
+        """
+        Apply update operators to the first element matching a filter, atomically.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            update (dict[str, Any]): The update operators.
+            upsert (bool, optional): Whether to insert an element when none matches. Defaults to False.
+
+        Returns:
+            UpdateResult: Whether an element matched, changed or was inserted.
+        """
+        ...
+
+    def delete_one(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        ...
+
+    def delete_many(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete every element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        ...
+
+    def bulk_write(self, collection: str, operations: Iterable[WriteOperation]) -> BulkResult:
+        """
+        Apply write operations in a single batch (one round trip, or one transaction). The order isn't guaranteed.
+
+        Args:
+            collection (str): Collection name.
+            operations (Iterable[WriteOperation]): The operations.
+
+        Returns:
+            BulkResult: The summary.
+        """
+        ...
+
+    def explain(self, collection: str, query: dict[str, Any], options: FindOptions | None = None) -> list[str]:
+        """
+        The stages of the plan answering a query (e.g. "IXSCAN" or "COLLSCAN").
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order and limit. Defaults to None.
+
+        Returns:
+            list[str]: The stages.
+        """
+        ...
+
+    def start_heartbeat(self) -> None:
+        """Start checking whether the storage is reachable in the background."""
+        ...
+
+    def close(self) -> None:
+        """Close the storage's connections."""
+        ...
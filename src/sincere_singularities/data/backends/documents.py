@@ -0,0 +1,178 @@
+import copy
+from collections.abc import Callable, Iterable
+from typing import Any
+
+# The comparison operators the local backends understand in filters
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+}
+
+_MISSING = object()
+
+
+def get_path(document: dict[str, Any], path: str, default: Any = None) -> Any:  # noqa: ANN401
+    """
+    Get the value of a dotted path (e.g. "state.coins") of a document.
+
+    Args:
+        document (dict[str, Any]): The document.
+        path (str): The dotted path.
+        default (Any, optional): Returned when the path doesn't exist. Defaults to None.
+
+    Returns:
+        Any: The value.
+    """
+    value: Any = document
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+def _parent(document: dict[str, Any], path: str) -> tuple[dict[str, Any], str]:
+    *parents, key = path.split(".")
+    for parent in parents:
+        document = document.setdefault(parent, {})
+    return document, key
+
+
+def matches(document: dict[str, Any], query: dict[str, Any]) -> bool:
+    """
+    Whether a document matches a MongoDB filter. Only equality and the comparison operators are supported.
+
+    Args:
+        document (dict[str, Any]): The document.
+        query (dict[str, Any]): The filter (e.g. {"player_id": 1} or {"state.coins": {"$gt": 10}}).
+
+    Raises:
+        ValueError: Raised when the filter uses an unsupported operator.
+
+    Returns:
+        bool: Whether the document matches.
+    """
+    for path, condition in query.items():
+        value = get_path(document, path)
+        if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+            for operator, operand in condition.items():
+                if operator not in _COMPARISONS:
+                    raise ValueError(f"Unsupported filter operator {operator!r}")
+                if not _COMPARISONS[operator](value, operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def equality_fields(query: dict[str, Any]) -> dict[str, Any]:
+    """
+    The fields a filter compares for equality, which are set on documents inserted by an upsert.
+
+    Args:
+        query (dict[str, Any]): The filter.
+
+    Returns:
+        dict[str, Any]: The compared fields and their values.
+    """
+    return {
+        path: condition
+        for path, condition in query.items()
+        if not (isinstance(condition, dict) and any(key.startswith("$") for key in condition))
+    }
+
+
+def apply_update(document: dict[str, Any], update: dict[str, Any], *, inserting: bool = False) -> bool:
+    """
+    Apply MongoDB update operators ($set, $setOnInsert, $inc, $addToSet) to a document, in place.
+
+    Args:
+        document (dict[str, Any]): The document.
+        update (dict[str, Any]): The update operators.
+        inserting (bool, optional): Whether the document is being inserted by an upsert, which applies $setOnInsert.
+            Defaults to False.
+
+    Raises:
+        ValueError: Raised when the update uses an unsupported operator.
+
+    Returns:
+        bool: Whether the document changed.
+    """
+    before = copy.deepcopy(document)
+    for operator, fields in update.items():
+        for path, operand in fields.items():
+            parent, key = _parent(document, path)
+            if operator == "$set" or (operator == "$setOnInsert" and inserting):
+                parent[key] = copy.deepcopy(operand)
+            elif operator == "$setOnInsert":
+                continue
+            elif operator == "$inc":
+                parent[key] = parent.get(key, 0) + operand
+            elif operator == "$addToSet":
+                values = operand["$each"] if isinstance(operand, dict) and "$each" in operand else [operand]
+                items = parent.setdefault(key, [])
+                items.extend(value for value in values if value not in items)
+            else:
+                raise ValueError(f"Unsupported update operator {operator!r}")
+    return document != before
+
+
+def project(document: dict[str, Any], projection: dict[str, Any] | None) -> dict[str, Any]:
+    """
+    Pick the fields of a document like an inclusion projection, dotted paths (e.g. "state.coins") included.
+
+    Args:
+        document (dict[str, Any]): The document.
+        projection (dict[str, Any] | None): The projection (e.g. {"state.coins": 1, "_id": 0}). None keeps every field.
+
+    Returns:
+        dict[str, Any]: The picked fields that the document has, nested like in the document.
+    """
+    if projection is None:
+        return copy.deepcopy(document)
+    paths = [path for path, include in projection.items() if include and path != "_id"]
+    projected = pick_paths(document, paths)
+    if projection.get("_id", 1) and "_id" in document:
+        projected["_id"] = document["_id"]
+    return projected
+
+
+def pick_paths(document: dict[str, Any], paths: Iterable[str]) -> dict[str, Any]:
+    """
+    Copy the dotted paths of a document that exist, nested like in the document.
+
+    Args:
+        document (dict[str, Any]): The document.
+        paths (Iterable[str]): The dotted paths.
+
+    Returns:
+        dict[str, Any]: The picked fields.
+    """
+    picked: dict[str, Any] = {}
+    for path in paths:
+        value = get_path(document, path, _MISSING)
+        if value is _MISSING:
+            continue
+        parent, key = _parent(picked, path)
+        parent[key] = copy.deepcopy(value)
+    return picked
+
+
+def sort_key(document: dict[str, Any], path: str) -> tuple[bool, Any]:
+    """
+    The key sorting documents by a path, missing values first (like MongoDB sorts them in ascending order).
+
+    Args:
+        document (dict[str, Any]): The document.
+        path (str): The dotted path.
+
+    Returns:
+        tuple[bool, Any]: The sort key.
+    """
+    value = get_path(document, path)
+    return (value is not None, value)
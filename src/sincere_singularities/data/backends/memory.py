@@ -0,0 +1,323 @@
+import copy
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from dotenv import load_dotenv
+
+from sincere_singularities.data.backends.base import (
+    BulkResult,
+    FindOptions,
+    UpdateOperation,
+    UpdateResult,
+    WriteOperation,
+)
+from sincere_singularities.data.backends.documents import (
+    apply_update,
+    equality_fields,
+    get_path,
+    matches,
+    project,
+    sort_key,
+)
+from sincere_singularities.data.indexes import INDEXES
+
+load_dotenv()
+
+# The simulated round trip of every operation of the memory backend, in milliseconds
+MEMORY_BACKEND_LATENCY_MS = float(os.getenv("MEMORY_BACKEND_LATENCY_MS") or 0)
+
+
+def _unique_fields(collection: str) -> list[str]:
+    # The fields of the single field unique indexes, which are looked up in a dict instead of scanning
+    return [
+        next(iter(index.document["key"]))
+        for index in INDEXES.get(collection, [])
+        if index.document.get("unique") and len(index.document["key"]) == 1
+    ]
+
+
+class MemoryBackend:
+    """
+    The collections are stored in memory, for benchmarks and simulations that shouldn't depend on a database server.
+
+    Every operation (a bulk write being one) sleeps for `latency` seconds first, modelling the round trip to a
+    production database deterministically. Nothing is persisted. Like on the server, the fields of the unique indexes
+    of `INDEXES` are looked up without scanning the collection, and duplicates of them are rejected.
+    """
+
+    name = "memory"
+
+    def __init__(self, latency: float = MEMORY_BACKEND_LATENCY_MS / 1000) -> None:
+        """
+        Initialize the backend, with empty collections.
+
+        Args:
+            latency (float, optional): The simulated round trip of every operation, in seconds. Defaults to
+                MEMORY_BACKEND_LATENCY_MS.
+        """
+        self.latency = latency
+        self._collections: defaultdict[str, dict[int, dict[str, Any]]] = defaultdict(dict)
+        # collection -> unique field -> value -> id
+        self._unique_keys: defaultdict[str, dict[str, dict[Any, int]]] = defaultdict(dict)
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    @property
+    def healthy(self) -> bool | None:
+        """Always True, memory is always reachable."""
+        return True
+
+    def _round_trip(self) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _keys(self, collection: str) -> dict[str, dict[Any, int]]:
+        keys = self._unique_keys[collection]
+        if not keys:
+            keys.update((field, {}) for field in _unique_fields(collection))
+        return keys
+
+    def _store(self, collection: str, document: dict[str, Any], previous: dict[str, Any] | None = None) -> None:
+        keys = self._keys(collection)
+        for field, ids in keys.items():
+            value = get_path(document, field)
+            if ids.get(value, document["_id"]) != document["_id"]:
+                raise ValueError(f"Duplicate key {field}={value!r} in {collection}")
+        for field, ids in keys.items():
+            if previous is not None:
+                ids.pop(get_path(previous, field), None)
+            ids[get_path(document, field)] = document["_id"]
+        self._collections[collection][document["_id"]] = document
+
+    def _find(self, collection: str, query: dict[str, Any], options: FindOptions) -> Iterator[dict[str, Any]]:
+        documents: Iterable[dict[str, Any]] = self._collections[collection].values()
+        if (field := self._unique_lookup(collection, query)) is not None:
+            document_id = self._keys(collection)[field].get(query[field])
+            documents = [] if document_id is None else [self._collections[collection][document_id]]
+
+        found: Iterator[dict[str, Any]] = (document for document in documents if matches(document, query))
+        if options.sort:
+            found = iter(self._sorted(found, options.sort))
+        return itertools.islice(found, options.limit or None)
+
+    def _unique_lookup(self, collection: str, query: dict[str, Any]) -> str | None:
+        # The unique field the filter compares for equality, if that's all it does
+        if len(query) == 1 and (field := next(iter(query))) in self._keys(collection) and equality_fields(query):
+            return field
+        return None
+
+    @staticmethod
+    def _sorted(documents: Iterable[dict[str, Any]], sort: list[tuple[str, int]]) -> list[dict[str, Any]]:
+        ordered = list(documents)
+        # Sorting is stable, so sorting by the last key first orders by every key
+        for path, direction in reversed(sort):
+            ordered.sort(key=functools.partial(sort_key, path=path), reverse=direction == -1)
+        return ordered
+
+    def find_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Find the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            projection (dict[str, Any] | None, optional): The fields to return. Defaults to None, every field.
+
+        Returns:
+            dict[str, Any] | None: The element, None if no element matches.
+        """
+        self._round_trip()
+        with self._lock:
+            document = next(self._find(collection, query, FindOptions(limit=1)), None)
+            return None if document is None else project(document, projection)
+
+    def find(
+        self, collection: str, query: dict[str, Any], options: FindOptions | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream the elements matching a filter, copying them while they're iterated.
+
+        Every batch of `batch_size` elements costs a round trip, like the batches of a server's cursor.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order, limit and batch size. Defaults to None.
+
+        Yields:
+            dict[str, Any]: The elements.
+        """
+        options = options or FindOptions()
+        with self._lock:
+            found = list(self._find(collection, query, options))
+        batch_size = options.batch_size or len(found) or 1
+        for start in range(0, max(len(found), 1), batch_size):
+            self._round_trip()
+            for document in found[start : start + batch_size]:
+                yield project(document, options.projection)
+
+    def count(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Count the elements matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of matching elements.
+        """
+        self._round_trip()
+        with self._lock:
+            return sum(1 for _ in self._find(collection, query, FindOptions()))
+
+    def insert_one(self, collection: str, document: dict[str, Any]) -> None:
+        """
+        Insert an element.
+
+        Args:
+            collection (str): Collection name.
+            document (dict[str, Any]): The element.
+        """
+        self._round_trip()
+        with self._lock:
+            self._store(collection, {**copy.deepcopy(document), "_id": next(self._ids)})
+
+    def _update_one(self, collection: str, operation: UpdateOperation) -> UpdateResult:
+        document = next(self._find(collection, operation.query, FindOptions(limit=1)), None)
+        if document is not None:
+            updated = copy.deepcopy(document)
+            if not apply_update(updated, operation.update):
+                return UpdateResult(matched=True)
+            self._store(collection, updated, document)
+            return UpdateResult(matched=True, modified=True)
+        if not operation.upsert:
+            return UpdateResult(matched=False)
+
+        document = {"_id": next(self._ids)}
+        apply_update(document, {"$set": equality_fields(operation.query)})
+        apply_update(document, operation.update, inserting=True)
+        self._store(collection, document)
+        return UpdateResult(matched=False, upserted=True)
+
+    def update_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> UpdateResult:
+        """
+        Apply update operators to the first element matching a filter, atomically.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            update (dict[str, Any]): The update operators.
+            upsert (bool, optional): Whether to insert an element when none matches. Defaults to False.
+
+        Returns:
+            UpdateResult: Whether an element matched, changed or was inserted.
+        """
+        self._round_trip()
+        with self._lock:
+            return self._update_one(collection, UpdateOperation(query, update, upsert=upsert))
+
+    def _delete(self, collection: str, query: dict[str, Any], limit: int) -> int:
+        documents = list(self._find(collection, query, FindOptions(limit=limit)))
+        keys = self._keys(collection)
+        for document in documents:
+            for field, ids in keys.items():
+                ids.pop(get_path(document, field), None)
+            del self._collections[collection][document["_id"]]
+        return len(documents)
+
+    def delete_one(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        self._round_trip()
+        with self._lock:
+            return self._delete(collection, query, 1)
+
+    def delete_many(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete every element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        self._round_trip()
+        with self._lock:
+            return self._delete(collection, query, 0)
+
+    def bulk_write(self, collection: str, operations: Iterable[WriteOperation]) -> BulkResult:
+        """
+        Apply write operations, costing a single round trip.
+
+        Args:
+            collection (str): Collection name.
+            operations (Iterable[WriteOperation]): The operations.
+
+        Returns:
+            BulkResult: The summary.
+        """
+        self._round_trip()
+        result = BulkResult()
+        with self._lock:
+            for operation in operations:
+                if isinstance(operation, UpdateOperation):
+                    updated = self._update_one(collection, operation)
+                    result += BulkResult(
+                        matched=int(updated.matched),
+                        modified=int(updated.modified),
+                        upserted=int(updated.upserted),
+                    )
+                else:
+                    result += BulkResult(deleted=self._delete(collection, operation.query, 1))
+        return result
+
+    def explain(self, collection: str, query: dict[str, Any], options: FindOptions | None = None) -> list[str]:
+        """
+        The stages of a query: a unique key lookup ("IXSCAN"), or a scan ("COLLSCAN") that may be sorted ("SORT").
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order and limit. Defaults to None.
+
+        Returns:
+            list[str]: The stages.
+        """
+        options = options or FindOptions()
+        stages = ["COLLSCAN"] if self._unique_lookup(collection, query) is None else ["IXSCAN"]
+        return (["SORT"] if options.sort else []) + stages
+
+    def start_heartbeat(self) -> None:
+        """Do nothing, memory is always reachable."""
+
+    def close(self) -> None:
+        """Do nothing, the collections are kept until the backend is garbage collected."""
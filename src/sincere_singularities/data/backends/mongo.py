@@ -0,0 +1,208 @@
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from pymongo import DeleteOne, UpdateOne
+from pymongo.database import Database
+from pymongo.results import BulkWriteResult
+
+from sincere_singularities.data.backends.base import (
+    BulkResult,
+    FindOptions,
+    UpdateOperation,
+    UpdateResult,
+    WriteOperation,
+)
+from sincere_singularities.data.connection import ConnectionManager, connection_manager
+from sincere_singularities.data.indexes import plan_stages
+
+
+def _bulk_result(result: BulkWriteResult) -> BulkResult:
+    return BulkResult(
+        inserted=result.inserted_count,
+        matched=result.matched_count,
+        modified=result.modified_count,
+        upserted=result.upserted_count,
+        deleted=result.deleted_count,
+    )
+
+
+class MongoBackend:
+    """The collections are stored on a MongoDB server, through the (lazily connecting) connection manager."""
+
+    name = "mongodb"
+
+    def __init__(self, connection: ConnectionManager = connection_manager) -> None:
+        self.connection = connection
+
+    @property
+    def db(self) -> Database[dict[str, Any]]:
+        """Database: The database"""
+        return self.connection.db
+
+    @property
+    def healthy(self) -> bool | None:
+        """The result of the latest heartbeat (None if the database wasn't pinged yet)."""
+        return self.connection.health.healthy
+
+    def find_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Find the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            projection (dict[str, Any] | None, optional): The fields to return. Defaults to None, every field.
+
+        Returns:
+            dict[str, Any] | None: The element, None if no element matches.
+        """
+        return self.db[collection].find_one(query, projection)
+
+    def find(
+        self, collection: str, query: dict[str, Any], options: FindOptions | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream the elements matching a filter, through a cursor fetching `batch_size` elements per round trip.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order, limit and batch size. Defaults to None.
+
+        Returns:
+            Iterator[dict[str, Any]]: The elements.
+        """
+        options = options or FindOptions()
+        cursor = self.db[collection].find(query, options.projection, batch_size=options.batch_size)
+        if options.sort:
+            cursor = cursor.sort(options.sort)
+        return cursor.limit(options.limit)
+
+    def count(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Count the elements matching a filter on the server (e.g. counting the entries of an index range).
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of matching elements.
+        """
+        return self.db[collection].count_documents(query)
+
+    def insert_one(self, collection: str, document: dict[str, Any]) -> None:
+        """
+        Insert an element.
+
+        Args:
+            collection (str): Collection name.
+            document (dict[str, Any]): The element.
+        """
+        self.db[collection].insert_one(document)
+
+    def update_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> UpdateResult:
+        """
+        Apply update operators to the first element matching a filter, atomically on the server.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            update (dict[str, Any]): The update operators.
+            upsert (bool, optional): Whether to insert an element when none matches. Defaults to False.
+
+        Returns:
+            UpdateResult: Whether an element matched, changed or was inserted.
+        """
+        result = self.db[collection].update_one(query, update, upsert=upsert)
+        return UpdateResult(
+            matched=bool(result.matched_count),
+            modified=bool(result.modified_count),
+            upserted=result.upserted_id is not None,
+        )
+
+    def delete_one(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        return self.db[collection].delete_one(query).deleted_count
+
+    def delete_many(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete every element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        return self.db[collection].delete_many(query).deleted_count
+
+    def bulk_write(self, collection: str, operations: Iterable[WriteOperation]) -> BulkResult:
+        """
+        Send write operations in one unordered bulk write, a single round trip.
+
+        Args:
+            collection (str): Collection name.
+            operations (Iterable[WriteOperation]): The operations.
+
+        Returns:
+            BulkResult: The summary.
+        """
+        requests: list[UpdateOne | DeleteOne] = [
+            UpdateOne(operation.query, operation.update, upsert=operation.upsert)
+            if isinstance(operation, UpdateOperation)
+            else DeleteOne(operation.query)
+            for operation in operations
+        ]
+        if not requests:
+            return BulkResult()
+        return _bulk_result(self.db[collection].bulk_write(requests, ordered=False))
+
+    def explain(self, collection: str, query: dict[str, Any], options: FindOptions | None = None) -> list[str]:
+        """
+        The stages of the server's winning plan of a query (e.g. "IXSCAN" or "COLLSCAN").
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order and limit. Defaults to None.
+
+        Returns:
+            list[str]: The stages.
+        """
+        options = options or FindOptions()
+        cursor = self.db[collection].find(query, options.projection)
+        if options.sort:
+            cursor = cursor.sort(options.sort)
+        explanation = cursor.limit(options.limit).explain()
+        return plan_stages(explanation["queryPlanner"]["winningPlan"])
+
+    def start_heartbeat(self) -> None:
+        """Start pinging the database in the background."""
+        self.connection.start_heartbeat()
+
+    def close(self) -> None:
+        """Stop the heartbeat and close the client's connections."""
+        self.connection.close()
@@ -0,0 +1,434 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any
+
+from dotenv import load_dotenv
+
+from sincere_singularities.data.backends.base import (
+    BulkResult,
+    FindOptions,
+    UpdateOperation,
+    UpdateResult,
+    WriteOperation,
+)
+from sincere_singularities.data.backends.documents import apply_update, equality_fields, matches, project
+from sincere_singularities.data.indexes import INDEXES
+
+load_dotenv()
+
+SQLITE_PATH = os.getenv("SQLITE_PATH") or "bot_db.sqlite3"
+
+# Collection names and field paths are put into the SQL, so they're restricted to identifiers
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_PATH = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*")
+# The filter operators that are answered by SQL (and so by the indexes), besides $in
+_SQL_COMPARISONS = {"$eq": "=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+_SCALARS = (str, int, float, bool)
+# The rows fetched at once while streaming, when the batch size is left to the backend
+_DEFAULT_BATCH_SIZE = 100
+
+
+def _encode(value: object) -> object:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} can't be stored")
+
+
+def _decode(value: dict[str, Any]) -> object:
+    if value.keys() == {"$date"}:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def _dumps(document: dict[str, Any]) -> str:
+    return json.dumps({key: value for key, value in document.items() if key != "_id"}, default=_encode)
+
+
+def _loads(row: tuple[int, str]) -> dict[str, Any]:
+    document: dict[str, Any] = json.loads(row[1], object_hook=_decode)
+    document["_id"] = row[0]
+    return document
+
+
+def _field(path: str) -> str:
+    if not _PATH.fullmatch(path):
+        raise ValueError(f"Invalid field path {path!r}")
+    return f"json_extract(document, '$.{path}')"
+
+
+def _table(collection: str) -> str:
+    if not _IDENTIFIER.fullmatch(collection):
+        raise ValueError(f"Invalid collection name {collection!r}")
+    return f'"{collection}"'
+
+
+def _in_sql(operator: str, operand: object) -> bool:
+    # Whether a comparison of a filter can be answered by SQL
+    if operator == "$in":
+        return isinstance(operand, list | tuple) and all(isinstance(value, _SCALARS) for value in operand)
+    return operator in _SQL_COMPARISONS and isinstance(operand, _SCALARS)
+
+
+def _plan_stage(detail: str) -> str:
+    # E.g. "SEARCH states USING INDEX states_player_id (<expr>=?)" or "SCAN states"
+    if "USING" in detail and "INDEX" in detail:
+        return "IXSCAN"
+    if detail.startswith("SCAN"):
+        return "COLLSCAN"
+    if "TEMP B-TREE" in detail:
+        return "SORT"
+    return detail
+
+
+class SqliteBackend:
+    """
+    The collections are stored in a local SQLite database file, so the game runs without a MongoDB server.
+
+    Every collection is a table of JSON documents. The indexes of `INDEXES` are created as indexes on the JSON fields,
+    so looking a player up and the leaderboard don't scan the table. The database runs in WAL mode, and bulk writes are
+    applied in a single transaction. A duplicate of a unique key rolls the whole bulk write back.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH) -> None:
+        """
+        Initialize the backend, without opening the database.
+
+        Args:
+            path (str, optional): The database file (or ":memory:"). Defaults to SQLITE_PATH.
+        """
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._tables: set[str] = set()
+        self._healthy: bool | None = None
+        # The connection is shared by the database I/O threads, one statement at a time
+        self._lock = threading.RLock()
+
+    @property
+    def healthy(self) -> bool | None:
+        """Whether the database could be opened (None if it wasn't opened yet)."""
+        return self._healthy
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """sqlite3.Connection: The connection, opened on first use."""
+        with self._lock:
+            if self._connection is None:
+                try:
+                    # Autocommit, the transactions are explicit
+                    connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    # Durable enough in WAL mode, without syncing every commit
+                    connection.execute("PRAGMA synchronous=NORMAL")
+                except sqlite3.Error:
+                    self._healthy = False
+                    raise
+                self._connection = connection
+                self._healthy = True
+            return self._connection
+
+    def _collection(self, collection: str) -> str:
+        table = _table(collection)
+        # Locked, so the tables aren't created inside another thread's transaction
+        with self._lock:
+            if collection in self._tables:
+                return table
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, document TEXT)")
+            for index in INDEXES.get(collection, []):
+                document = index.document
+                keys = ", ".join(
+                    f"{_field(path)}{' DESC' if direction == -1 else ''}"
+                    for path, direction in document["key"].items()
+                )
+                unique = "UNIQUE " if document.get("unique") else ""
+                self.connection.execute(
+                    f'CREATE {unique}INDEX IF NOT EXISTS "{collection}_{document["name"]}" ON {table} ({keys})'
+                )
+            # Created inside a transaction, the table is gone if it rolls back, so it's only remembered once committed
+            if not self.connection.in_transaction:
+                self._tables.add(collection)
+        return table
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _where(query: dict[str, Any]) -> tuple[str, list[Any], dict[str, Any]]:
+        # Returns the WHERE clause, its parameters and the part of the filter that has to be checked in Python
+        conditions = []
+        parameters: list[Any] = []
+        remaining = {}
+        for path, condition in query.items():
+            comparisons = condition if isinstance(condition, dict) else {"$eq": condition}
+            if all(_in_sql(operator, operand) for operator, operand in comparisons.items()):
+                for operator, operand in comparisons.items():
+                    if operator == "$in":
+                        conditions.append(f"{_field(path)} IN ({', '.join('?' * len(operand))})")
+                        parameters.extend(operand)
+                    else:
+                        conditions.append(f"{_field(path)} {_SQL_COMPARISONS[operator]} ?")
+                        parameters.append(operand)
+            else:
+                remaining[path] = condition
+        return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), parameters, remaining
+
+    def _select(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        options: FindOptions,
+    ) -> tuple[str, list[Any], dict[str, Any]]:
+        # Returns the query, its parameters and the part of the filter that has to be checked in Python
+        where, parameters, remaining = self._where(query)
+        sql = f"SELECT id, document FROM {self._collection(collection)}{where}"  # noqa: S608
+        if options.sort:
+            sql += " ORDER BY " + ", ".join(
+                f"{_field(path)}{' DESC' if direction == -1 else ''}" for path, direction in options.sort
+            )
+        if options.limit and not remaining:
+            sql += f" LIMIT {int(options.limit)}"
+        return sql, parameters, remaining
+
+    def _find(self, collection: str, query: dict[str, Any], options: FindOptions) -> Iterator[dict[str, Any]]:
+        sql, parameters, remaining = self._select(collection, query, options)
+        found = 0
+        for row in self.connection.execute(sql, parameters):
+            document = _loads(row)
+            if remaining and not matches(document, remaining):
+                continue
+            yield document
+            found += 1
+            if found == options.limit:
+                return
+
+    def find_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Find the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            projection (dict[str, Any] | None, optional): The fields to return. Defaults to None, every field.
+
+        Returns:
+            dict[str, Any] | None: The element, None if no element matches.
+        """
+        with self._lock:
+            document = next(self._find(collection, query, FindOptions(limit=1)), None)
+        return None if document is None else project(document, projection)
+
+    def find(
+        self, collection: str, query: dict[str, Any], options: FindOptions | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream the elements matching a filter, fetching `batch_size` rows at a time.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order, limit and batch size. Defaults to None.
+
+        Yields:
+            dict[str, Any]: The elements.
+        """
+        options = options or FindOptions()
+        with self._lock:
+            sql, parameters, remaining = self._select(collection, query, options)
+            cursor = self.connection.execute(sql, parameters)
+        found = 0
+        # The connection is only locked while fetching a batch, not while the caller handles it
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(options.batch_size or _DEFAULT_BATCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                document = _loads(row)
+                if remaining and not matches(document, remaining):
+                    continue
+                yield project(document, options.projection)
+                found += 1
+                if found == options.limit:
+                    return
+
+    def count(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Count the elements matching a filter, in SQL (and so on an index) when the whole filter can be.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of matching elements.
+        """
+        where, parameters, remaining = self._where(query)
+        if remaining:
+            return sum(1 for _ in self.find(collection, query))
+        with self._lock:
+            sql = f"SELECT COUNT(*) FROM {self._collection(collection)}{where}"  # noqa: S608
+            return int(self.connection.execute(sql, parameters).fetchone()[0])
+
+    def insert_one(self, collection: str, document: dict[str, Any]) -> None:
+        """
+        Insert an element.
+
+        Args:
+            collection (str): Collection name.
+            document (dict[str, Any]): The element.
+        """
+        with self._transaction() as connection:
+            table = self._collection(collection)
+            connection.execute(f"INSERT INTO {table} (document) VALUES (?)", (_dumps(document),))  # noqa: S608
+
+    def _update_one(
+        self,
+        connection: sqlite3.Connection,
+        collection: str,
+        operation: UpdateOperation,
+    ) -> UpdateResult:
+        table = self._collection(collection)
+        document = next(self._find(collection, operation.query, FindOptions(limit=1)), None)
+        if document is not None:
+            if not apply_update(document, operation.update):
+                return UpdateResult(matched=True)
+            connection.execute(f"UPDATE {table} SET document = ? WHERE id = ?", (_dumps(document), document["_id"]))  # noqa: S608
+            return UpdateResult(matched=True, modified=True)
+        if not operation.upsert:
+            return UpdateResult(matched=False)
+
+        document = {}
+        apply_update(document, {"$set": equality_fields(operation.query)})
+        apply_update(document, operation.update, inserting=True)
+        connection.execute(f"INSERT INTO {table} (document) VALUES (?)", (_dumps(document),))  # noqa: S608
+        return UpdateResult(matched=False, upserted=True)
+
+    def update_one(
+        self,
+        collection: str,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> UpdateResult:
+        """
+        Apply update operators to the first element matching a filter, in a transaction.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            update (dict[str, Any]): The update operators.
+            upsert (bool, optional): Whether to insert an element when none matches. Defaults to False.
+
+        Returns:
+            UpdateResult: Whether an element matched, changed or was inserted.
+        """
+        with self._transaction() as connection:
+            return self._update_one(connection, collection, UpdateOperation(query, update, upsert=upsert))
+
+    def _delete(self, connection: sqlite3.Connection, collection: str, query: dict[str, Any], limit: int) -> int:
+        ids = [(document["_id"],) for document in self._find(collection, query, FindOptions(limit=limit))]
+        connection.executemany(f"DELETE FROM {self._collection(collection)} WHERE id = ?", ids)  # noqa: S608
+        return len(ids)
+
+    def delete_one(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete the first element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        with self._transaction() as connection:
+            return self._delete(connection, collection, query, 1)
+
+    def delete_many(self, collection: str, query: dict[str, Any]) -> int:
+        """
+        Delete every element matching a filter.
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+
+        Returns:
+            int: The amount of deleted elements.
+        """
+        with self._transaction() as connection:
+            return self._delete(connection, collection, query, 0)
+
+    def bulk_write(self, collection: str, operations: Iterable[WriteOperation]) -> BulkResult:
+        """
+        Apply write operations in a single transaction.
+
+        Args:
+            collection (str): Collection name.
+            operations (Iterable[WriteOperation]): The operations.
+
+        Returns:
+            BulkResult: The summary.
+        """
+        result = BulkResult()
+        with self._transaction() as connection:
+            for operation in operations:
+                if isinstance(operation, UpdateOperation):
+                    updated = self._update_one(connection, collection, operation)
+                    result += BulkResult(
+                        matched=int(updated.matched),
+                        modified=int(updated.modified),
+                        upserted=int(updated.upserted),
+                    )
+                else:
+                    result += BulkResult(deleted=self._delete(connection, collection, operation.query, 1))
+        return result
+
+    def explain(self, collection: str, query: dict[str, Any], options: FindOptions | None = None) -> list[str]:
+        """
+        The stages of SQLite's plan of a sql (e.g. "IXSCAN" or "COLLSCAN").
+
+        Args:
+            collection (str): Collection name.
+            query (dict[str, Any]): The filter.
+            options (FindOptions | None, optional): The projection, order and limit. Defaults to None.
+
+        Returns:
+            list[str]: The stages.
+        """
+        with self._lock:
+            sql, parameters, _ = self._select(collection, query, options or FindOptions())
+            rows = self.connection.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+        return [_plan_stage(row[-1]) for row in rows]
+
+    def start_heartbeat(self) -> None:
+        """Do nothing, the database file is always reachable."""
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+                self._tables.clear()
@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, errors
+from pymongo.database import Database
+
+from sincere_singularities.data.indexes import ensure_indexes
+
+load_dotenv()
+
+DB_HOST = os.getenv("DB_HOST")
+DB_PORT = os.getenv("DB_PORT")
+DB_NAME = os.getenv("DB_NAME") or "bot_db"
+DB_URI = f"mongodb://{DB_HOST}:{DB_PORT}"
+DB_MAX_POOL_SIZE = int(os.getenv("DB_MAX_POOL_SIZE") or 20)
+DB_MIN_POOL_SIZE = int(os.getenv("DB_MIN_POOL_SIZE") or 0)
+# How long an operation waits for a reachable server before failing
+DB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("DB_SERVER_SELECTION_TIMEOUT_MS") or 5000)
+DB_CONNECT_TIMEOUT_MS = int(os.getenv("DB_CONNECT_TIMEOUT_MS") or 5000)
+# Seconds between the pings of the background heartbeat
+DB_HEARTBEAT_INTERVAL = float(os.getenv("DB_HEARTBEAT_INTERVAL") or 10.0)
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionHealth:
+    """The result of the latest ping of the database."""
+
+    # None until the database was pinged for the first time
+    healthy: bool | None = None
+    checked_at: datetime | None = None
+    latency: float | None = None
+    error: str | None = None
+
+
+class ConnectionManager:
+    """
+    The connection to the database, which is only opened when it's first used.
+
+    Creating the manager (and importing the game) doesn't touch the network. The pool is sized explicitly, operations
+    fail after the server selection timeout instead of hanging, and a background heartbeat keeps the health status up
+    to date.
+    """
+
+    def __init__(
+        self,
+        uri: str = DB_URI,
+        db_name: str = DB_NAME,
+        *,
+        max_pool_size: int = DB_MAX_POOL_SIZE,
+        min_pool_size: int = DB_MIN_POOL_SIZE,
+        server_selection_timeout_ms: int = DB_SERVER_SELECTION_TIMEOUT_MS,
+        connect_timeout_ms: int = DB_CONNECT_TIMEOUT_MS,
+        heartbeat_interval: float = DB_HEARTBEAT_INTERVAL,
+    ) -> None:
+        """
+        Initialize the connection manager, without connecting.
+
+        Args:
+            uri (str, optional): The MongoDB URI. Defaults to DB_URI.
+            db_name (str, optional): The name of the database. Defaults to DB_NAME.
+            max_pool_size (int, optional): The maximum amount of pooled connections. Defaults to DB_MAX_POOL_SIZE.
+            min_pool_size (int, optional): The minimum amount of pooled connections. Defaults to DB_MIN_POOL_SIZE.
+            server_selection_timeout_ms (int, optional): How long an operation waits for a reachable server.
+                Defaults to DB_SERVER_SELECTION_TIMEOUT_MS.
+            connect_timeout_ms (int, optional): How long opening a connection may take. Defaults to
+                DB_CONNECT_TIMEOUT_MS.
+            heartbeat_interval (float, optional): Seconds between the heartbeat's pings. Defaults to
+                DB_HEARTBEAT_INTERVAL.
+        """
+        self.uri = uri
+        self.db_name = db_name
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self.connect_timeout_ms = connect_timeout_ms
+        self.heartbeat_interval = heartbeat_interval
+
+        self._client: MongoClient[dict[str, Any]] | None = None
+        self._indexes_ensured = False
+        self._health = ConnectionHealth()
+        self._lock = threading.Lock()
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread: threading.Thread | None = None
+
+    @property
+    def client(self) -> MongoClient[dict[str, Any]]:
+        """MongoClient: The client, created on first use. Creating it doesn't block, it connects in the background."""
+        with self._lock:
+            if self._client is None:
+                self._client = MongoClient(
+                    self.uri,
+                    maxPoolSize=self.max_pool_size,
+                    minPoolSize=self.min_pool_size,
+                    serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+                    connectTimeoutMS=self.connect_timeout_ms,
+                    connect=False,
+                )
+            return self._client
+
+    @property
+    def db(self) -> Database[dict[str, Any]]:
+        """Database: The database. The indexes are created the first time it's used."""
+        db = self.client[self.db_name]
+        if not self._indexes_ensured:
+            ensure_indexes(db)
+            self._indexes_ensured = True
+        return db
+
+    @property
+    def health(self) -> ConnectionHealth:
+        """ConnectionHealth: The result of the latest ping."""
+        return self._health
+
+    def ping(self) -> ConnectionHealth:
+        """
+        Ping the database and update the health status.
+
+        Returns:
+            ConnectionHealth: The new health status.
+        """
+        start = time.perf_counter()
+        try:
+            self.client.admin.command("ping")
+        except errors.PyMongoError as err:
+            self._health = ConnectionHealth(healthy=False, checked_at=datetime.now(UTC), error=str(err))
+        else:
+            self._health = ConnectionHealth(
+                healthy=True,
+                checked_at=datetime.now(UTC),
+                latency=time.perf_counter() - start,
+            )
+        return self._health
+
+    def start_heartbeat(self) -> None:
+        """Start pinging the database in the background every `heartbeat_interval` seconds."""
+        if self._heartbeat_thread:
+            return
+        self._stop_heartbeat.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="db-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat(self) -> None:
+        while True:
+            was_healthy = self._health.healthy
+            health = self.ping()
+            if health.healthy != was_healthy:
+                status = "reachable" if health.healthy else f"unreachable: {health.error}"
+                print(f"The database is {status}")
+            if self._stop_heartbeat.wait(self.heartbeat_interval):
+                return
+
+    def close(self) -> None:
+        """Stop the heartbeat and close the client's connections."""
+        self._stop_heartbeat.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+                self._indexes_ensured = False
+
+
+connection_manager = ConnectionManager()
@@ -1,19 +1,130 @@
+import asyncio
+import functools
+import itertools
 import os
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, ParamSpec, TypeVar
 
 from dotenv import load_dotenv
-from pymongo import MongoClient, errors
+
+from sincere_singularities.data.backends import (
+    DB_BACKEND,
+    BulkResult,
+    DeleteOperation,
+    FindOptions,
+    StorageBackend,
+    UpdateOperation,
+    WriteOperation,
+    create_storage_backend,
+)
 
 load_dotenv()
 
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME") or "bot_db"
-DB_URI = f"mongodb://{DB_HOST}:{DB_PORT}"
+# The amount of threads running blocking database calls for the async clients
+DB_WORKERS = int(os.getenv("DB_WORKERS") or 4)
+# The maximum amount of operations sent to the server in one bulk write
+DB_BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE") or 1000)
+# The amount of elements fetched per round trip while streaming a collection
+DB_CURSOR_BATCH_SIZE = int(os.getenv("DB_CURSOR_BATCH_SIZE") or 500)
 utc_timezone = UTC
 
+P = ParamSpec("P")
+R = TypeVar("R")
+T = TypeVar("T")
+
+# The storage backends have no async API, so the async clients run the blocking calls on this dedicated I/O executor,
+# keeping them off the event loop (and away from the default executor)
+db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+
+
+async def run_in_db_executor(
+    function: Callable[P, R],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> R:
+    """Run a blocking database call on the database I/O executor
+
+    Args:
+        function (Callable[P, R]): The blocking function
+        *args (P.args): The function's arguments
+        **kwargs (P.kwargs): The function's keyword arguments
+
+    Returns:
+        R: The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(function, *args, **kwargs))
+
+
+async def iterate_in_db_executor(iterator: Iterator[T], batch_size: int) -> AsyncIterator[T]:
+    """Iterate a blocking iterator (e.g. a cursor) on the database I/O executor, a batch at a time
+
+    Args:
+        iterator (Iterator[T]): The blocking iterator
+        batch_size (int): The amount of items taken from the iterator per executor call
+
+    Yields:
+        T: The items
+    """
+    while True:
+        batch: list[T] = await run_in_db_executor(next_chunk, iterator, batch_size)
+        if not batch:
+            return
+        for item in batch:
+            yield item
+
+
+def next_chunk(iterator: Iterator[T], size: int) -> list[T]:
+    """Take the next chunk of an iterator
+
+    Args:
+        iterator (Iterator[T]): The iterator
+        size (int): The maximum size of the chunk
+
+    Returns:
+        list[T]: The chunk, empty when the iterator is exhausted
+    """
+    return list(itertools.islice(iterator, size))
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split an iterable into chunks
+
+    Args:
+        iterable (Iterable[T]): The iterable
+        size (int): The maximum size of a chunk
+
+    Returns:
+        Iterator[list[T]]: The chunks
+    """
+    iterator = iter(iterable)
+    while chunk := next_chunk(iterator, size):
+        yield chunk
+
+
+@functools.cache
+def default_storage_backend() -> StorageBackend:
+    """Get the storage backend selected by DB_BACKEND, it's created the first time
+
+    Returns:
+        StorageBackend: The storage backend
+    """
+    return create_storage_backend(DB_BACKEND)
+
+
+def with_updated_at(update: dict[str, Any]) -> dict[str, Any]:
+    """Add setting the updated_at timestamp to an update document
+
+    Args:
+        update (dict[str, Any]): The update operators
+
+    Returns:
+        dict[str, Any]: The update operators, also setting updated_at
+    """
+    return {**update, "$set": {**update.get("$set", {}), "updated_at": datetime.now(utc_timezone)}}
+
 
 class ConnectError(Exception):
     """Connection error"""
@@ -29,18 +140,14 @@ class ConnectError(Exception):
 class DbClient:
     """db client"""
 
-    def __init__(self) -> None:
-        self.connected = False
-        try:
-            self.client = MongoClient(DB_URI)
-            self.connected = True
-            self.client.server_info()
-            self.db = self.client[DB_NAME]
-            self.restaurants = self.db.restaurants
-        except errors.ConnectionFailure as err:
-            self.connected = False
-            print(f"Error: {err}")
-            raise err from None
+    def __init__(self, backend: StorageBackend | None = None) -> None:
+        # Doesn't connect, the connection is opened when it's first used
+        self.backend = backend or default_storage_backend()
+
+    @property
+    def connected(self) -> bool:
+        """bool: False if the storage couldn't be reached the last time it was checked, otherwise True"""
+        return self.backend.healthy is not False
 
     def is_connected(self) -> bool:
         """Check if connected
@@ -65,24 +172,41 @@ class DbClient:
 
         name = data["name"]
         # Check if it already exists
-        if not self.db[collection].find_one({"name": name}):
+        if not self.backend.find_one(collection, {"name": name}):
             current_time = datetime.now(utc_timezone)
             data["created_at"] = current_time
             data["updated_at"] = current_time
-            self.db[collection].insert_one(data)
+            self.backend.insert_one(collection, data)
 
-    def add_many(self, collection: str, datas: Iterable[Any]) -> None:
-        """Add many elements
+    def add_many(
+        self,
+        collection: str,
+        datas: Iterable[Any],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Add many elements, in unordered bulk writes
+
+        Like `add_element`, elements whose name already exists aren't added. That's done by upserting, instead of
+        checking for every element first.
 
         Args:
             collection (str): Collection name
             datas (Iterable[Any]): list of Datas to add
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
 
         Returns:
-            None
+            BulkResult: The summary, `upserted` is the amount of added elements
         """
-        for data in datas:
-            self.add_element(collection, data)
+        current_time = datetime.now(utc_timezone)
+        operations = (
+            UpdateOperation(
+                {"name": data["name"]},
+                {"$setOnInsert": {**data, "created_at": current_time, "updated_at": current_time}},
+                upsert=True,
+            )
+            for data in datas
+        )
+        return self.bulk_write(collection, operations, chunk_size)
 
     def delete_all(self, collection: str) -> None:
         """Delete all elements
@@ -95,25 +219,25 @@ class DbClient:
         """
         if not self.connected:
             raise ConnectError("Not connected to the database")
-        self.db[collection].delete_many({})
+        self.backend.delete_many(collection, {})
 
-    def delete_many(self, collection: str, datas: Iterable[Any]) -> None:
-        """Delete many elements
+    def delete_many(
+        self,
+        collection: str,
+        datas: Iterable[Any],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Delete many elements, in unordered bulk writes
 
         Args:
             collection (str): Collection name
             datas (Iterable[Any]): list of datas to delete
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
 
         Returns:
-            None
+            BulkResult: The summary, `deleted` is less than the amount of datas if some weren't found
         """
-        if not self.connected:
-            raise ConnectError("Not connected to the database")
-
-        for data in datas:
-            if not self.show_one(collection, data):
-                raise ValueError("Element not found")
-            self.db[collection].delete_one(data)
+        return self.bulk_write(collection, (DeleteOperation(data) for data in datas), chunk_size)
 
     def delete_one(self, collection: str, data: dict[str, Any]) -> None:
         """Delete one element
@@ -129,29 +253,62 @@ class DbClient:
             raise ConnectError("Not connected to the database")
         if not self.show_one(collection, data):
             raise ValueError("Element not found")
-        self.db[collection].delete_one(data)
+        self.backend.delete_one(collection, data)
 
-    def show_all(self, collection: str) -> list[dict[str, Any]]:
+    def show_all(self, collection: str, projection: dict[str, Any] | None = None) -> list[dict[str, Any]]:
         """Show all elements
 
+        This loads the whole collection into memory, large collections should be streamed with `iter_all`.
+
         Args:
             collection (str): Collection name
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"name": 1}). Defaults to None,
+                returning every field.
 
         Returns:
             list[Any]: All elements in the collection
         """
+        return list(self.iter_all(collection, projection=projection))
+
+    def iter_all(
+        self,
+        collection: str,
+        data: dict[str, Any] | None = None,
+        *,
+        projection: dict[str, Any] | None = None,
+        batch_size: int = DB_CURSOR_BATCH_SIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream elements, fetching `batch_size` of them per round trip while they're iterated
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any] | None, optional): Filter of the elements. Defaults to None, every element.
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"name": 1}). Defaults to None,
+                returning every field.
+            batch_size (int, optional): Elements per round trip. Defaults to DB_CURSOR_BATCH_SIZE.
+
+        Returns:
+            Iterator[dict[str, Any]]: The elements
+        """
         if not self.connected:
             raise ConnectError("Not connected to the database")
 
-        elements = self.db[collection].find({})
-        return [dict(element) for element in elements]
+        options = FindOptions(projection=projection, batch_size=batch_size)
+        return (dict(element) for element in self.backend.find(collection, data or {}, options))
 
-    def show_one(self, collection: str, data: dict[str, Any]) -> dict[str, Any]:
+    def show_one(
+        self,
+        collection: str,
+        data: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
         """Show one element
 
         Args:
             collection (str): Collection name
             data (dict[str, Any]): Data to show
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"name": 1}), so only those are
+                transferred and decoded. Defaults to None, returning every field.
 
         Returns:
             dict[str, Any]: Element found
@@ -159,11 +316,26 @@ class DbClient:
         if not self.connected:
             raise ConnectError("Not connected to the database")
 
-        element = self.db[collection].find_one(data)
-        if not element:
+        element = self.backend.find_one(collection, data, projection)
+        # A projection can leave an empty element
+        if element is None:
             raise ValueError("Element not found")
         return dict(element)
 
+    def count(self, collection: str, data: dict[str, Any]) -> int:
+        """Count elements
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Filter of the elements to count
+
+        Returns:
+            int: The amount of matching elements
+        """
+        if not self.connected:
+            raise ConnectError("Not connected to the database")
+        return self.backend.count(collection, data)
+
     def update_one(
         self,
         collection: str,
@@ -194,23 +366,329 @@ class DbClient:
 
         current_time = datetime.now(utc_timezone)
         new_data["updated_at"] = current_time
-        self.db[collection].update_one(data, {"$set": new_data}, upsert=upsert)
+        self.backend.update_one(collection, data, {"$set": new_data}, upsert=upsert)
 
-    def update_many(self, collection: str, datas: Iterable[Any], new_datas: Iterable[Any]) -> None:
-        """Update many elements in the collection
+    def apply_update(
+        self,
+        collection: str,
+        data: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> bool:
+        """Apply an update document (e.g. with $inc or $addToSet) to one element, atomically
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Filter of the element to update
+            update (dict[str, Any]): The update operators
+            upsert (bool, optional): Whether to upsert. Defaults to False.
+
+        Returns:
+            bool: Whether an element matched the filter (or was upserted)
+        """
+        if not self.connected:
+            raise ConnectError("Not connected to the database")
+
+        update = with_updated_at(update)
+        result = self.backend.update_one(collection, data, update, upsert=upsert)
+        return result.matched or result.upserted
+
+    def update_many(
+        self,
+        collection: str,
+        datas: Iterable[Any],
+        new_datas: Iterable[Any],
+        *,
+        upsert: bool = False,
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Update many elements in the collection, in unordered bulk writes
 
         Args:
             collection (str): Collection name
             datas (Iterable[Any]): list of datas to update
             new_datas (Iterable[Any]): list of new datas to update
+            upsert (bool, optional): Whether to upsert. Defaults to False.
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
 
         Returns:
-            None
+            BulkResult: The summary, `matched` is less than the amount of datas if some weren't found (and not
+                upserted)
+        """
+        current_time = datetime.now(utc_timezone)
+        operations = (
+            UpdateOperation(data, {"$set": {**new_data, "updated_at": current_time}}, upsert=upsert)
+            for data, new_data in zip(datas, new_datas, strict=False)
+        )
+        return self.bulk_write(collection, operations, chunk_size)
+
+    def bulk_write(
+        self,
+        collection: str,
+        operations: Iterable[WriteOperation],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Send write operations in unordered bulk writes, one round trip per chunk
+
+        Args:
+            collection (str): Collection name
+            operations (Iterable[WriteOperation]): The operations
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
+
+        Returns:
+            BulkResult: The summary of every chunk
         """
         if not self.connected:
             raise ConnectError("Not connected to the database")
 
-        for data, new_data in zip(datas, new_datas, strict=False):
-            if not self.show_one(collection, data):
-                raise ValueError("Element not found")
-            self.db[collection].update_one(data, {"$set": new_data})
+        result = BulkResult()
+        for chunk in chunked(operations, chunk_size):
+            result += self.backend.bulk_write(collection, chunk)
+        return result
+
+
+class AsyncDbClient:
+    """async db client, every call runs the blocking DbClient on the database I/O executor"""
+
+    def __init__(self, client: DbClient | None = None) -> None:
+        self.client = client or DbClient()
+
+    @property
+    def backend(self) -> StorageBackend:
+        """StorageBackend: Where the collections are stored"""
+        return self.client.backend
+
+    def is_connected(self) -> bool:
+        """Check if connected
+
+        Returns:
+            bool: True if connected, False otherwise
+        """
+        return self.client.is_connected()
+
+    async def add_element(self, collection: str, data: dict[str, Any]) -> None:
+        """Add element
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Data to add
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.client.add_element, collection, data)
+
+    async def add_many(
+        self,
+        collection: str,
+        datas: Iterable[Any],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Add many elements, in unordered bulk writes
+
+        Args:
+            collection (str): Collection name
+            datas (Iterable[Any]): list of Datas to add
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
+
+        Returns:
+            BulkResult: The summary, `upserted` is the amount of added elements
+        """
+        return await run_in_db_executor(self.client.add_many, collection, datas, chunk_size)
+
+    async def delete_all(self, collection: str) -> None:
+        """Delete all elements
+
+        Args:
+            collection (str): Collection name
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.client.delete_all, collection)
+
+    async def delete_many(
+        self,
+        collection: str,
+        datas: Iterable[Any],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Delete many elements, in unordered bulk writes
+
+        Args:
+            collection (str): Collection name
+            datas (Iterable[Any]): list of datas to delete
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
+
+        Returns:
+            BulkResult: The summary, `deleted` is less than the amount of datas if some weren't found
+        """
+        return await run_in_db_executor(self.client.delete_many, collection, datas, chunk_size)
+
+    async def delete_one(self, collection: str, data: dict[str, Any]) -> None:
+        """Delete one element
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Data to delete
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.client.delete_one, collection, data)
+
+    async def show_all(self, collection: str, projection: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """Show all elements
+
+        Args:
+            collection (str): Collection name
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"name": 1}). Defaults to None,
+                returning every field.
+
+        Returns:
+            list[Any]: All elements in the collection
+        """
+        return await run_in_db_executor(self.client.show_all, collection, projection)
+
+    async def iter_all(
+        self,
+        collection: str,
+        data: dict[str, Any] | None = None,
+        *,
+        projection: dict[str, Any] | None = None,
+        batch_size: int = DB_CURSOR_BATCH_SIZE,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream elements, every batch is fetched on the database I/O executor
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any] | None, optional): Filter of the elements. Defaults to None, every element.
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"name": 1}). Defaults to None,
+                returning every field.
+            batch_size (int, optional): Elements per round trip. Defaults to DB_CURSOR_BATCH_SIZE.
+
+        Yields:
+            dict[str, Any]: The elements
+        """
+        # Creating the stream doesn't fetch anything yet
+        elements = self.client.iter_all(collection, data, projection=projection, batch_size=batch_size)
+        async for element in iterate_in_db_executor(elements, batch_size):
+            yield element
+
+    async def show_one(
+        self,
+        collection: str,
+        data: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Show one element
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Data to show
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"name": 1}), so only those are
+                transferred and decoded. Defaults to None, returning every field.
+
+        Returns:
+            dict[str, Any]: Element found
+        """
+        return await run_in_db_executor(self.client.show_one, collection, data, projection)
+
+    async def count(self, collection: str, data: dict[str, Any]) -> int:
+        """Count elements
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Filter of the elements to count
+
+        Returns:
+            int: The amount of matching elements
+        """
+        return await run_in_db_executor(self.client.count, collection, data)
+
+    async def update_one(
+        self,
+        collection: str,
+        data: dict[str, Any],
+        new_data: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> None:
+        """Update one element in the collection
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Data to update
+            new_data (dict[str, Any]): New data to update
+            upsert (bool, optional): Whether to upsert. Defaults to False.
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.client.update_one, collection, data, new_data, upsert=upsert)
+
+    async def apply_update(
+        self,
+        collection: str,
+        data: dict[str, Any],
+        update: dict[str, Any],
+        *,
+        upsert: bool = False,
+    ) -> bool:
+        """Apply an update document (e.g. with $inc or $addToSet) to one element, atomically
+
+        Args:
+            collection (str): Collection name
+            data (dict[str, Any]): Filter of the element to update
+            update (dict[str, Any]): The update operators
+            upsert (bool, optional): Whether to upsert. Defaults to False.
+
+        Returns:
+            bool: Whether an element matched the filter (or was upserted)
+        """
+        return await run_in_db_executor(self.client.apply_update, collection, data, update, upsert=upsert)
+
+    async def update_many(
+        self,
+        collection: str,
+        datas: Iterable[Any],
+        new_datas: Iterable[Any],
+        *,
+        upsert: bool = False,
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Update many elements in the collection, in unordered bulk writes
+
+        Args:
+            collection (str): Collection name
+            datas (Iterable[Any]): list of datas to update
+            new_datas (Iterable[Any]): list of new datas to update
+            upsert (bool, optional): Whether to upsert. Defaults to False.
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
+
+        Returns:
+            BulkResult: The summary, `matched` is less than the amount of datas if some weren't found (and not
+                upserted)
+        """
+        return await run_in_db_executor(
+            self.client.update_many, collection, datas, new_datas, upsert=upsert, chunk_size=chunk_size
+        )
+
+    async def bulk_write(
+        self,
+        collection: str,
+        operations: Iterable[WriteOperation],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> BulkResult:
+        """Send write operations in unordered bulk writes, one round trip per chunk
+
+        Args:
+            collection (str): Collection name
+            operations (Iterable[WriteOperation]): The operations
+            chunk_size (int, optional): Maximum operations per bulk write. Defaults to DB_BULK_CHUNK_SIZE.
+
+        Returns:
+            BulkResult: The summary of every chunk
+        """
+        return await run_in_db_executor(self.client.bulk_write, collection, operations, chunk_size)
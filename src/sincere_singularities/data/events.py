@@ -0,0 +1,171 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sincere_singularities.data.backends import FindOptions, UpdateOperation
+from sincere_singularities.data.db import DB_CURSOR_BATCH_SIZE, DbClient
+
+
+@dataclass(frozen=True, slots=True)
+class OrderCompletion:
+    """A completed order, as logged in the event log."""
+
+    player_id: int
+    # The position of the event among the player's events, starting at 1
+    seq: int
+    restaurant: str
+    coins: int
+    correctness: float
+    time_taken: float
+    completed_at: datetime
+
+    def to_document(self) -> dict[str, Any]:
+        """
+        Get the document storing the event.
+
+        Returns:
+            dict[str, Any]: The document.
+        """
+        return {
+            "player_id": self.player_id,
+            "seq": self.seq,
+            "restaurant": self.restaurant,
+            "coins": self.coins,
+            "correctness": self.correctness,
+            "time_taken": self.time_taken,
+            "completed_at": self.completed_at,
+        }
+
+    @classmethod
+    def from_document(cls, document: dict[str, Any]) -> "OrderCompletion":
+        """
+        Read an event from its document.
+
+        Args:
+            document (dict[str, Any]): The document.
+
+        Returns:
+            OrderCompletion: The event.
+        """
+        return cls(
+            player_id=document["player_id"],
+            seq=document["seq"],
+            restaurant=document["restaurant"],
+            coins=document["coins"],
+            correctness=document["correctness"],
+            time_taken=document["time_taken"],
+            completed_at=document["completed_at"],
+        )
+
+
+class EventLog:
+    """
+    The append-only log of the completed orders.
+
+    Events are never changed, except for being marked as compacted once they're folded into the player's state
+    snapshot. They're appended with upserts on their (player_id, seq) key, so appending them again after a failed
+    write doesn't log them twice.
+    """
+
+    def __init__(self, client: DbClient, collection: str = "order_events") -> None:
+        self.client = client
+        self.collection = collection
+
+    def append(self, events: Iterable[OrderCompletion]) -> int:
+        """
+        Append events, in bulk writes.
+
+        Args:
+            events (Iterable[OrderCompletion]): The events.
+
+        Returns:
+            int: The amount of appended events (the ones that were already logged aren't counted).
+        """
+        operations = (
+            UpdateOperation(
+                {"player_id": event.player_id, "seq": event.seq},
+                {"$setOnInsert": {**event.to_document(), "compacted": False}},
+                upsert=True,
+            )
+            for event in events
+        )
+        return self.client.bulk_write(self.collection, operations).upserted
+
+    def after(self, player_id: int, seq: int, limit: int = 0) -> list[OrderCompletion]:
+        """
+        Get the events of a player that come after an event.
+
+        Args:
+            player_id (int): User id
+            seq (int): The seq of the event, 0 for every event of the player.
+            limit (int, optional): The maximum amount of events. Defaults to 0, every event.
+
+        Returns:
+            list[OrderCompletion]: The events, in order.
+        """
+        documents = self.client.backend.find(
+            self.collection,
+            {"player_id": player_id, "seq": {"$gt": seq}},
+            FindOptions(sort=[("seq", 1)], limit=limit),
+        )
+        return [OrderCompletion.from_document(document) for document in documents]
+
+    def uncompacted(self, limit: int) -> list[OrderCompletion]:
+        """
+        Get events that weren't folded into the state snapshots yet.
+
+        Args:
+            limit (int): The maximum amount of events.
+
+        Returns:
+            list[OrderCompletion]: The events, in no particular order.
+        """
+        documents = self.client.backend.find(self.collection, {"compacted": False}, FindOptions(limit=limit))
+        return [OrderCompletion.from_document(document) for document in documents]
+
+    def mark_compacted(self, events: Iterable[OrderCompletion]) -> None:
+        """
+        Mark events as folded into the state snapshots.
+
+        Args:
+            events (Iterable[OrderCompletion]): The events.
+        """
+        self.client.bulk_write(
+            self.collection,
+            (
+                UpdateOperation({"player_id": event.player_id, "seq": event.seq}, {"$set": {"compacted": True}})
+                for event in events
+            ),
+        )
+
+    def delete(self, player_id: int) -> int:
+        """
+        Delete every event of a player.
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            int: The amount of deleted events.
+        """
+        return self.client.backend.delete_many(self.collection, {"player_id": player_id})
+
+    def iter_events(
+        self,
+        data: dict[str, Any] | None = None,
+        batch_size: int = DB_CURSOR_BATCH_SIZE,
+    ) -> Iterator[OrderCompletion]:
+        """
+        Stream the logged events, e.g. to replay the history of a player or to tune the scoring.
+
+        Args:
+            data (dict[str, Any] | None, optional): Filter of the events (e.g. {"restaurant": "Pizzeria"}). Defaults
+                to None, every event.
+            batch_size (int, optional): Events per round trip. Defaults to DB_CURSOR_BATCH_SIZE.
+
+        Yields:
+            OrderCompletion: The events.
+        """
+        for document in self.client.iter_all(self.collection, data, batch_size=batch_size):
+            yield OrderCompletion.from_document(document)
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, errors
+from pymongo.database import Database
+
+from sincere_singularities.data.backends.base import FindOptions, StorageBackend
+
+# The indexes of every collection, created when connecting
+INDEXES: dict[str, list[IndexModel]] = {
+    "states": [
+        IndexModel([("player_id", ASCENDING)], name="player_id", unique=True),
+        # The leaderboard sorts the players by their coins
+        IndexModel([("state.coins", DESCENDING)], name="state_coins"),
+    ],
+    "restaurants": [
+        IndexModel([("name", ASCENDING)], name="name", unique=True),
+    ],
+    "order_events": [
+        IndexModel([("player_id", ASCENDING), ("seq", ASCENDING)], name="player_id_seq", unique=True),
+        # The compactor looks for the events that weren't folded into the snapshots yet
+        IndexModel([("compacted", ASCENDING), ("player_id", ASCENDING), ("seq", ASCENDING)], name="compacted"),
+    ],
+}
+
+
+@dataclass(frozen=True, slots=True)
+class HotQuery:
+    """A query the game runs often, which has to be answered by an index."""
+
+    name: str
+    collection: str
+    filter: dict[str, Any]
+    sort: list[tuple[str, int]] = field(default_factory=list)
+    limit: int = 0
+
+
+HOT_QUERIES = [
+    HotQuery("load a player's state", "states", {"player_id": 0}),
+    HotQuery("leaderboard", "states", {}, sort=[("state.coins", DESCENDING)], limit=10),
+    HotQuery("rank of a player", "states", {"state.coins": {"$gt": 0}}),
+    HotQuery("find a restaurant", "restaurants", {"name": ""}),
+    HotQuery(
+        "replay a player's events", "order_events", {"player_id": 0, "seq": {"$gt": 0}}, sort=[("seq", ASCENDING)]
+    ),
+    HotQuery(
+        "uncompacted events",
+        "order_events",
+        {"compacted": False},
+        sort=[("player_id", ASCENDING), ("seq", ASCENDING)],
+        limit=1000,
+    ),
+]
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
+    """The stages of the winning plan of a hot query."""
+
+    query: HotQuery
+    stages: list[str]
+
+    @property
+    def collection_scan(self) -> bool:
+        """bool: Whether the query scans the whole collection."""
+        return "COLLSCAN" in self.stages
+
+
+def ensure_indexes(db: Database[Any]) -> None:
+    """
+    Create the missing indexes of every collection. Creating an index that already exists doesn't do anything.
+
+    Args:
+        db (Database[Any]): The database.
+    """
+    for collection, indexes in INDEXES.items():
+        try:
+            db[collection].create_indexes(indexes)
+        except errors.OperationFailure as err:
+            # E.g. the collection contains duplicates of a unique key
+            print(f"Error: couldn't create the indexes of {collection}: {err}")
+
+
+def plan_stages(plan: object) -> list[str]:
+    """
+    Collect the stages of a MongoDB query plan.
+
+    Args:
+        plan (object): The winning plan of an explanation.
+
+    Returns:
+        list[str]: The stages, outermost first.
+    """
+    # The stages are nested in inputStage(s), and newer servers wrap the plan in queryPlan
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in plan_stages(item)]
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if isinstance(plan.get("stage"), str) else []
+    return stages + [stage for value in plan.values() for stage in plan_stages(value)]
+
+
+def explain_hot_queries(backend: StorageBackend) -> list[QueryPlan]:
+    """
+    Explain every hot query.
+
+    Args:
+        backend (StorageBackend): The storage backend.
+
+    Returns:
+        list[QueryPlan]: The plan of each hot query.
+    """
+    return [
+        QueryPlan(
+            query, backend.explain(query.collection, query.filter, FindOptions(sort=query.sort, limit=query.limit))
+        )
+        for query in HOT_QUERIES
+    ]
+
+
+def format_query_plans(plans: list[QueryPlan]) -> str:
+    """
+    Format query plans as a table.
+
+    Args:
+        plans (list[QueryPlan]): The plans.
+
+    Returns:
+        str: The table.
+    """
+    lines = [f"{'query':<26}{'collection':<14}plan"]
+    lines.extend(
+        f"{plan.query.name:<26}{plan.query.collection:<14}{' <- '.join(plan.stages)}"
+        f"{'  (COLLECTION SCAN)' if plan.collection_scan else ''}"
+        for plan in plans
+    )
+    return "\n".join(lines)
@@ -0,0 +1,202 @@
+import bisect
+import os
+import threading
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from sincere_singularities.data.backends import FindOptions
+from sincere_singularities.data.db import run_in_db_executor
+from sincere_singularities.data.savestates import SaveStates
+
+load_dotenv()
+
+# The amount of players shown on the leaderboard
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE") or 10)
+# The amount of top players whose ranking is kept in memory
+LEADERBOARD_CACHE_SIZE = int(os.getenv("LEADERBOARD_CACHE_SIZE") or 100)
+
+
+@dataclass(frozen=True, slots=True)
+class LeaderboardEntry:
+    """A player on the leaderboard. Players with the same coins share a rank."""
+
+    rank: int
+    player_id: int
+    coins: int
+
+
+class Leaderboard:
+    """
+    The players ranked by their coins.
+
+    The top `cache_size` players are loaded with one sorted query on the `state.coins` index, and then kept up to date
+    in memory from the coin changes of the save states. Every player who isn't cached has at most as many coins as the
+    last cached one: a player who gets more joins the cache, and a cached player who drops below it leaves. So the
+    cache answers the top of the leaderboard (and the ranks of the players in it) without touching the database. Other
+    ranks are counted on the index, and the cache is reloaded when it shrank below the requested size.
+    """
+
+    def __init__(self, save_states: SaveStates, cache_size: int = LEADERBOARD_CACHE_SIZE) -> None:
+        """
+        Initialize the leaderboard, the ranking is loaded when it's first used.
+
+        Args:
+            save_states (SaveStates): The save states, whose coin changes update the ranking.
+            cache_size (int, optional): The amount of top players kept in memory. Defaults to LEADERBOARD_CACHE_SIZE.
+        """
+        self.save_states = save_states
+        self.cache_size = cache_size
+        # (-coins, player_id), so the richest player comes first
+        self._entries: list[tuple[int, int]] = []
+        self._coins: dict[int, int] = {}
+        self._loaded = False
+        # Whether every player is cached
+        self._complete = False
+        # The coin changes that happened while the ranking was being reloaded, None when it isn't
+        self._changes_while_loading: list[tuple[int, int | None]] | None = None
+        self._lock = threading.Lock()
+        save_states.add_coins_listener(self._on_coins_changed)
+
+    def _on_coins_changed(self, player_id: int, coins: int | None) -> None:
+        with self._lock:
+            if self._changes_while_loading is not None:
+                self._changes_while_loading.append((player_id, coins))
+            if self._loaded:
+                self._apply(player_id, coins)
+
+    def _apply(self, player_id: int, coins: int | None) -> None:
+        if (cached_coins := self._coins.pop(player_id, None)) is not None:
+            del self._entries[bisect.bisect_left(self._entries, (-cached_coins, player_id))]
+        if coins is None:
+            return
+        if self._complete or (self._entries and coins >= -self._entries[-1][0]):
+            bisect.insort(self._entries, (-coins, player_id))
+            self._coins[player_id] = coins
+        if len(self._entries) > self.cache_size:
+            _, dropped = self._entries.pop()
+            del self._coins[dropped]
+            self._complete = False
+
+    def refresh(self) -> None:
+        """Reload the ranking of the top players from the database."""
+        with self._lock:
+            self._changes_while_loading = []
+        try:
+            # The database has to know about the latest coins
+            self.save_states.sync()
+            documents = self.save_states.client.backend.find(
+                self.save_states.collection,
+                {},
+                FindOptions(
+                    projection={"player_id": 1, "state.coins": 1, "_id": 0},
+                    sort=[("state.coins", -1)],
+                    limit=self.cache_size,
+                ),
+            )
+            entries = sorted((-document["state"]["coins"], document["player_id"]) for document in documents)
+        finally:
+            with self._lock:
+                changes, self._changes_while_loading = self._changes_while_loading or [], None
+
+        with self._lock:
+            self._entries = entries
+            self._coins = {player_id: -coins for coins, player_id in entries}
+            self._complete = len(entries) < self.cache_size
+            self._loaded = True
+            for player_id, coins in changes:
+                self._apply(player_id, coins)
+
+    def cached_top(self, size: int = LEADERBOARD_SIZE) -> list[LeaderboardEntry] | None:
+        """
+        Get the richest players, if the cached ranking has enough of them.
+
+        Args:
+            size (int, optional): The amount of players. Defaults to LEADERBOARD_SIZE.
+
+        Returns:
+            list[LeaderboardEntry] | None: The players, the richest first. None if the database has to be queried.
+        """
+        with self._lock:
+            if not self._loaded or (not self._complete and len(self._entries) < size):
+                return None
+            top: list[LeaderboardEntry] = []
+            for index, (coins, player_id) in enumerate(self._entries[:size]):
+                # Players with the same coins share the rank of the first of them
+                rank = top[-1].rank if top and top[-1].coins == -coins else index + 1
+                top.append(LeaderboardEntry(rank, player_id, -coins))
+            return top
+
+    def top(self, size: int = LEADERBOARD_SIZE) -> list[LeaderboardEntry]:
+        """
+        Get the richest players.
+
+        Args:
+            size (int, optional): The amount of players. Defaults to LEADERBOARD_SIZE.
+
+        Returns:
+            list[LeaderboardEntry]: The players, the richest first.
+        """
+        if (top := self.cached_top(size)) is not None:
+            return top
+        self.refresh()
+        # More players than cached are only requested when the cache size is smaller than the leaderboard
+        return self.cached_top(min(size, self.cache_size)) or []
+
+    def rank(self, player_id: int) -> int:
+        """
+        Get the rank of a player: one more than the amount of players with more coins.
+
+        Args:
+            player_id (int): User id
+
+        Raises:
+            ValueError: Raised when the player doesn't have a state.
+
+        Returns:
+            int: The rank, starting at 1.
+        """
+        coins = self.save_states.load_coins(player_id)
+        with self._lock:
+            if self._loaded and (self._complete or (self._entries and coins >= -self._entries[-1][0])):
+                # The cached entries with more coins come before the ones with these coins
+                return bisect.bisect_left(self._entries, (-coins,)) + 1
+
+        self.save_states.sync()
+        return self.save_states.client.count(self.save_states.collection, {"state.coins": {"$gt": coins}}) + 1
+
+
+class AsyncLeaderboard:
+    """async leaderboard, every call runs the blocking Leaderboard on the database I/O executor"""
+
+    def __init__(self, leaderboard: Leaderboard) -> None:
+        self.leaderboard = leaderboard
+
+    async def top(self, size: int = LEADERBOARD_SIZE) -> list[LeaderboardEntry]:
+        """
+        Get the richest players.
+
+        Args:
+            size (int, optional): The amount of players. Defaults to LEADERBOARD_SIZE.
+
+        Returns:
+            list[LeaderboardEntry]: The players, the richest first.
+        """
+        if (top := self.leaderboard.cached_top(size)) is not None:
+            return top
+        return await run_in_db_executor(self.leaderboard.top, size)
+
+    async def rank(self, player_id: int) -> int:
+        """
+        Get the rank of a player: one more than the amount of players with more coins.
+
+        Args:
+            player_id (int): User id
+
+        Raises:
+            ValueError: Raised when the player doesn't have a state.
+
+        Returns:
+            int: The rank, starting at 1.
+        """
+        return await run_in_db_executor(self.leaderboard.rank, player_id)
@@ -1,9 +1,46 @@
-from collections import defaultdict
-from collections.abc import Iterable
-from typing import Any, TypedDict
+import contextlib
+import copy
+import operator
+import os
+import threading
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, ParamSpec, TypedDict, TypeVar
 
-from sincere_singularities.data.db import ConnectError, DbClient
-from sincere_singularities.utils import RESTAURANT_JSON
+from dotenv import load_dotenv
+
+from sincere_singularities.data.backends import FindOptions, UpdateOperation
+from sincere_singularities.data.backends.documents import pick_paths
+from sincere_singularities.data.db import (
+    DB_CURSOR_BATCH_SIZE,
+    AsyncDbClient,
+    ConnectError,
+    DbClient,
+    run_in_db_executor,
+    with_updated_at,
+)
+from sincere_singularities.data.events import EventLog, OrderCompletion
+from sincere_singularities.utils import load_restaurants
+
+load_dotenv()
+
+# Seconds between writing the dirty (changed) game states to the database
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL") or 5.0)
+# The amount of dirty game states that triggers writing them right away
+STATE_FLUSH_THRESHOLD = int(os.getenv("STATE_FLUSH_THRESHOLD") or 32)
+# How completed orders are persisted: "snapshot" updates the states, "events" appends them to the event log, which is
+# folded into the states in the background
+STATE_PERSISTENCE = os.getenv("STATE_PERSISTENCE") or "snapshot"
+STATE_PERSISTENCE_MODES = ("snapshot", "events")
+# Seconds between folding the logged events into the states
+EVENT_COMPACTION_INTERVAL = float(os.getenv("EVENT_COMPACTION_INTERVAL") or 30.0)
+# The amount of events folded at once
+EVENT_COMPACTION_BATCH_SIZE = int(os.getenv("EVENT_COMPACTION_BATCH_SIZE") or 1000)
+
+P = ParamSpec("P")
+R = TypeVar("R")
 
 
 class State(TypedDict):
@@ -30,19 +67,143 @@ def generate_default_state() -> State:
     """
     return State(
         coins=0,
-        restaurants=[RESTAURANT_JSON[0].name],
+        restaurants=[load_restaurants()[0].name],
         number_of_orders=defaultdict(int),
     )
 
 
+def apply_completions(state: State, events: Iterable[OrderCompletion]) -> None:
+    """
+    Apply the coins and order counts of completed orders to a state, in place.
+
+    Args:
+        state (State): The state.
+        events (Iterable[OrderCompletion]): The completed orders.
+    """
+    for event in events:
+        state["coins"] += event.coins
+        state["number_of_orders"][event.restaurant] = state["number_of_orders"].get(event.restaurant, 0) + 1
+
+
+@dataclass
+class _PendingUpdate:
+    """The changes of a game state that weren't written to the database yet."""
+
+    # Whether the whole state has to be written (after saving a whole state, or for a new player)
+    replace: bool = False
+    coins: int = 0
+    restaurants: list[str] = field(default_factory=list)
+    number_of_orders: Counter[str] = field(default_factory=Counter)
+
+    def to_update(self, state: State, event_seq: int | None = None) -> dict[str, Any]:
+        """
+        Get the update document writing the changes, so they're applied atomically on the server.
+
+        Args:
+            state (State): The current state (only written if the whole state has to be written).
+            event_seq (int | None, optional): The seq of the last logged event the state includes (only written with
+                the whole state). Defaults to None, when the events aren't logged.
+
+        Returns:
+            dict[str, Any]: The update operators.
+        """
+        if self.replace:
+            if event_seq is None:
+                return {"$set": {"state": copy.deepcopy(state)}}
+            return {"$set": {"state": copy.deepcopy(state), "event_seq": event_seq}}
+
+        update: dict[str, Any] = {}
+        increments = {
+            f"state.number_of_orders.{restaurant}": orders for restaurant, orders in self.number_of_orders.items()
+        }
+        if self.coins:
+            increments["state.coins"] = self.coins
+        if increments:
+            update["$inc"] = increments
+        if self.restaurants:
+            update["$addToSet"] = {"state.restaurants": {"$each": self.restaurants}}
+        return update
+
+
 class SaveStates:
-    """Save states"""
+    """Save states
 
-    def __init__(self) -> None:
-        self.client = DbClient()
-        self.collection = self.client.db.states.name
+    The states are cached in memory: loads are served from the cache, and saves and mutations only change the cache
+    and remember what changed. The changes are written to the database in the background every `flush_interval`
+    seconds, as soon as `flush_threshold` states changed, and when closing. Mutations (e.g. `increment_coins`) are
+    written as one atomic update per player ($inc/$addToSet), instead of rewriting the whole state. This assumes the
+    bot is the only writer of the states.
+
+    With the "events" persistence, completed orders are appended to the event log instead, which keeps the whole
+    history. A background compactor folds the logged events into the states: every state remembers the seq of the
+    last event folded into it (`event_seq`), so an event is never folded twice. Loading a state replays the events
+    that weren't folded into it yet.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = STATE_FLUSH_INTERVAL,
+        flush_threshold: int = STATE_FLUSH_THRESHOLD,
+        client: DbClient | None = None,
+        persistence: str = STATE_PERSISTENCE,
+        compaction_interval: float = EVENT_COMPACTION_INTERVAL,
+    ) -> None:
+        self.client = client or DbClient()
+        self.collection = "states"
         if not self.client.is_connected():
             raise ConnectError("Not connected to the database")
+        if persistence not in STATE_PERSISTENCE_MODES:
+            raise ValueError(f"State persistence named {persistence!r} doesn't exist")
+
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.persistence = persistence
+        self.compaction_interval = compaction_interval
+        self.event_log = EventLog(self.client)
+        self._states: dict[int, State] = {}
+        self._pending: dict[int, _PendingUpdate] = {}
+        # Guards the cache, it's used from the event loop as well as the database threads
+        self._lock = threading.Lock()
+        # Only one flush at a time, so an older snapshot never overwrites a newer one
+        self._flush_lock = threading.Lock()
+        self._wake_flusher = threading.Event()
+        self._stop_flushing = threading.Event()
+        self._flush_thread: threading.Thread | None = None
+        self._coins_listeners: list[Callable[[int, int | None], None]] = []
+        # The completed orders that weren't appended to the event log yet
+        self._events: list[OrderCompletion] = []
+        # The seq of the last logged event of every cached state
+        self._event_seqs: dict[int, int] = {}
+        # Only one compaction at a time, and no deletion during one
+        self._compact_lock = threading.Lock()
+        self._compact_thread: threading.Thread | None = None
+
+    @property
+    def flushing(self) -> bool:
+        """bool: Whether the changes are flushed in the background."""
+        return self._flush_thread is not None
+
+    @property
+    def event_sourced(self) -> bool:
+        """bool: Whether completed orders are appended to the event log."""
+        return self.persistence == "events"
+
+    def add_coins_listener(self, listener: Callable[[int, int | None], None]) -> None:
+        """Call a function whenever the coins of a cached state change
+
+        Args:
+            listener (Callable[[int, int | None], None]): Called with the user id and the new coins (None when the
+                state was deleted). It's called while the cache is locked, so the changes arrive in order, and it
+                must not use the save states.
+
+        Returns:
+            None
+        """
+        self._coins_listeners.append(listener)
+
+    def _coins_changed(self, player_id: int, coins: int | None) -> None:
+        for listener in self._coins_listeners:
+            listener(player_id, coins)
 
     def add_user_state(self, data: StateFormat) -> None:
         """Add state
@@ -53,8 +214,13 @@ class SaveStates:
         Returns:
             None
         """
+        player_id: Any = data["player_id"]
+        if self.is_cached(player_id):
+            self.save_game_state(player_id, data["state"])
+            return
+
         try:
-            user = self.client.show_one(self.collection, {"player_id": data["player_id"]})
+            user = self.client.show_one(self.collection, {"player_id": player_id})
             if user:
                 self.save_game_state(user["player_id"], data["state"])
 
@@ -73,6 +239,30 @@ class SaveStates:
         for data in datas:
             self.add_user_state(data)
 
+    def is_cached(self, player_id: int) -> bool:
+        """Check if a state is cached
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            bool: Whether the user's state is cached.
+        """
+        return player_id in self._states
+
+    def cached_game_state(self, player_id: int) -> State | None:
+        """Get state from the cache, without touching the database
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            State | None: A copy of the user's state, or None if it isn't cached.
+        """
+        with self._lock:
+            state = self._states.get(player_id)
+            return copy.deepcopy(state) if state is not None else None
+
     def save_game_state(self, player_id: int, state: State) -> None:
         """Save state
 
@@ -83,7 +273,19 @@ class SaveStates:
         Returns:
             None
         """
-        self.client.update_one(self.collection, {"player_id": player_id}, {"state": state}, upsert=True)
+        if self.event_sourced and not self.is_cached(player_id):
+            # The saved state replaces the logged events, so the seq of the last one has to be known
+            with contextlib.suppress(ValueError):
+                self.load_game_state(player_id)
+        with self._lock:
+            previous = self._states.get(player_id)
+            self._states[player_id] = copy.deepcopy(state)
+            self._pending[player_id] = _PendingUpdate(replace=True)
+            if previous is None or previous["coins"] != state["coins"]:
+                self._coins_changed(player_id, state["coins"])
+            flush_due = len(self._pending) >= self.flush_threshold
+        if flush_due:
+            self._request_flush()
 
     def load_game_state(self, player_id: int) -> State:
         """Get state
@@ -94,28 +296,737 @@ class SaveStates:
         Returns:
             State: The user's state.
         """
-        state_dict = self.client.show_one(self.collection, {"player_id": player_id})["state"]
-        return State(
+        if (state := self.cached_game_state(player_id)) is not None:
+            return state
+
+        state, event_seq = self._load_from_database(player_id)
+        with self._lock:
+            # A save while loading wins over the loaded state
+            if player_id not in self._states:
+                self._states[player_id] = state
+                self._event_seqs[player_id] = event_seq
+            return copy.deepcopy(self._states[player_id])
+
+    def _load_from_database(self, player_id: int) -> tuple[State, int]:
+        # Returns the state and the seq of the last logged event it includes
+        try:
+            element = self.client.show_one(self.collection, {"player_id": player_id})
+        except ValueError:
+            # The events of a new player can be logged before their state is written
+            if not self.event_sourced or not (events := self.event_log.after(player_id, 0)):
+                raise
+            state = generate_default_state()
+            apply_completions(state, events)
+            return state, events[-1].seq
+
+        state_dict = element["state"]
+        state = State(
             coins=state_dict["coins"],
             restaurants=state_dict["restaurants"],
             number_of_orders=state_dict["number_of_orders"],
         )
+        event_seq = element.get("event_seq") or 0
+        if not self.event_sourced:
+            return state, event_seq
+        # Replaying the events that weren't folded into the state yet
+        events = self.event_log.after(player_id, event_seq)
+        apply_completions(state, events)
+        return state, events[-1].seq if events else event_seq
+
+    def load_state_fields(self, player_id: int, fields: Iterable[str]) -> dict[str, Any]:
+        """Get some fields of a state
+
+        Only the requested fields are read from the database, and the partial state isn't cached.
+
+        Args:
+            player_id (int): User id
+            fields (Iterable[str]): The fields of the state to get (e.g. "coins")
+
+        Returns:
+            dict[str, Any]: The requested fields that the state has.
+        """
+        fields = list(fields)
+        with self._lock:
+            if (state := self._states.get(player_id)) is not None:
+                return pick_paths(dict(state), fields)
+
+        projection = {f"state.{name}": 1 for name in fields} | {"event_seq": 1, "_id": 0}
+        element = self.client.show_one(self.collection, {"player_id": player_id}, projection)
+        if self.event_sourced and self.event_log.after(player_id, element.get("event_seq") or 0, limit=1):
+            # Some events weren't folded into the stored state yet, so it's replayed
+            return pick_paths(dict(self.load_game_state(player_id)), fields)
+        return dict(element.get("state", {}))
+
+    def load_coins(self, player_id: int) -> int:
+        """Get coins
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            int: The user's coins.
+        """
+        return int(self.load_state_fields(player_id, ["coins"])["coins"])
+
+    def load_restaurants(self, player_id: int) -> list[str]:
+        """Get restaurants
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            list[str]: The names of the user's restaurants.
+        """
+        return list(self.load_state_fields(player_id, ["restaurants"])["restaurants"])
+
+    def load_order_count(self, player_id: int, restaurant: str) -> int:
+        """Get the number of orders of a restaurant
+
+        Args:
+            player_id (int): User id
+            restaurant (str): Restaurant name
+
+        Returns:
+            int: The number of orders (0 if the restaurant didn't get any).
+        """
+        fields = self.load_state_fields(player_id, [f"number_of_orders.{restaurant}"])
+        return int(fields.get("number_of_orders", {}).get(restaurant, 0))
+
+    def load_all_user_states(
+        self,
+        data: dict[str, Any] | None = None,
+        *,
+        projection: dict[str, Any] | None = None,
+        batch_size: int = DB_CURSOR_BATCH_SIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream states
+
+        The changed states are written (and the logged events folded into them) first, then the states are fetched
+        `batch_size` at a time while they're iterated, so memory doesn't grow with the amount of players.
+
+        Args:
+            data (dict[str, Any] | None, optional): Filter of the states (e.g. {"state.coins": {"$gte": 100}}).
+                Defaults to None, every state.
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"player_id": 1}). Defaults to
+                None, returning every field.
+            batch_size (int, optional): States per round trip. Defaults to DB_CURSOR_BATCH_SIZE.
+
+        Returns:
+            Iterator[dict[str, Any]]: The stored states (with the player_id)
+        """
+        self.sync()
+        return self.client.iter_all(self.collection, data, projection=projection, batch_size=batch_size)
+
+    def delete_state(self, player_id: int) -> None:
+        """Delete state
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            None
+        """
+        # Waiting for the flushes and compactions that could write the state again
+        with self._flush_lock, self._compact_lock:
+            with self._lock:
+                self._states.pop(player_id, None)
+                self._pending.pop(player_id, None)
+                self._event_seqs.pop(player_id, None)
+                self._events = [event for event in self._events if event.player_id != player_id]
+                self._coins_changed(player_id, None)
+            self.event_log.delete(player_id)
+            self.client.delete_one(self.collection, {"player_id": player_id})
+
+    def _mutate(self, player_id: int, mutation: Callable[[State, _PendingUpdate], R]) -> R:
+        if not self.is_cached(player_id):
+            try:
+                self.load_game_state(player_id)
+            except ValueError:
+                # New player
+                with self._lock:
+                    if player_id not in self._states:
+                        self._states[player_id] = generate_default_state()
+                        self._pending[player_id] = _PendingUpdate(replace=True)
+                        self._coins_changed(player_id, self._states[player_id]["coins"])
+
+        with self._lock:
+            state = self._states[player_id]
+            coins = state["coins"]
+            pending = self._pending.setdefault(player_id, _PendingUpdate())
+            result = mutation(state, pending)
+            if state["coins"] != coins:
+                self._coins_changed(player_id, state["coins"])
+            flush_due = len(self._pending) >= self.flush_threshold
+        if flush_due:
+            self._request_flush()
+        return result
+
+    def increment_coins(self, player_id: int, coins: int) -> int:
+        """Add coins to a state (or subtract them, if negative)
+
+        Args:
+            player_id (int): User id
+            coins (int): The amount of coins to add
+
+        Returns:
+            int: The user's coins afterwards.
+        """
+
+        def mutation(state: State, pending: _PendingUpdate) -> int:
+            state["coins"] += coins
+            pending.coins += coins
+            return state["coins"]
+
+        return self._mutate(player_id, mutation)
+
+    def add_owned_restaurant(self, player_id: int, restaurant: str) -> bool:
+        """Add a restaurant to the ones a state owns
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+
+        Returns:
+            bool: Whether it was added (False if the user already owned it).
+        """
+
+        def mutation(state: State, pending: _PendingUpdate) -> bool:
+            if restaurant in state["restaurants"]:
+                return False
+            state["restaurants"].append(restaurant)
+            pending.restaurants.append(restaurant)
+            return True
+
+        return self._mutate(player_id, mutation)
+
+    def increment_order_count(self, player_id: int, restaurant: str) -> int:
+        """Count a completed order of a restaurant in a state
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+
+        Returns:
+            int: The user's number of orders of that restaurant afterwards.
+        """
+
+        def mutation(state: State, pending: _PendingUpdate) -> int:
+            state["number_of_orders"][restaurant] = state["number_of_orders"].get(restaurant, 0) + 1
+            pending.number_of_orders[restaurant] += 1
+            return state["number_of_orders"][restaurant]
+
+        return self._mutate(player_id, mutation)
+
+    def record_order_completion(
+        self,
+        player_id: int,
+        restaurant: str,
+        coins: int,
+        correctness: float,
+        time_taken: float,
+    ) -> int:
+        """Add the coins of a completed order to a state, and count the order
+
+        With the "events" persistence, the completed order is appended to the event log instead of updating the stored
+        state.
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+            coins (int): The coins gained (negative for a penalty)
+            correctness (float): The correctness of the order, from 0 to 1
+            time_taken (float): Seconds taken to complete the order
+
+        Returns:
+            int: The user's number of orders of that restaurant afterwards.
+        """
+
+        def mutation(state: State, pending: _PendingUpdate) -> int:
+            if self.event_sourced:
+                event_seq = self._event_seqs.get(player_id, 0) + 1
+                self._event_seqs[player_id] = event_seq
+                event = OrderCompletion(
+                    player_id, event_seq, restaurant, coins, correctness, time_taken, datetime.now(UTC)
+                )
+                self._events.append(event)
+                apply_completions(state, [event])
+            else:
+                state["coins"] += coins
+                state["number_of_orders"][restaurant] = state["number_of_orders"].get(restaurant, 0) + 1
+                pending.coins += coins
+                pending.number_of_orders[restaurant] += 1
+            return state["number_of_orders"][restaurant]
+
+        return self._mutate(player_id, mutation)
+
+    def purchase_restaurant(self, player_id: int, restaurant: str, price: int) -> bool:
+        """Buy a restaurant, if the state doesn't own it yet and has enough coins
+
+        The check and the purchase happen atomically, so overlapping interactions can't buy a restaurant twice or
+        spend the same coins twice.
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+            price (int): The restaurant's price in coins
+
+        Returns:
+            bool: Whether the restaurant was bought.
+        """
+
+        def mutation(state: State, pending: _PendingUpdate) -> bool:
+            if restaurant in state["restaurants"] or state["coins"] < price:
+                return False
+            state["coins"] -= price
+            state["restaurants"].append(restaurant)
+            pending.coins -= price
+            pending.restaurants.append(restaurant)
+            return True
+
+        return self._mutate(player_id, mutation)
+
+    def flush(self) -> None:
+        """Write the changes of every changed state to the database, in one bulk write
+
+        Returns:
+            None
+        """
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                updates = {
+                    player_id: (
+                        pending.replace,
+                        pending.to_update(self._states[player_id], self._event_seqs.get(player_id)),
+                    )
+                    for player_id, pending in self._pending.items()
+                }
+                self._pending.clear()
+
+            operations = [
+                UpdateOperation({"player_id": player_id}, with_updated_at(update), upsert=replace)
+                for player_id, (replace, update) in updates.items()
+                if update
+            ]
+            try:
+                # The events are logged before the states that may include them
+                self.event_log.append(events)
+                result = self.client.bulk_write(self.collection, operations)
+                if result.matched + result.upserted < len(operations):
+                    # Some states are missing from the database (e.g. they were deleted meanwhile)
+                    self._write_missing_states(
+                        [player_id for player_id, (replace, update) in updates.items() if update and not replace]
+                    )
+            except Exception:
+                # Retrying with the next flush, writing the whole (cached) states. Appending the events again doesn't
+                # log them twice
+                with self._lock:
+                    self._events[:0] = events
+                    for player_id in updates.keys() & self._states.keys():
+                        self._pending[player_id] = _PendingUpdate(replace=True)
+                raise
+
+    def _write_missing_states(self, player_ids: list[int]) -> None:
+        # Writing the whole states of the players whose changes didn't match a stored state
+        stored = self._stored_event_seqs(player_ids)
+        with self._lock:
+            # The cached states include the changes made since the flush started. Their deltas are still pending, so
+            # they're dropped, otherwise the next flush would apply them a second time
+            updates = {}
+            for player_id in player_ids:
+                if player_id not in stored and player_id in self._states:
+                    self._pending.pop(player_id, None)
+                    updates[player_id] = _PendingUpdate(replace=True).to_update(
+                        self._states[player_id], self._event_seqs.get(player_id)
+                    )
+        try:
+            self.client.bulk_write(
+                self.collection,
+                (
+                    UpdateOperation({"player_id": player_id}, with_updated_at(update), upsert=True)
+                    for player_id, update in updates.items()
+                ),
+            )
+        except Exception:
+            # Their deltas were dropped, so the next flush has to write the whole states
+            with self._lock:
+                for player_id in updates.keys() & self._states.keys():
+                    self._pending[player_id] = _PendingUpdate(replace=True)
+            raise
+
+    def compact(self, batch_size: int = EVENT_COMPACTION_BATCH_SIZE) -> int:
+        """Fold the logged events into the stored states, `batch_size` events at a time
+
+        A state is only updated if no other write changed its `event_seq` meanwhile, and events are only marked as
+        compacted once the `event_seq` of their state includes them, so every event is folded exactly once.
+
+        Args:
+            batch_size (int, optional): Events per batch. Defaults to EVENT_COMPACTION_BATCH_SIZE.
+
+        Returns:
+            int: The amount of events marked as compacted.
+        """
+        compacted = 0
+        with self._compact_lock:
+            while events := self.event_log.uncompacted(batch_size):
+                marked = self._compact_batch(events)
+                compacted += marked
+                if not marked:
+                    # The remaining events are retried with the next compaction
+                    break
+        return compacted
+
+    def _compact_batch(self, events: list[OrderCompletion]) -> int:
+        events_by_player: defaultdict[int, list[OrderCompletion]] = defaultdict(list)
+        for event in sorted(events, key=operator.attrgetter("seq")):
+            events_by_player[event.player_id].append(event)
+
+        event_seqs = self._stored_event_seqs(events_by_player)
+        operations = []
+        for player_id, player_events in events_by_player.items():
+            stored = player_id in event_seqs
+            event_seq = event_seqs.get(player_id) or 0
+            # Only the events right after the last folded one, a gap is filled by a later batch
+            folded: list[OrderCompletion] = []
+            for event in player_events:
+                if event.seq == event_seq + len(folded) + 1:
+                    folded.append(event)
+            if not folded:
+                continue
+
+            if not stored:
+                # The state of a new player wasn't written yet
+                state = generate_default_state()
+                apply_completions(state, folded)
+                update = {"$setOnInsert": {"state": state, "event_seq": folded[-1].seq}}
+                operations.append(UpdateOperation({"player_id": player_id}, with_updated_at(update), upsert=True))
+                continue
+            increments = Counter({"state.coins": sum(event.coins for event in folded)})
+            increments.update(f"state.number_of_orders.{event.restaurant}" for event in folded)
+            update = {"$inc": dict(increments), "$set": {"event_seq": folded[-1].seq}}
+            operations.append(
+                UpdateOperation({"player_id": player_id, "event_seq": event_seqs[player_id]}, with_updated_at(update))
+            )
+        self.client.bulk_write(self.collection, operations)
+
+        # Marking the events the states include now, whether this or another write folded them
+        event_seqs = self._stored_event_seqs(events_by_player)
+        compacted = [event for event in events if event.seq <= (event_seqs.get(event.player_id) or 0)]
+        self.event_log.mark_compacted(compacted)
+        return len(compacted)
+
+    def _stored_event_seqs(self, player_ids: Iterable[int]) -> dict[int, int | None]:
+        # The event_seq of the stored states (None for states written before the events were logged)
+        documents = self.client.backend.find(
+            self.collection,
+            {"player_id": {"$in": list(player_ids)}},
+            FindOptions(projection={"player_id": 1, "event_seq": 1, "_id": 0}),
+        )
+        return {document["player_id"]: document.get("event_seq") for document in documents}
+
+    def sync(self) -> None:
+        """Write the changes of every changed state, and fold the logged events into the stored states
 
-    def load_all_user_states(self) -> Iterable[Any]:
-        """Get states
+        Afterwards the stored states are up to date, e.g. for queries over every state.
 
         Returns:
-            Iterable[Any]: List of states
+            None
+        """
+        self.flush()
+        if self.event_sourced:
+            self.compact()
+
+    def _request_flush(self) -> None:
+        if self.flushing:
+            self._wake_flusher.set()
+        else:
+            self.flush()
+
+    def start_flushing(self) -> None:
+        """Start flushing the changed states in the background every `flush_interval` seconds
+
+        With the "events" persistence, the event log is also compacted every `compaction_interval` seconds.
+
+        Returns:
+            None
+        """
+        if self._flush_thread:
+            return
+        self._stop_flushing.clear()
+        self._flush_thread = threading.Thread(target=self._flush_periodically, name="state-flusher", daemon=True)
+        self._flush_thread.start()
+        if self.event_sourced:
+            self._compact_thread = threading.Thread(
+                target=self._compact_periodically, name="event-compactor", daemon=True
+            )
+            self._compact_thread.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_flushing.is_set():
+            self._wake_flusher.wait(self.flush_interval)
+            self._wake_flusher.clear()
+            try:
+                self.flush()
+            except Exception as err:  # noqa: BLE001
+                print(f"Error: couldn't flush the game states: {err}")
+
+    def _compact_periodically(self) -> None:
+        while not self._stop_flushing.wait(self.compaction_interval):
+            try:
+                self.compact()
+            except Exception as err:  # noqa: BLE001
+                print(f"Error: couldn't compact the event log: {err}")
+
+    def close(self) -> None:
+        """Stop flushing in the background and write the changes of every changed state to the database
+
+        The logged events are folded into the stored states too.
+
+        Returns:
+            None
+        """
+        self._stop_flushing.set()
+        self._wake_flusher.set()
+        for thread in (self._flush_thread, self._compact_thread):
+            if thread:
+                thread.join()
+        self._flush_thread = self._compact_thread = None
+        self.sync()
+
+
+class AsyncSaveStates:
+    """async save states, every call runs the blocking SaveStates on the database I/O executor
+
+    Changes of cached states are applied in memory right away while the background flusher is running, as they don't
+    touch the database.
+    """
+
+    def __init__(self, save_states: SaveStates | None = None) -> None:
+        self.save_states = save_states or SaveStates()
+        self.client = AsyncDbClient(self.save_states.client)
+        self.collection = self.save_states.collection
+
+    async def _run(self, player_id: int, function: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        if self.save_states.flushing and self.save_states.is_cached(player_id):
+            return function(*args, **kwargs)
+        return await run_in_db_executor(function, *args, **kwargs)
+
+    async def add_user_state(self, data: StateFormat) -> None:
+        """Add state
+
+        Args:
+            data (StateFormat): State to add
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.save_states.add_user_state, data)
+
+    async def add_many_user_states(self, datas: Iterable[StateFormat]) -> None:
+        """Add many states
+
+        Args:
+            datas (Iterable[StateFormat]): States to add
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.save_states.add_many_user_states, datas)
+
+    async def save_game_state(self, player_id: int, state: State) -> None:
+        """Save state
+
+        Args:
+            player_id (int): User id
+            state (State): State
+
+        Returns:
+            None
+        """
+        await self._run(player_id, self.save_states.save_game_state, player_id, state)
+
+    async def load_game_state(self, player_id: int) -> State:
+        """Get state
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            State: The user's state.
         """
-        return list(self.client.show_all(self.collection))
+        if (state := self.save_states.cached_game_state(player_id)) is not None:
+            return state
+        return await run_in_db_executor(self.save_states.load_game_state, player_id)
 
-    def delete_state(self, player_id: str) -> None:
+    async def _read(self, player_id: int, function: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        # Reading a cached state doesn't touch the database
+        if self.save_states.is_cached(player_id):
+            return function(*args, **kwargs)
+        return await run_in_db_executor(function, *args, **kwargs)
+
+    async def load_state_fields(self, player_id: int, fields: Iterable[str]) -> dict[str, Any]:
+        """Get some fields of a state
+
+        Args:
+            player_id (int): User id
+            fields (Iterable[str]): The fields of the state to get (e.g. "coins")
+
+        Returns:
+            dict[str, Any]: The requested fields that the state has.
+        """
+        return await self._read(player_id, self.save_states.load_state_fields, player_id, fields)
+
+    async def load_coins(self, player_id: int) -> int:
+        """Get coins
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            int: The user's coins.
+        """
+        return await self._read(player_id, self.save_states.load_coins, player_id)
+
+    async def load_restaurants(self, player_id: int) -> list[str]:
+        """Get restaurants
+
+        Args:
+            player_id (int): User id
+
+        Returns:
+            list[str]: The names of the user's restaurants.
+        """
+        return await self._read(player_id, self.save_states.load_restaurants, player_id)
+
+    async def load_order_count(self, player_id: int, restaurant: str) -> int:
+        """Get the number of orders of a restaurant
+
+        Args:
+            player_id (int): User id
+            restaurant (str): Restaurant name
+
+        Returns:
+            int: The number of orders (0 if the restaurant didn't get any).
+        """
+        return await self._read(player_id, self.save_states.load_order_count, player_id, restaurant)
+
+    async def load_all_user_states(
+        self,
+        data: dict[str, Any] | None = None,
+        *,
+        projection: dict[str, Any] | None = None,
+        batch_size: int = DB_CURSOR_BATCH_SIZE,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream states, every batch is fetched on the database I/O executor
+
+        Args:
+            data (dict[str, Any] | None, optional): Filter of the states (e.g. {"state.coins": {"$gte": 100}}).
+                Defaults to None, every state.
+            projection (dict[str, Any] | None, optional): The fields to return (e.g. {"player_id": 1}). Defaults to
+                None, returning every field.
+            batch_size (int, optional): States per round trip. Defaults to DB_CURSOR_BATCH_SIZE.
+
+        Yields:
+            dict[str, Any]: The stored states (with the player_id)
+        """
+        await run_in_db_executor(self.save_states.sync)
+        async for state in self.client.iter_all(self.collection, data, projection=projection, batch_size=batch_size):
+            yield state
+
+    async def delete_state(self, player_id: int) -> None:
         """Delete state
 
         Args:
-            player_id (str): State id
+            player_id (int): User id
+
+        Returns:
+            None
+        """
+        await run_in_db_executor(self.save_states.delete_state, player_id)
+
+    async def increment_coins(self, player_id: int, coins: int) -> int:
+        """Add coins to a state (or subtract them, if negative)
+
+        Args:
+            player_id (int): User id
+            coins (int): The amount of coins to add
+
+        Returns:
+            int: The user's coins afterwards.
+        """
+        return await self._run(player_id, self.save_states.increment_coins, player_id, coins)
+
+    async def add_owned_restaurant(self, player_id: int, restaurant: str) -> bool:
+        """Add a restaurant to the ones a state owns
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+
+        Returns:
+            bool: Whether it was added (False if the user already owned it).
+        """
+        return await self._run(player_id, self.save_states.add_owned_restaurant, player_id, restaurant)
+
+    async def increment_order_count(self, player_id: int, restaurant: str) -> int:
+        """Count a completed order of a restaurant in a state
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+
+        Returns:
+            int: The user's number of orders of that restaurant afterwards.
+        """
+        return await self._run(player_id, self.save_states.increment_order_count, player_id, restaurant)
+
+    async def record_order_completion(
+        self,
+        player_id: int,
+        restaurant: str,
+        coins: int,
+        correctness: float,
+        time_taken: float,
+    ) -> int:
+        """Add the coins of a completed order to a state, and count the order
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+            coins (int): The coins gained (negative for a penalty)
+            correctness (float): The correctness of the order, from 0 to 1
+            time_taken (float): Seconds taken to complete the order
+
+        Returns:
+            int: The user's number of orders of that restaurant afterwards.
+        """
+        return await self._run(
+            player_id,
+            self.save_states.record_order_completion,
+            player_id,
+            restaurant,
+            coins,
+            correctness,
+            time_taken,
+        )
+
+    async def purchase_restaurant(self, player_id: int, restaurant: str, price: int) -> bool:
+        """Buy a restaurant, if the state doesn't own it yet and has enough coins
+
+        Args:
+            player_id (int): User id
+            restaurant (str): The restaurant's name
+            price (int): The restaurant's price in coins
+
+        Returns:
+            bool: Whether the restaurant was bought.
+        """
+        return await self._run(player_id, self.save_states.purchase_restaurant, player_id, restaurant, price)
+
+    async def flush(self) -> None:
+        """Write the changes of every changed state to the database
 
         Returns:
             None
         """
-        self.client.delete_one(self.collection, {player_id: player_id})
+        await run_in_db_executor(self.save_states.flush)
@@ -1,6 +1,5 @@
-from sincere_singularities import save_states
-from sincere_singularities.data.savestates import generate_default_state
-from sincere_singularities.utils import RESTAURANT_JSON, RestaurantJsonType
+from sincere_singularities.app import app
+from sincere_singularities.utils import RestaurantJsonType, load_restaurants
 
 
 def get_restaurant_by_name(name: str) -> RestaurantJsonType:
@@ -16,92 +15,36 @@ def get_restaurant_by_name(name: str) -> RestaurantJsonType:
     Returns:
         RestaurantJson: The restaurant.
     """
-    for restaurant in RESTAURANT_JSON:
+    for restaurant in load_restaurants():
         if restaurant.name == name:
             return restaurant
     raise ValueError(f"Restaurant named {name!r} doesn't exist")
 
 
-def get_coins(user_id: int) -> int:
+async def record_order_completion(
+    user_id: int,
+    restaurant: str,
+    coins: int,
+    correctness: float,
+    time_taken: float,
+) -> int:
     """
-    Get the coins that the user has.
+    Add the coins of a completed order to the user, and count the order.
 
     Args:
         user_id (int): The user's ID.
+        restaurant (str): The restaurant's name.
+        coins (int): The coins gained (negative for a penalty).
+        correctness (float): The correctness of the order, from 0 to 1.
+        time_taken (float): Seconds taken to complete the order.
 
     Returns:
-        int: The amount of coins that the user has.
-    """
-    try:
-        return save_states.load_game_state(user_id)["coins"]
-    except (ValueError, KeyError):
-        return 0
-
-
-def add_coins(user_id: int, coins: int) -> None:
-    """
-    Add coins to the user.
-
-    Args:
-        user_id (int): The user's ID.
-        coins (int): The amount of coins to add.
-    """
-    try:
-        state = save_states.load_game_state(user_id)
-    except ValueError:
-        state = generate_default_state()
-
-    state["coins"] += coins
-    save_states.save_game_state(user_id, state)
-
-
-def get_restaurants(user_id: int) -> list[str]:
-    """
-    Get the restaurants' name that the user owns.
-
-    Args:
-        user_id (int): The user's ID.
-
-    Returns:
-        list[str]: The names of the restaurants that the user owns.
-    """
-    try:
-        return save_states.load_game_state(user_id)["restaurants"]
-    except (ValueError, KeyError):
-        return [RESTAURANT_JSON[0].name]
-
-
-def has_restaurant(user_id: int, restaurant_name: str) -> bool:
-    """
-    Returns whether the user owns a restaurant.
-
-    Args:
-        user_id (int): The user's ID
-        restaurant_name (str): The restaurant's name.
-
-    Returns:
-        bool: Whether the user owns that restaurant.
+        int: The number of orders of that restaurant completed afterwards.
     """
-    return restaurant_name in get_restaurants(user_id)
+    return await app.async_save_states.record_order_completion(user_id, restaurant, coins, correctness, time_taken)
 
 
-def add_restaurant(user_id: int, restaurant: str) -> None:
-    """
-    Add a restaurant to the user.
-
-    Args:
-        user_id (int): The user's ID.
-        restaurant (str): The restaurant's name.
-    """
-    try:
-        state = save_states.load_game_state(user_id)
-    except ValueError:
-        state = generate_default_state()
-    state["restaurants"].append(restaurant)
-    save_states.save_game_state(user_id, state)
-
-
-def buy_restaurant(user_id: int, restaurant_name: str) -> None:
+async def buy_restaurant(user_id: int, restaurant_name: str) -> None:
     """
     Buy a restaurant.
 
@@ -115,12 +58,13 @@ def buy_restaurant(user_id: int, restaurant_name: str) -> None:
         ValueError: Raised when the user already owns the restaurant.
         ValueError: Raised when the user doesn't have the coins necessary to buy the restaurant.
     """
-    if has_restaurant(user_id, restaurant_name):
-        # should be disallowed
-        raise ValueError(f"User {user_id} already has restaurant {restaurant_name}!")
     restaurant = get_restaurant_by_name(restaurant_name)
-    if get_coins(user_id) - restaurant.coins < 0:
+    # Checking and buying at once, so overlapping interactions can't spend the same coins twice
+    if await app.async_save_states.purchase_restaurant(user_id, restaurant_name, restaurant.coins):
+        return
+
+    if restaurant_name in await app.async_save_states.load_restaurants(user_id):
         # should be disallowed
-        raise ValueError(f"User {user_id} doesn't have the necessary coins to buy {restaurant_name}!")
-    add_coins(user_id, -restaurant.coins)
-    add_restaurant(user_id, restaurant_name)
+        raise ValueError(f"User {user_id} already has restaurant {restaurant_name}!")
+    # should be disallowed
+    raise ValueError(f"User {user_id} doesn't have the necessary coins to buy {restaurant_name}!")
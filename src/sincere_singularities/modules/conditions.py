@@ -94,7 +94,7 @@ class ConditionManager:
         while self.order_queue.running:
             # Choose a random restaurant
             assert self.restaurants
-            restaurant = random.choice(self.restaurants.restaurants)
+            restaurant = random.choice(self.restaurants.owned_restaurants())
 
             spawn_sleep_seconds = random.randint(
                 *CONDITION_FREQUENCIES[self.order_queue.order_generators[restaurant.name].difficulty]
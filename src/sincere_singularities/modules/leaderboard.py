@@ -0,0 +1,37 @@
+import disnake
+
+from sincere_singularities.app import app
+from sincere_singularities.data.leaderboard import LEADERBOARD_SIZE
+
+# The medals of the first three ranks
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+async def create_leaderboard_embed(user_id: int, size: int = LEADERBOARD_SIZE) -> disnake.Embed:
+    """
+    Create the embed of the leaderboard, with the rank of the user.
+
+    Args:
+        user_id (int): The ID of the user who asked for the leaderboard.
+        size (int, optional): The amount of players shown. Defaults to LEADERBOARD_SIZE.
+
+    Returns:
+        disnake.Embed: The embed.
+    """
+    top = await app.async_leaderboard.top(size)
+    lines = [
+        f"{MEDALS.get(entry.rank, f'**{entry.rank}.**')} <@{entry.player_id}> - {entry.coins} coins" for entry in top
+    ]
+    embed = disnake.Embed(
+        title="🏆 Leaderboard 🏆",
+        description="\n".join(lines) or "Nobody has played yet!",
+        colour=disnake.Color.gold(),
+    )
+
+    try:
+        rank = await app.async_leaderboard.rank(user_id)
+    except ValueError:
+        embed.set_footer(text="Start the game to join the leaderboard!")
+    else:
+        embed.set_footer(text=f"Your rank: {rank}")
+    return embed
@@ -9,7 +9,6 @@ from typing import TYPE_CHECKING
 import disnake
 from disnake import ButtonStyle, MessageInteraction, ModalInteraction, TextInputStyle
 
-from sincere_singularities.modules.coins import add_coins, get_coins
 from sincere_singularities.utils import DISNAKE_COLORS
 
 if TYPE_CHECKING:
@@ -332,14 +331,9 @@ class OrderView(disnake.ui.View):
             raise KeyError(f"order with ID {self.order.customer_information.order_id} doesn't exist")
 
         # Calculating correctness
-        correctness = self.restaurant.check_order(self.order, correct_order)
+        correctness = await self.restaurant.check_order(self.order, correct_order)
         coins = round(correctness * 10)  # 100% -> 10p
 
-        # Discarding Order in Background
-        task = asyncio.create_task(self.restaurant.order_queue.discard_order(self.order.customer_information.order_id))
-        background_tasks.add(task)
-        task.add_done_callback(background_tasks.discard)
-
         # Checking how long order completion took
         time_taken = (datetime.now(tz=UTC) - correct_order.order_timestamp).total_seconds()
         bonus_seconds = 60
@@ -351,19 +345,29 @@ class OrderView(disnake.ui.View):
             coins -= 5
             completion_message = "You've took to long to complete the order and receive a 5 coins penalty! \n"
 
-        add_coins(interaction.user.id, coins)
+        session = self.restaurant.restaurants.session
+        orders = await session.record_order_completion(self.restaurant.name, coins, correctness, time_taken)
+
+        # Discarding Order in Background
+        task = asyncio.create_task(
+            self.restaurant.order_queue.discard_order(self.order.customer_information.order_id, orders)
+        )
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
 
         # Adding info to embed
-        embed = self.restaurant.restaurants.embeds[0]
+        view = self.restaurant.restaurants.create_view()
+        # Copying, so the info isn't shown when coming back to the first restaurant
+        embed = view.embeds[0].copy()
         embed.insert_field_at(index=0, name=" ", value=" ", inline=False)
         embed.insert_field_at(
             index=1,
             name=":loudspeaker: :white_check_mark: Info :white_check_mark: :loudspeaker:",
             value=f"**Order placed successfully! Correctness: {format(correctness * 100, '.2f')}%.\n"
-            f"{completion_message}You gained {coins} coins; you now have {get_coins(interaction.user.id)}!**",
+            f"{completion_message}You gained {coins} coins; you now have {session.coins}!**",
             inline=False,
         )
-        await interaction.response.edit_message(embed=embed, view=self.restaurant.restaurants.view)
+        await interaction.response.edit_message(embed=embed, view=view)
 
     @disnake.ui.button(label="Show conditions", style=disnake.ButtonStyle.secondary, row=2)
     async def _show_conditions(self, _: disnake.ui.Button, interaction: disnake.MessageInteraction) -> None:
@@ -3,8 +3,7 @@ import string
 from datetime import UTC, datetime, timedelta
 from enum import Enum, auto
 
-from faker import Faker
-
+from sincere_singularities.app import app
 from sincere_singularities.data.extra_wishes import EXTRA_WISHES_WITH_ADDITIONS
 from sincere_singularities.data.intros_outros import INTROS, OUTROS
 from sincere_singularities.data.noise import NOISE
@@ -76,8 +75,6 @@ CUSTOMER_INFORMATION_PROBABILITY = {
     },
 }
 
-fake = Faker()
-
 
 def _generate_delivery_time() -> str:
     # Get the current time
@@ -86,8 +83,22 @@ def _generate_delivery_time() -> str:
     random_hour_increment = random.randint(30, 120)
     time = now + timedelta(minutes=random_hour_increment)
 
+    return describe_delivery_time(time, random.random())
+
+
+def describe_delivery_time(time: datetime, format_probability: float) -> str:
+    """
+    Describe a delivery time in one of the formats customers use.
+
+    Args:
+        time (datetime): The delivery time.
+        format_probability (float): A random value [0, 1) which chooses the format.
+
+    Returns:
+        str: The description of the delivery time (e.g. `19:00`, `07:00 pm`, `07 o'clock` or `7 in the evening`).
+    """
     # Match-case statement to generate the corresponding time description (With Probabilities weight)
-    match random.random():
+    match format_probability:
         case p if p < 0.35:
             # 24-hour format (e.g. 19:00)
             time_description = time.strftime("%H:%M")
@@ -154,9 +165,9 @@ class OrderGenerator:
             # Getting a Random 4 Char OrderID
             order_id="".join(random.sample(ORDER_ID_CHARS, 4)),
             # Random (Faker) Name
-            name=fake.name(),
+            name=app.faker.name(),
             # Random (Faker) Address Format: `Number StreetName`
-            address=fake.street_address(),
+            address=app.faker.street_address(),
             # Randomly Formatted Delivery Time if applicable
             delivery_time=_generate_delivery_time() if has_delivery_time else "",
             # Random Extra Wish if applicable
@@ -16,66 +16,27 @@ from disnake import (
 )
 from disnake.ext.commands.errors import CommandInvokeError
 
-from sincere_singularities import save_states
-from sincere_singularities.data.savestates import generate_default_state
-from sincere_singularities.modules.coins import has_restaurant
 from sincere_singularities.modules.order import Order
 from sincere_singularities.modules.order_generator import Difficulty, OrderGenerator
-from sincere_singularities.utils import (
-    RESTAURANT_JSON,
-    RestaurantsType,
-    generate_random_avatar_url,
-)
-
-
-def get_number_of_orders(user_id: int, restaurant: str) -> int:
-    """
-    Get the number of orders by a user.
-
-    Args:
-        user_id (int): The user's ID.
-        restaurant (str): The restaurant's name.
-
-    Returns:
-        int: The number of orders completed.
-    """
-    try:
-        return save_states.load_game_state(user_id)["number_of_orders"][restaurant]
-    except (ValueError, KeyError):
-        return 0
-
-
-def add_number_of_orders(user_id: int, restaurant: str) -> None:
-    """
-    Add to the number of orders.
-
-    Args:
-        user_id (int): The user's ID.
-        restaurant (str): The restaurant's name.
-    """
-    try:
-        state = save_states.load_game_state(user_id)
-    except ValueError:
-        state = generate_default_state()
-
-    state["number_of_orders"].setdefault(restaurant, 0)
-    state["number_of_orders"][restaurant] += 1
-    save_states.save_game_state(user_id, state)
+from sincere_singularities.modules.session import PlayerSession
+from sincere_singularities.utils import RestaurantJsonType, generate_random_avatar_url
 
 
 class OrderQueue:
     """The class for managing the order queue. Orders can be spawned and deleted from here."""
 
-    def __init__(self, interaction: ApplicationCommandInteraction, webhook: Webhook) -> None:
+    def __init__(self, interaction: ApplicationCommandInteraction, webhook: Webhook, session: PlayerSession) -> None:
         """
         Initialize the order queue.
 
         Args:
             interaction (ApplicationCommandInteraction): The application command interaction.
             webhook (Webhook): The webhook.
+            session (PlayerSession): The user's state during the game.
         """
         self.interaction = interaction
         self.user = interaction.user
+        self.session = session
         self.orders: dict[str, tuple[Order, WebhookMessage]] = {}
         self.running = False
         self.webhook = webhook
@@ -83,12 +44,13 @@ class OrderQueue:
         self.orders_thread: Thread | None = None
 
     @classmethod
-    async def new(cls, interaction: ApplicationCommandInteraction) -> Self | None:
+    async def new(cls, interaction: ApplicationCommandInteraction, session: PlayerSession) -> Self | None:
         """
         Create a new order queue.
 
         Args:
             interaction (ApplicationCommandInteraction): The application command interaction.
+            session (PlayerSession): The user's state during the game.
 
         Returns:
             Self | None: The new order queue, or None if a webhook couldn't be created.
@@ -107,6 +69,7 @@ class OrderQueue:
         return cls(
             interaction=interaction,
             webhook=webhook,
+            session=session,
         )
 
     async def start_orders(self) -> None:
@@ -121,31 +84,26 @@ class OrderQueue:
         await self.orders_thread.add_user(self.interaction.user)
 
         # Spawn 3 Orders at the start, which get refreshed after one order is done
-        for i in range(3):
+        # The user can only gain restaurants, so the restaurants drawn ahead stay owned
+        for i, restaurant in enumerate(self.session.sampler.draw_many(3)):
             # Waiting after first order is sent for more realistic order messages
             if i:
                 await asyncio.sleep(random.randint(5, 15))
-            await self.spawn_order()
+            await self.spawn_order(restaurant)
+
+    async def spawn_order(self, restaurant: RestaurantJsonType | None = None) -> None:
+        """
+        Spawning a new randomly generated order.
 
-    async def spawn_order(self) -> None:
-        """Spawning a new randomly generated order."""
+        Args:
+            restaurant (RestaurantJsonType | None, optional): The restaurant of the order. Defaults to None, a random
+                restaurant the user owns, weighed by their order amounts.
+        """
         if not self.running:
             return
 
-        # Filtering out the Restaurants the user has
-        restaurants: RestaurantsType = [
-            restaurant for restaurant in RESTAURANT_JSON if has_restaurant(self.user.id, restaurant.name)
-        ]
-
-        # Calculate the Order Amounts to relative values
-        order_amounts_sum: int = sum(restaurant.order_amount for restaurant in restaurants)
-        relative_order_amounts: list[float] = [
-            restaurant.order_amount / order_amounts_sum for restaurant in restaurants
-        ]
-
-        # Getting a random restaurant weighed by their relative order amounts
-        random_restaurant = random.choices(population=restaurants, weights=relative_order_amounts)[0].name
-        order, order_description = self.order_generators[random_restaurant].generate(random_restaurant)
+        restaurant_name = (restaurant or self.session.sampler.draw()).name
+        order, order_description = self.order_generators[restaurant_name].generate(restaurant_name)
         await self.create_order(order, order_description)
 
     async def create_order(self, order_result: Order, order_message: str) -> None:
@@ -186,19 +144,18 @@ class OrderQueue:
             return order[0]
         return None
 
-    async def discard_order(self, order_id: str) -> None:
+    async def discard_order(self, order_id: str, orders: int) -> None:
         """
         Discard a specific order by its ID after it's completed.
 
         Args:
             order_id (str): The ID of the order to discard.
+            orders (int): The number of orders of its restaurant completed, including this one.
         """
         order = self.orders[order_id][0]
 
         # Increase difficulty every 10 completed orders
         assert order.restaurant_name
-        add_number_of_orders(self.user.id, order.restaurant_name)
-        orders = get_number_of_orders(self.user.id, order.restaurant_name)
         if orders == 10:
             self.order_generators[order.restaurant_name].difficulty = Difficulty.MEDIUM
         elif orders == 20:
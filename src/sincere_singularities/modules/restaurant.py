@@ -5,11 +5,9 @@ from typing import TYPE_CHECKING
 from disnake import MessageInteraction
 
 from sincere_singularities.modules.order import Order, OrderView
-from sincere_singularities.utils import (
-    RestaurantJsonType,
-    check_pattern_similarity,
-    compare_sentences,
-)
+from sincere_singularities.scoring.executor import ScoringQueueFullError
+from sincere_singularities.scoring.fields import score_order_fields, score_order_fields_async
+from sincere_singularities.utils import RestaurantJsonType
 
 if TYPE_CHECKING:
     from sincere_singularities.modules.order_queue import OrderQueue
@@ -67,7 +65,7 @@ class Restaurant:
         view = OrderView(self)
         await interaction.response.edit_message(embed=view.embed, view=view)
 
-    def check_order(self, order: Order, correct_order: Order) -> float:
+    async def check_order(self, order: Order, correct_order: Order) -> float:
         """
         Checking if the order was correctly placed by the user.
 
@@ -86,41 +84,32 @@ class Restaurant:
         # (Length of menu items + customer information items + 1 for the restaurant)
         score_percentile = 1 / (len(correct_order.foods) + 4 + 1)
 
-        # Subtracting sentiment analysis scores of the customer information
-        # This is achieved using a linear interpolation, meaning if the check gives 1.0, 0.0 will be subtracted from
-        # the score, but when the check gives 0.0, score_percentile will be subtracted
-        correct_customer_information = correct_order.customer_information
-        if not correct_customer_information:
-            raise ValueError("missing correct_order.customer_information")
-        customer_information = order.customer_information
-        if not customer_information:
-            raise ValueError("missing order.customer_information")
-
         # Restaurant
         if correct_order.restaurant_name != order.restaurant_name:
             score -= score_percentile
 
+        # Scoring the customer information in one pass, the text fields batched with the other game sessions
+        try:
+            field_scores = await score_order_fields_async(order, correct_order)
+        except (TimeoutError, ScoringQueueFullError):
+            # The scoring workers are overloaded, fall back to the cheap pattern matching
+            field_scores = score_order_fields(order, correct_order, semantic=False)
+
+        # Subtracting the scores of the customer information
+        # This is achieved using a linear interpolation, meaning if the check gives 1.0, 0.0 will be subtracted from
+        # the score, but when the check gives 0.0, score_percentile will be subtracted
+
         # Customer name
-        name_check = check_pattern_similarity(correct_customer_information.address, customer_information.address)
-        score -= score_percentile + (-score_percentile * name_check)
+        score -= score_percentile + (-score_percentile * field_scores.name)
 
         # Customer address
-        address_check = check_pattern_similarity(correct_customer_information.address, customer_information.address)
-        score -= score_percentile + (-score_percentile * address_check)
+        score -= score_percentile + (-score_percentile * field_scores.address)
 
         # Delivery time
-        delivery_time_check = compare_sentences(
-            correct_customer_information.delivery_time,
-            customer_information.delivery_time,
-        )
-        score -= score_percentile + (-score_percentile * delivery_time_check)
+        score -= score_percentile + (-score_percentile * field_scores.delivery_time)
 
         # Extra wish
-        extra_wish_check = compare_sentences(
-            correct_customer_information.extra_wish,
-            customer_information.extra_wish,
-        )
-        score -= score_percentile + (-score_percentile * extra_wish_check)
+        score -= score_percentile + (-score_percentile * field_scores.extra_wish)
 
         # Now we can subtract score coins for each wrong order
         # Getting every order item
@@ -1,17 +1,13 @@
 import random
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Self
 
 import disnake
 
-from sincere_singularities.modules.coins import (
-    buy_restaurant,
-    get_coins,
-    has_restaurant,
-)
 from sincere_singularities.modules.order_queue import OrderQueue
 from sincere_singularities.modules.restaurant import Restaurant
-from sincere_singularities.utils import DISNAKE_COLORS, RESTAURANT_JSON
+from sincere_singularities.modules.session import PlayerSession
+from sincere_singularities.utils import DISNAKE_COLORS, load_restaurants
 
 if TYPE_CHECKING:
     from sincere_singularities.modules.conditions import ConditionManager
@@ -20,7 +16,7 @@ if TYPE_CHECKING:
 class RestaurantPurchaseView(disnake.ui.View):
     """View subclass for buying a restaurant."""
 
-    def __init__(self, user_id: int, restaurant: Restaurant, parent: "RestaurantsView") -> None:
+    def __init__(self, user_id: int, restaurant: Restaurant, parent: "RestaurantsView", coins: int) -> None:
         """
         Initialize a the restaurant purchase view.
 
@@ -28,20 +24,23 @@ class RestaurantPurchaseView(disnake.ui.View):
             user_id (int): The user's ID.
             restaurant (Restaurant): The restaurant.
             parent (RestaurantsView): The restaurants view.
+            coins (int): The amount of coins that the user has.
         """
         super().__init__(timeout=None)
         self.user_id = user_id
         self.restaurant = restaurant
         self.parent = parent
         # Disable the buy button if the used doesn't have enough coins.
-        if get_coins(user_id) < restaurant.coins:
+        if coins < restaurant.coins:
             self._buy.disabled = True
 
     @disnake.ui.button(label="Buy", style=disnake.ButtonStyle.success)
     async def _buy(self, _: disnake.ui.Button, interaction: disnake.MessageInteraction) -> None:
-        buy_restaurant(self.user_id, self.restaurant.name)
-        self.parent.update_state()
-        await interaction.response.edit_message(view=self.parent, embed=self.parent.embeds[self.parent.index])
+        await self.parent.restaurants.session.buy_restaurant(self.restaurant.name)
+        # Recreating the restaurants view, as the embeds show which restaurants the user owns
+        self.parent.stop()
+        view = RestaurantsView.new(self.parent.restaurants, self.parent.index)
+        await interaction.response.edit_message(view=view, embed=view.embeds[view.index])
 
     @disnake.ui.button(label="Cancel", style=disnake.ButtonStyle.secondary)
     async def _cancel(self, _: disnake.ui.Button, interaction: disnake.MessageInteraction) -> None:
@@ -51,39 +50,50 @@ class RestaurantPurchaseView(disnake.ui.View):
 class RestaurantsView(disnake.ui.View):
     """View subclass for choosing the restaurant."""
 
-    def __init__(self, restaurants: "Restaurants", index: int = 0) -> None:
+    def __init__(self, restaurants: "Restaurants", embeds: list[disnake.Embed], index: int = 0) -> None:
         """
-        Initialize the restaurants view.
+        Initialize the restaurants view. Use `RestaurantsView.new` to also show the user's state.
 
         Args:
             restaurants (Restaurants): The restaurants.
+            embeds (list[disnake.Embed]): The embeds of the restaurants (on the restaurant selection screen).
             index (int, optional): The index to start from. Defaults to 0.
         """
         super().__init__(timeout=None)
         self.restaurants = restaurants
+        self.embeds = embeds
         self.index = index
 
         # Sets the footer of the embeds with their respective page numbers.
         for i, embed in enumerate(self.embeds):
             embed.set_footer(text=f"Restaurant {i + 1} of {len(self.embeds)}")
 
-        self.update_state()
+    @classmethod
+    def new(cls, restaurants: "Restaurants", index: int = 0) -> Self:
+        """
+        Create a new restaurants view.
 
-    @property
-    def embeds(self) -> list[disnake.Embed]:
-        """list[disnake.Embed]: The embeds of the restaurants (on the restaurant selection screen)."""
-        return self.restaurants.embeds
+        Args:
+            restaurants (Restaurants): The restaurants.
+            index (int, optional): The index to start from. Defaults to 0.
+
+        Returns:
+            Self: The new restaurants view.
+        """
+        view = cls(restaurants, restaurants.create_embeds(), index)
+        view.update_state()
+        return view
 
     def update_state(self) -> None:
         """Updating the State of the RestaurantsView"""
         # Disable previous/next button for first/last embeds
         self._prev_page.disabled = self.index == 0
         self._next_page.disabled = self.index == len(self.embeds) - 1
-        if has_restaurant(self.restaurants.interaction.user.id, self.restaurants.all_restaurants[self.index].name):
+        if self.restaurants.session.has_restaurant(self.restaurants.all_restaurants[self.index].name):
             self._enter_restaurant.label = "Enter restaurant"
         else:
             self._enter_restaurant.label = "Buy"
-        coins = get_coins(self.restaurants.interaction.user.id)
+        coins = self.restaurants.session.coins
         description = self.embeds[self.index].description
         assert description
         self.embeds[self.index].description = re.sub(r"you have \d+", f"you have {coins}", description)
@@ -100,8 +110,8 @@ class RestaurantsView(disnake.ui.View):
         # Find restaurant based on current index
         restaurant = self.restaurants.all_restaurants[self.index]
         # Show purchase view if the user doesn't own the restaurant
-        if not has_restaurant(interaction.user.id, restaurant.name):
-            user_coins = get_coins(interaction.user.id)
+        if not self.restaurants.session.has_restaurant(restaurant.name):
+            user_coins = self.restaurants.session.coins
             if user_coins < restaurant.coins:
                 embed_title = "You do not have enough coins to buy this restaurant."
                 embed_description = (
@@ -116,7 +126,7 @@ class RestaurantsView(disnake.ui.View):
                 )
 
             await interaction.response.edit_message(
-                view=RestaurantPurchaseView(interaction.user.id, restaurant, self),
+                view=RestaurantPurchaseView(interaction.user.id, restaurant, self, user_coins),
                 embed=disnake.Embed(
                     title=embed_title,
                     description=embed_description,
@@ -156,6 +166,7 @@ class Restaurants:
         interaction: disnake.ApplicationCommandInteraction,
         order_queue: OrderQueue,
         condition_manager: "ConditionManager",
+        session: PlayerSession,
     ) -> None:
         """
         Initialize the restaurants.
@@ -164,31 +175,43 @@ class Restaurants:
             interaction (disnake.ApplicationCommandInteraction): The Disnake application command interaction.
             order_queue (OrderQueue): The order queue.
             condition_manager (ConditionManager): The condition manager.
+            session (PlayerSession): The user's state during the game.
         """
         self.interaction = interaction
         self.order_queue: OrderQueue = order_queue
         self.condition_manager = condition_manager
+        self.session = session
 
-    @property
-    def view(self) -> RestaurantsView:
-        """RestaurantsView: The view object for the restaurants."""
-        return RestaurantsView(self)
+    def create_view(self) -> RestaurantsView:
+        """
+        Create the view object for the restaurants.
+
+        Returns:
+            RestaurantsView: The view.
+        """
+        return RestaurantsView.new(self)
+
+    def create_embeds(self) -> list[disnake.Embed]:
+        """
+        Create the embeds of the restaurants (on the restaurant selection screen).
+
+        Returns:
+            list[disnake.Embed]: The embeds.
+        """
+        coins = self.session.coins
 
-    @property
-    def embeds(self) -> list[disnake.Embed]:
-        """list[disnake.Embed]: The embeds of the restaurants (on the restaurant selection screen)."""
         # Generate embeds from restaurants
         embeds: list[disnake.Embed] = []
 
-        for restaurant in RESTAURANT_JSON:
-            if has_restaurant(self.interaction.user.id, restaurant.name):
+        for restaurant in load_restaurants():
+            if self.session.has_restaurant(restaurant.name):
                 own = "You own this restaurant."
             else:
                 own = ":lock: You don't own this restaurant."
             embed = disnake.Embed(
                 title=f"{restaurant.icon} {restaurant.name} {restaurant.icon}",
                 description=f"{restaurant.description} \n**Required coins**: {restaurant.coins}"
-                f" (you have {get_coins(self.interaction.user.id)})\n{own}",
+                f" (you have {coins})\n{own}",
                 colour=DISNAKE_COLORS.get(restaurant.icon, disnake.Color.random()),
             )
             # Setting Embed Author
@@ -221,18 +244,18 @@ class Restaurants:
 
         return embeds
 
-    @property
-    def restaurants(self) -> list[Restaurant]:
-        """list[Restaurant]: The restaurants that the user owns, each restaurant is initialized via its JSON."""
+    def owned_restaurants(self) -> list[Restaurant]:
+        """
+        Get the restaurants that the user owns.
+
+        Returns:
+            list[Restaurant]: The restaurants, each restaurant is initialized via its JSON.
+        """
         # Creating Restaurant Objects Based on the Data
-        return [
-            Restaurant(self, restaurant)
-            for restaurant in RESTAURANT_JSON
-            if has_restaurant(self.interaction.user.id, restaurant.name)
-        ]
+        return [Restaurant(self, restaurant) for restaurant in self.session.restaurants]
 
     @property
     def all_restaurants(self) -> list[Restaurant]:
         """list[Restaurant]: The restaurants list, each restaurant is initialized via its JSON."""
         # Creating Restaurant Objects Based on the Data
-        return [Restaurant(self, restaurant) for restaurant in RESTAURANT_JSON]
+        return [Restaurant(self, restaurant) for restaurant in load_restaurants()]
@@ -0,0 +1,202 @@
+import random
+from typing import Self
+
+from sincere_singularities.app import app
+from sincere_singularities.data.savestates import State, generate_default_state
+from sincere_singularities.modules.coins import buy_restaurant, get_restaurant_by_name, record_order_completion
+from sincere_singularities.utils import RestaurantJsonType, RestaurantsType, load_restaurants
+
+
+class RestaurantSampler:
+    """
+    Draws restaurants at random, weighted by their order amounts.
+
+    The weights are precomputed into an alias table (Vose's method), so a draw costs two random numbers however many
+    restaurants there are. The table is built once for a set of restaurants, build a new sampler when it changes.
+    """
+
+    def __init__(self, restaurants: RestaurantsType) -> None:
+        """
+        Initialize the sampler, building its alias table.
+
+        Args:
+            restaurants (RestaurantsType): The restaurants to draw from.
+
+        Raises:
+            ValueError: Raised when no restaurant has a positive order amount.
+        """
+        total = sum(restaurant.order_amount for restaurant in restaurants)
+        if total <= 0:
+            raise ValueError("Can't draw from restaurants without orders")
+        self.restaurants = restaurants
+
+        # Scaling the weights so that they average 1, then pairing every column below 1 with one above it
+        scaled = [restaurant.order_amount * len(restaurants) / total for restaurant in restaurants]
+        self._probabilities = [1.0] * len(restaurants)
+        self._aliases = list(range(len(restaurants)))
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # The remaining columns are full, up to rounding errors
+
+    def draw(self) -> RestaurantJsonType:
+        """
+        Draw a restaurant.
+
+        Returns:
+            RestaurantJsonType: The restaurant.
+        """
+        index = random.randrange(len(self.restaurants))
+        if random.random() >= self._probabilities[index]:
+            index = self._aliases[index]
+        return self.restaurants[index]
+
+    def draw_many(self, amount: int) -> RestaurantsType:
+        """
+        Draw restaurants independently, e.g. to generate several orders ahead.
+
+        Args:
+            amount (int): The amount of restaurants.
+
+        Returns:
+            RestaurantsType: The restaurants, with repetitions.
+        """
+        return [self.draw() for _ in range(amount)]
+
+
+class PlayerSession:
+    """
+    The state of a player during a game, kept in memory.
+
+    It's loaded once when the game starts. The game then changes the state only through the session: completing an
+    order and buying a restaurant save the change, and apply it to the session's copy. So spawning orders and showing
+    the restaurants read the session instead of loading the state again.
+    """
+
+    def __init__(self, user_id: int, state: State) -> None:
+        """
+        Initialize the session. Use `PlayerSession.new` to load the user's state.
+
+        Args:
+            user_id (int): The user's ID.
+            state (State): The user's state.
+        """
+        self.user_id = user_id
+        self.coins = state["coins"]
+        self.number_of_orders: dict[str, int] = dict(state["number_of_orders"])
+        self.restaurant_names: set[str] = set(state["restaurants"])
+        # The owned restaurants, in the order of `restaurants.json`
+        self.restaurants: RestaurantsType = []
+        # Draws the restaurant of the next order, rebuilt when the owned restaurants change
+        self.sampler: RestaurantSampler
+        self._update_restaurants()
+
+    @classmethod
+    async def new(cls, user_id: int) -> Self:
+        """
+        Create a new session, loading the user's state.
+
+        Args:
+            user_id (int): The user's ID.
+
+        Returns:
+            Self: The new session.
+        """
+        return cls(user_id, await cls._load_state(user_id))
+
+    @staticmethod
+    async def _load_state(user_id: int) -> State:
+        try:
+            return await app.async_save_states.load_game_state(user_id)
+        except (ValueError, KeyError):
+            # The state of a new player is written with their first change
+            return generate_default_state()
+
+    def _update_restaurants(self) -> None:
+        self.restaurants = [
+            restaurant for restaurant in load_restaurants() if restaurant.name in self.restaurant_names
+        ]
+        self.sampler = RestaurantSampler(self.restaurants)
+
+    async def refresh(self) -> None:
+        """Load the user's state again, e.g. after it was changed by another game of the user."""
+        state = await self._load_state(self.user_id)
+        self.coins = state["coins"]
+        self.number_of_orders = dict(state["number_of_orders"])
+        if set(state["restaurants"]) != self.restaurant_names:
+            self.restaurant_names = set(state["restaurants"])
+            self._update_restaurants()
+
+    def has_restaurant(self, restaurant_name: str) -> bool:
+        """
+        Returns whether the user owns a restaurant.
+
+        Args:
+            restaurant_name (str): The restaurant's name.
+
+        Returns:
+            bool: Whether the user owns that restaurant.
+        """
+        return restaurant_name in self.restaurant_names
+
+    def get_number_of_orders(self, restaurant: str) -> int:
+        """
+        Get the number of orders of a restaurant completed by the user.
+
+        Args:
+            restaurant (str): The restaurant's name.
+
+        Returns:
+            int: The number of orders completed.
+        """
+        return self.number_of_orders.get(restaurant, 0)
+
+    async def record_order_completion(
+        self,
+        restaurant: str,
+        coins: int,
+        correctness: float,
+        time_taken: float,
+    ) -> int:
+        """
+        Add the coins of a completed order to the user, and count the order.
+
+        Args:
+            restaurant (str): The restaurant's name.
+            coins (int): The coins gained (negative for a penalty).
+            correctness (float): The correctness of the order, from 0 to 1.
+            time_taken (float): Seconds taken to complete the order.
+
+        Returns:
+            int: The number of orders of that restaurant completed afterwards.
+        """
+        orders = await record_order_completion(self.user_id, restaurant, coins, correctness, time_taken)
+        self.coins += coins
+        self.number_of_orders[restaurant] = orders
+        return orders
+
+    async def buy_restaurant(self, restaurant_name: str) -> None:
+        """
+        Buy a restaurant.
+
+        Args:
+            restaurant_name (str): The restaurant's name.
+
+        Raises:
+            ValueError: Raised when the user already owns the restaurant.
+            ValueError: Raised when the user doesn't have the coins necessary to buy the restaurant.
+        """
+        try:
+            await buy_restaurant(self.user_id, restaurant_name)
+        except ValueError:
+            # The session was out of date, e.g. the user bought it in another game
+            await self.refresh()
+            raise
+        self.coins -= get_restaurant_by_name(restaurant_name).coins
+        self.restaurant_names.add(restaurant_name)
+        self._update_restaurants()
@@ -0,0 +1,174 @@
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from itertools import combinations
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from sincere_singularities.data.extra_wishes import EXTRA_WISHES_WITH_ADDITIONS
+from sincere_singularities.modules.order_generator import describe_delivery_time
+from sincere_singularities.scoring.backends import EMBEDDING_BACKENDS, EmbeddingBackend, create_backend
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# A value for each of the delivery time formats, see `describe_delivery_time`
+DELIVERY_TIME_FORMATS = (0.0, 0.5, 0.8, 0.9)
+
+
+@dataclass(frozen=True, slots=True)
+class BackendReport:
+    """The accuracy and latency of an embedding backend, compared to the reference backend."""
+
+    name: str
+    # Absolute differences of the pair similarities to the reference backend
+    mean_error: float
+    max_error: float
+    # The share of customer phrasings of extra wishes whose closest canonical wish is the same as with the reference
+    wish_agreement: float
+    # Seconds per encode call of a single order's sentence pair
+    mean_latency: float
+    p95_latency: float
+    # Seconds for encoding every sentence of the report in one call
+    batch_latency: float
+
+
+def delivery_time_pairs() -> list[tuple[str, str]]:
+    """
+    Generate delivery time pairs like they are compared in the game.
+
+    Every pair of formats of the same time is included, as well as pairs of times that are two hours apart.
+
+    Returns:
+        list[tuple[str, str]]: The delivery time pairs.
+    """
+    pairs: list[tuple[str, str]] = []
+    start = datetime(2024, 7, 1, tzinfo=UTC)
+    for minutes in range(0, 24 * 60, 45):
+        time = start + timedelta(minutes=minutes)
+        other_time = time + timedelta(hours=2)
+        descriptions = [describe_delivery_time(time, format_value) for format_value in DELIVERY_TIME_FORMATS]
+        other_descriptions = [
+            describe_delivery_time(other_time, format_value) for format_value in DELIVERY_TIME_FORMATS
+        ]
+        pairs.extend(combinations(descriptions, 2))
+        pairs.extend(zip(descriptions, other_descriptions, strict=True))
+        pairs.append(("", descriptions[0]))
+    return pairs
+
+
+def extra_wish_pairs() -> list[tuple[str, str]]:
+    """
+    Generate extra wish pairs like they are compared in the game.
+
+    Every canonical wish is paired with its own customer phrasing and with the phrasing of another wish.
+
+    Returns:
+        list[tuple[str, str]]: The extra wish pairs.
+    """
+    wishes = list(EXTRA_WISHES_WITH_ADDITIONS.items())
+    pairs: list[tuple[str, str]] = []
+    for index, (wish, addition) in enumerate(wishes):
+        other_addition = wishes[(index + 1) % len(wishes)][1]
+        pairs.extend(((wish, addition), (wish, other_addition), ("", wish)))
+    return pairs
+
+
+def _similarities(backend: EmbeddingBackend, pairs: list[tuple[str, str]]) -> npt.NDArray[np.float32]:
+    sentences = list(dict.fromkeys(sentence for pair in pairs for sentence in pair))
+    sentence_indexes = {sentence: index for index, sentence in enumerate(sentences)}
+    embeddings = backend.encode(sentences)
+    return np.array(
+        [embeddings[sentence_indexes[first]] @ embeddings[sentence_indexes[second]] for first, second in pairs]
+    )
+
+
+def _closest_wishes(backend: EmbeddingBackend) -> npt.NDArray[np.intp]:
+    wish_embeddings = backend.encode(list(EXTRA_WISHES_WITH_ADDITIONS.keys()))
+    addition_embeddings = backend.encode(list(EXTRA_WISHES_WITH_ADDITIONS.values()))
+    closest_wishes: npt.NDArray[np.intp] = np.argmax(addition_embeddings @ wish_embeddings.T, axis=1)
+    return closest_wishes
+
+
+def _latencies(backend: EmbeddingBackend, pairs: list[tuple[str, str]], repeats: int) -> list[float]:
+    latencies = []
+    for _ in range(repeats):
+        for pair in pairs:
+            start = time.perf_counter()
+            backend.encode(pair)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def compare_backends(
+    model: "SentenceTransformer",
+    reference: str = "torch",
+    repeats: int = 3,
+) -> list[BackendReport]:
+    """
+    Compare every embedding backend to the reference backend on the game's delivery time and extra wish strings.
+
+    Args:
+        model (SentenceTransformer): The sentence transformer.
+        reference (str, optional): The name of the reference backend. Defaults to "torch".
+        repeats (int, optional): How often the latency measurements are repeated. Defaults to 3.
+
+    Returns:
+        list[BackendReport]: A report for each backend (including the reference).
+    """
+    pairs = delivery_time_pairs() + extra_wish_pairs()
+    sentences = list(dict.fromkeys(sentence for pair in pairs for sentence in pair))
+
+    reference_backend = create_backend(reference, model)
+    reference_similarities = _similarities(reference_backend, pairs)
+    reference_closest_wishes = _closest_wishes(reference_backend)
+
+    reports = []
+    for name in EMBEDDING_BACKENDS:
+        backend = reference_backend if name == reference else create_backend(name, model)
+        # Warm up
+        backend.encode(sentences[:8])
+
+        errors = np.abs(_similarities(backend, pairs) - reference_similarities)
+        latencies = _latencies(backend, pairs, repeats)
+        start = time.perf_counter()
+        backend.encode(sentences)
+        batch_latency = time.perf_counter() - start
+
+        reports.append(
+            BackendReport(
+                name=name,
+                mean_error=float(errors.mean()),
+                max_error=float(errors.max()),
+                wish_agreement=float(np.mean(_closest_wishes(backend) == reference_closest_wishes)),
+                mean_latency=statistics.fmean(latencies),
+                p95_latency=statistics.quantiles(latencies, n=100)[94],
+                batch_latency=batch_latency,
+            )
+        )
+    return reports
+
+
+def format_reports(reports: list[BackendReport]) -> str:
+    """
+    Format backend reports as a table.
+
+    Args:
+        reports (list[BackendReport]): The reports.
+
+    Returns:
+        str: The table.
+    """
+    lines = [
+        f"{'backend':<10}{'mean error':>12}{'max error':>12}{'wish agreement':>16}"
+        f"{'mean ms':>10}{'p95 ms':>10}{'batch ms':>10}"
+    ]
+    lines.extend(
+        f"{report.name:<10}{report.mean_error:>12.4f}{report.max_error:>12.4f}{report.wish_agreement:>16.1%}"
+        f"{report.mean_latency * 1000:>10.2f}{report.p95_latency * 1000:>10.2f}{report.batch_latency * 1000:>10.1f}"
+        for report in reports
+    )
+    return "\n".join(lines)
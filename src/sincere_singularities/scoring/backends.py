@@ -0,0 +1,126 @@
+import copy
+import os
+from collections.abc import Callable, Hashable, Sequence
+from typing import TYPE_CHECKING, Protocol, cast
+
+import numpy as np
+import numpy.typing as npt
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+load_dotenv()
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND") or "torch"
+
+Embeddings = npt.NDArray[np.float32]
+
+
+class EmbeddingBackend(Hashable, Protocol):
+    """A way of running the sentence transformer to encode sentences."""
+
+    name: str
+
+    def encode(self, sentences: Sequence[str]) -> Embeddings:
+        """
+        Encode sentences into normalized embeddings.
+
+        Args:
+            sentences (Sequence[str]): The sentences to encode.
+
+        Returns:
+            Embeddings: One normalized embedding (row) per sentence.
+        """
+        ...
+
+
+class TorchBackend:
+    """Full precision inference of the sentence transformer with torch."""
+
+    name = "torch"
+
+    def __init__(self, model: "SentenceTransformer") -> None:
+        """
+        Initialize the torch backend.
+
+        Args:
+            model (SentenceTransformer): The sentence transformer.
+        """
+        self.model = model
+
+    def encode(self, sentences: Sequence[str]) -> Embeddings:
+        """
+        Encode sentences into normalized embeddings.
+
+        Args:
+            sentences (Sequence[str]): The sentences to encode.
+
+        Returns:
+            Embeddings: One normalized embedding (row) per sentence.
+        """
+        return cast(Embeddings, self.model.encode(list(sentences), normalize_embeddings=True))
+
+
+class QuantizedBackend(TorchBackend):
+    """CPU inference of the sentence transformer with its linear layers dynamically quantized to int8."""
+
+    name = "int8"
+
+    def __init__(self, model: "SentenceTransformer") -> None:
+        """
+        Initialize the quantized backend. The model itself is left untouched, a quantized copy is made.
+
+        Args:
+            model (SentenceTransformer): The sentence transformer.
+        """
+        # Imported here, because importing torch alone takes seconds
+        import torch
+
+        # Quantized kernels only run on the CPU
+        cpu_model = copy.deepcopy(model).to("cpu")
+        quantized_model = torch.ao.quantization.quantize_dynamic(  # type: ignore[no-untyped-call]
+            cpu_model,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+        )
+        super().__init__(quantized_model)
+
+    def encode(self, sentences: Sequence[str]) -> Embeddings:
+        """
+        Encode sentences into normalized embeddings.
+
+        Args:
+            sentences (Sequence[str]): The sentences to encode.
+
+        Returns:
+            Embeddings: One normalized embedding (row) per sentence.
+        """
+        return cast(Embeddings, self.model.encode(list(sentences), normalize_embeddings=True, device="cpu"))
+
+
+EMBEDDING_BACKENDS: dict[str, Callable[["SentenceTransformer"], EmbeddingBackend]] = {
+    TorchBackend.name: TorchBackend,
+    QuantizedBackend.name: QuantizedBackend,
+}
+
+
+def create_backend(name: str, model: "SentenceTransformer") -> EmbeddingBackend:
+    """
+    Create an embedding backend by its name.
+
+    Args:
+        name (str): The name of the backend (see EMBEDDING_BACKENDS).
+        model (SentenceTransformer): The sentence transformer.
+
+    Raises:
+        ValueError: Raised when there's no backend with that name.
+
+    Returns:
+        EmbeddingBackend: The backend.
+    """
+    try:
+        backend_type = EMBEDDING_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Embedding backend named {name!r} doesn't exist") from None
+    return backend_type(model)
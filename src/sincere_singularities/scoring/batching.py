@@ -0,0 +1,182 @@
+import asyncio
+import os
+import statistics
+from collections import Counter
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+
+from sincere_singularities.scoring.backends import Embeddings
+from sincere_singularities.scoring.cache import embedding_cache, trivial_similarity
+from sincere_singularities.scoring.executor import ScoringExecutor, scoring_executor
+from sincere_singularities.scoring.model import minilm_model
+from sincere_singularities.utils import check_pattern_similarity, encode_sentences
+
+load_dotenv()
+
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE") or 32)
+SCORING_BATCH_WINDOW_MS = float(os.getenv("SCORING_BATCH_WINDOW_MS") or 5)
+
+# This global set is used to ensure that a (non-weak) reference is kept to background tasks created that aren't
+# awaited. These tasks get added to this set, then once they're done, they remove themselves.
+# See RUF006
+background_tasks: set[asyncio.Task[None]] = set()
+
+
+@dataclass
+class BatchingMetrics:
+    """The batch sizes the sentence batcher achieved."""
+
+    batches: int = 0
+    requests: int = 0
+    # Maps each batch size to the amount of batches that had that size
+    batch_sizes: Counter[int] = field(default_factory=Counter)
+
+    @property
+    def average_batch_size(self) -> float:
+        """float: The average amount of sentences per batch."""
+        return self.requests / self.batches if self.batches else 0.0
+
+    @property
+    def median_batch_size(self) -> float:
+        """float: The median amount of sentences per batch."""
+        if not self.batch_sizes:
+            return 0.0
+        return statistics.median(self.batch_sizes.elements())
+
+
+class SentenceBatcher:
+    """
+    Collects the sentences to encode from all game sessions and encodes them together.
+
+    Sentences are gathered for a short window (or until the batch is full) and then encoded in a single forward pass
+    of the sentence transformer in the scoring executor.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = SCORING_BATCH_SIZE,
+        window_ms: float = SCORING_BATCH_WINDOW_MS,
+        executor: ScoringExecutor = scoring_executor,
+    ) -> None:
+        """
+        Initialize the sentence batcher.
+
+        Args:
+            max_batch_size (int, optional): The maximum amount of sentences per batch.
+                Defaults to SCORING_BATCH_SIZE.
+            window_ms (float, optional): How long to collect requests for in milliseconds.
+                Defaults to SCORING_BATCH_WINDOW_MS.
+            executor (ScoringExecutor, optional): The executor the batches are run in. Defaults to scoring_executor.
+        """
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.executor = executor
+        self.metrics = BatchingMetrics()
+        self._pending: list[tuple[str, asyncio.Future[Embeddings]]] = []
+        self._window_task: asyncio.Task[None] | None = None
+
+    async def encode(self, sentence: str) -> Embeddings:
+        """
+        Encode a sentence into a normalized embedding, together with the other pending sentences.
+
+        Args:
+            sentence (str): The sentence.
+
+        Raises:
+            ModelNotReadyError: Raised when the model isn't loaded yet.
+            ScoringQueueFullError: Raised when the scoring executor is full.
+            TimeoutError: Raised when the batch didn't finish within the executor's timeout.
+
+        Returns:
+            Embeddings: The normalized embedding of the sentence.
+        """
+        if (embedding := embedding_cache.get(sentence)) is not None:
+            return embedding
+
+        future: asyncio.Future[Embeddings] = asyncio.get_running_loop().create_future()
+        self._pending.append((sentence, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._window_task is None:
+            self._window_task = asyncio.create_task(self._flush_after_window())
+
+        return await future
+
+    async def compare(self, first: str, second: str) -> float:
+        """
+        Measure of the strings' similarity as a float, encoded together with the other pending sentences.
+
+        Equal strings and pairs with one empty string are scored without the model. While the model is still loading,
+        the strings are compared using pattern matching instead.
+
+        Args:
+            first (str): The first string.
+            second (str): The second string.
+
+        Raises:
+            ScoringQueueFullError: Raised when the scoring executor is full.
+            TimeoutError: Raised when the batch didn't finish within the executor's timeout.
+
+        Returns:
+            float: The similarity of the two strings [0, 1]
+        """
+        if (similarity := trivial_similarity(first, second)) is not None:
+            return similarity
+        if not minilm_model.ready:
+            # The model isn't ready yet, fall back to the cheap lexical comparison
+            return check_pattern_similarity(first, second)
+
+        first_embedding, second_embedding = await asyncio.gather(self.encode(first), self.encode(second))
+        # Cosine Similarity (the dot product of the normalized embeddings)
+        return float(first_embedding @ second_embedding)
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        self._window_task = None
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._window_task is not None:
+            self._window_task.cancel()
+            self._window_task = None
+
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+
+            task = asyncio.create_task(self._encode_batch(batch))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
+    async def _encode_batch(self, batch: list[tuple[str, asyncio.Future[Embeddings]]]) -> None:
+        # The same sentence could be requested multiple times (e.g. empty strings)
+        sentences = list(dict.fromkeys(sentence for sentence, _ in batch))
+        sentence_indexes = {sentence: index for index, sentence in enumerate(sentences)}
+        self.metrics.batches += 1
+        self.metrics.requests += len(sentences)
+        self.metrics.batch_sizes[len(sentences)] += 1
+
+        try:
+            # The sentences were already looked up in the embedding cache by `encode`
+            embeddings = await self.executor.run(encode_sentences, sentences, use_cache=False)
+        except asyncio.CancelledError:
+            # The batch was cancelled (e.g. on shutdown), so are the requests waiting for it
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as err:  # noqa: BLE001
+            # Every waiting request gets the error of the batch
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for sentence, future in batch:
+            # The request could have been cancelled in the meantime
+            if not future.done():
+                future.set_result(embeddings[sentence_indexes[sentence]])
+
+
+sentence_batcher = SentenceBatcher()
@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from sincere_singularities.scoring.backends import Embeddings
+
+load_dotenv()
+
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES") or 16 * 1024 * 1024)
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    Normalize a sentence for caching and comparing. MiniLM is uncased, so this doesn't change its embedding.
+
+    Args:
+        sentence (str): The sentence.
+
+    Returns:
+        str: The casefolded sentence with collapsed whitespace.
+    """
+    return " ".join(sentence.split()).casefold()
+
+
+def trivial_similarity(first: str, second: str) -> float | None:
+    """
+    Get the similarity of two strings if it's obvious without running the model.
+
+    Args:
+        first (str): The first string.
+        second (str): The second string.
+
+    Returns:
+        float | None: 1.0 for equal strings, 0.0 if only one of them is empty, otherwise None.
+    """
+    first, second = normalize_sentence(first), normalize_sentence(second)
+    if first == second:
+        return 1.0
+    if not first or not second:
+        return 0.0
+    return None
+
+
+@dataclass
+class CacheMetrics:
+    """Counters of the embedding cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """float: The share of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class EmbeddingCache:
+    """A least recently used cache of sentence embeddings, keyed by the normalized sentence and limited in memory."""
+
+    def __init__(self, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES) -> None:
+        """
+        Initialize the embedding cache.
+
+        Args:
+            max_bytes (int, optional): The maximum memory of the cached embeddings. Defaults to
+                EMBEDDING_CACHE_MAX_BYTES. 0 disables the cache.
+        """
+        self.max_bytes = max_bytes
+        self.metrics = CacheMetrics()
+        self._entries: OrderedDict[str, Embeddings] = OrderedDict()
+        self._bytes = 0
+        # The cache is used from the event loop as well as the scoring executor's threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """int: The memory of the cached embeddings in bytes."""
+        return self._bytes
+
+    def get(self, sentence: str) -> Embeddings | None:
+        """
+        Get the cached embedding of a sentence.
+
+        Args:
+            sentence (str): The sentence.
+
+        Returns:
+            Embeddings | None: The embedding, or None if it isn't cached.
+        """
+        key = normalize_sentence(sentence)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.metrics.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.metrics.hits += 1
+            return embedding
+
+    def put(self, sentence: str, embedding: Embeddings) -> None:
+        """
+        Cache the embedding of a sentence, evicting the least recently used embeddings if needed.
+
+        Args:
+            sentence (str): The sentence.
+            embedding (Embeddings): The embedding.
+        """
+        if embedding.nbytes > self.max_bytes:
+            return
+        key = normalize_sentence(sentence)
+        with self._lock:
+            if (previous_embedding := self._entries.pop(key, None)) is not None:
+                self._bytes -= previous_embedding.nbytes
+            # Copying, so a row doesn't keep the whole matrix of its batch alive
+            self._entries[key] = embedding.copy()
+            self._bytes += embedding.nbytes
+
+            while self._bytes > self.max_bytes:
+                _, evicted_embedding = self._entries.popitem(last=False)
+                self._bytes -= evicted_embedding.nbytes
+                self.metrics.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached embedding."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+embedding_cache = EmbeddingCache()
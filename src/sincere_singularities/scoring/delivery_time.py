@@ -0,0 +1,143 @@
+import re
+
+MINUTES_PER_DAY = 24 * 60
+# Delivery times that are this many minutes (or more) apart score 0
+DELIVERY_TIME_TOLERANCE_MINUTES = 60
+
+# Candidate intervals of minutes of the day [0, 1439]. There are multiple candidates when the time is ambiguous
+# (e.g. `7 o'clock` can be 7:00 or 19:00).
+DeliveryTime = tuple[tuple[int, int], ...]
+
+TIME_PATTERN = re.compile(
+    r"^(?:at |around )?(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?"
+    r" ?(?:(?P<meridiem>[ap])\.?m\.?)?"
+    r" ?(?P<oclock>o'? ?clock)?"
+    r" ?(?P<period>in the morning|in the afternoon|in the evening|at night|tonight)?$"
+)
+PERIODS = {
+    "morning": (0, 12 * 60 - 1),
+    "afternoon": (12 * 60, 18 * 60 - 1),
+    "evening": (18 * 60, MINUTES_PER_DAY - 1),
+    "night": (18 * 60, MINUTES_PER_DAY - 1),
+    "tonight": (18 * 60, MINUTES_PER_DAY - 1),
+}
+PERIOD_PATTERN = re.compile(rf"^(?:in the |at )?(?P<period>{'|'.join(PERIODS)})$")
+NAMED_TIMES = {
+    "noon": 12 * 60,
+    "midday": 12 * 60,
+    "midnight": 0,
+}
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("\u2019", "'")
+    text = " ".join(text.split())
+    return text.strip(" .,!?")
+
+
+def _exact(minutes: int) -> DeliveryTime:
+    minutes %= MINUTES_PER_DAY
+    return ((minutes, minutes),)
+
+
+def parse_delivery_time(text: str, *, twenty_four_hour: bool = False) -> DeliveryTime | None:
+    """
+    Parse a delivery time into minutes of the day.
+
+    Understands every format the order generator uses (`19:00`, `07:00 pm`, `07 o'clock` and `7 in the evening`),
+    as well as common variations (`7pm`, `7:30 a.m.`, `evening`, `noon`, ...).
+
+    Args:
+        text (str): The delivery time.
+        twenty_four_hour (bool, optional): Whether a time with minutes but without AM/PM is on the 24-hour clock, like
+            the generated ones (`10:30` is in the morning). Defaults to False, a time like that from 1:00 to 12:59
+            without a leading zero could be in the morning or in the evening.
+
+    Returns:
+        DeliveryTime | None: The candidate intervals of the time, or None if it couldn't be parsed.
+    """
+    text = _normalize(text)
+    if text in NAMED_TIMES:
+        return _exact(NAMED_TIMES[text])
+    if period_match := PERIOD_PATTERN.match(text):
+        return (PERIODS[period_match["period"]],)
+
+    time_match = TIME_PATTERN.match(text)
+    if not time_match:
+        return None
+    return _parse_clock_time(time_match, twenty_four_hour=twenty_four_hour)
+
+
+def _parse_clock_time(time_match: re.Match[str], *, twenty_four_hour: bool) -> DeliveryTime | None:
+    hour = int(time_match["hour"])
+    minute = int(time_match["minute"] or 0)
+    if hour > 23 or minute > 59:
+        return None
+
+    meridiem, period = time_match["meridiem"], time_match["period"]
+    if meridiem or period:
+        # 12-hour clock
+        if not 1 <= hour <= 12:
+            return None
+        afternoon = meridiem == "p" if meridiem else period != "in the morning"
+        return _exact((hour % 12 + 12 * afternoon) * 60 + minute)
+
+    written_24_hour = time_match["minute"] and (twenty_four_hour or hour == 0 or time_match["hour"].startswith("0"))
+    if hour > 12 or written_24_hour:
+        # 24-hour clock (e.g. 19:00 or 07:30)
+        return _exact(hour * 60 + minute)
+
+    # Could be in the morning or in the evening (e.g. 7 o'clock or 7:30)
+    return (*_exact(hour % 12 * 60 + minute), *_exact((hour % 12 + 12) * 60 + minute))
+
+
+def _interval_distance(first: tuple[int, int], second: tuple[int, int]) -> int:
+    if first[0] <= second[1] and second[0] <= first[1]:
+        # The intervals overlap
+        return 0
+    return min(
+        min(abs(first_end - second_end), MINUTES_PER_DAY - abs(first_end - second_end))
+        for first_end in first
+        for second_end in second
+    )
+
+
+def delivery_time_distance(first: DeliveryTime, second: DeliveryTime) -> int:
+    """
+    Get the distance between two delivery times in minutes, using the closest of their candidates.
+
+    Args:
+        first (DeliveryTime): The first delivery time.
+        second (DeliveryTime): The second delivery time.
+
+    Returns:
+        int: The distance in minutes (around midnight, 23:50 and 0:10 are 20 minutes apart).
+    """
+    return min(
+        _interval_distance(first_interval, second_interval) for first_interval in first for second_interval in second
+    )
+
+
+def score_delivery_time(expected: str, given: str) -> float | None:
+    """
+    Measure of the delivery times' similarity as a float, based on how many minutes they are apart.
+
+    Args:
+        expected (str): The correct delivery time.
+        given (str): The delivery time entered by the user.
+
+    Returns:
+        float | None: The similarity of the two delivery times [0, 1], or None if one of them couldn't be parsed.
+    """
+    if not expected.strip() or not given.strip():
+        # Either both or just one of them is missing
+        return float(expected.strip() == given.strip())
+
+    # The generated times without AM/PM are on the 24-hour clock, the user's could also be on the 12-hour clock
+    expected_time = parse_delivery_time(expected, twenty_four_hour=True)
+    given_time = parse_delivery_time(given)
+    if expected_time is None or given_time is None:
+        return None
+
+    distance = delivery_time_distance(expected_time, given_time)
+    return max(0.0, 1 - distance / DELIVERY_TIME_TOLERANCE_MINUTES)
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import ParamSpec, TypeVar
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS") or 2)
+SCORING_QUEUE_SIZE = int(os.getenv("SCORING_QUEUE_SIZE") or 64)
+# Discord invalidates an interaction that isn't answered within 3 seconds, so a scoring job has to finish before that.
+SCORING_TIMEOUT = float(os.getenv("SCORING_TIMEOUT") or 2.0)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class ScoringQueueFullError(Exception):
+    """Raised when the scoring executor already has the maximum amount of jobs queued."""
+
+
+@dataclass
+class ScoringMetrics:
+    """Counters and latencies of the scoring executor."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    # Seconds between submitting a job and it being finished (including the time spent waiting in the queue)
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    @property
+    def average_latency(self) -> float:
+        """float: The average latency of the recent jobs in seconds."""
+        return statistics.fmean(self.latencies) if self.latencies else 0.0
+
+    def latency_percentile(self, percentile: int) -> float:
+        """
+        Get a percentile of the recent job latencies.
+
+        Args:
+            percentile (int): The percentile [1, 99].
+
+        Returns:
+            float: The latency in seconds.
+        """
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[percentile - 1]
+
+
+class ScoringExecutor:
+    """Runs the CPU heavy order scoring outside of the event loop, on a bounded pool of worker threads."""
+
+    def __init__(
+        self,
+        max_workers: int = SCORING_WORKERS,
+        max_queue_size: int = SCORING_QUEUE_SIZE,
+        timeout: float = SCORING_TIMEOUT,
+    ) -> None:
+        """
+        Initialize the scoring executor.
+
+        Args:
+            max_workers (int, optional): The amount of worker threads. Defaults to SCORING_WORKERS.
+            max_queue_size (int, optional): The maximum amount of queued and running jobs.
+                Defaults to SCORING_QUEUE_SIZE.
+            timeout (float, optional): The default timeout of a job in seconds. Defaults to SCORING_TIMEOUT.
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.timeout = timeout
+        self.metrics = ScoringMetrics()
+        # The metrics are updated from the worker threads as well
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """ThreadPoolExecutor: The underlying thread pool, created on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scoring")
+        return self._executor
+
+    async def run(
+        self,
+        function: Callable[P, R],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> R:
+        """
+        Run a scoring function in the worker pool and wait for its result.
+
+        Args:
+            function (Callable[P, R]): The function to run.
+            *args (P.args): The positional arguments of the function.
+            **kwargs (P.kwargs): The keyword arguments of the function.
+
+        Raises:
+            ScoringQueueFullError: Raised when the queue is full.
+            TimeoutError: Raised when the job didn't finish within the timeout.
+
+        Returns:
+            R: The result of the function.
+        """
+        with self._lock:
+            if self.metrics.queue_depth >= self.max_queue_size:
+                self.metrics.rejected += 1
+                raise ScoringQueueFullError(f"The scoring queue is full ({self.max_queue_size} jobs)")
+            self.metrics.submitted += 1
+            self.metrics.queue_depth += 1
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.metrics.queue_depth)
+
+        submitted_at = time.perf_counter()
+        future = self.executor.submit(function, *args, **kwargs)
+
+        def _job_done(done_future: Future[R]) -> None:
+            # Only called once the job really left the pool, so the queue depth stays accurate after timeouts
+            with self._lock:
+                self.metrics.queue_depth -= 1
+                if done_future.cancelled():
+                    return
+                if done_future.exception():
+                    self.metrics.failed += 1
+                else:
+                    self.metrics.completed += 1
+                    self.metrics.latencies.append(time.perf_counter() - submitted_at)
+
+        future.add_done_callback(_job_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.metrics.timed_out += 1
+            raise
+
+    def shutdown(self) -> None:
+        """Shut the worker pool down, dropping the jobs that didn't start yet."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+scoring_executor = ScoringExecutor()
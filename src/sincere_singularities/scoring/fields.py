@@ -0,0 +1,223 @@
+import asyncio
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+from sincere_singularities.modules.order import CustomerInformation, Order
+from sincere_singularities.scoring.backends import Embeddings
+from sincere_singularities.scoring.batching import SentenceBatcher, sentence_batcher
+from sincere_singularities.scoring.cache import trivial_similarity
+from sincere_singularities.scoring.delivery_time import score_delivery_time
+from sincere_singularities.scoring.model import minilm_model
+from sincere_singularities.scoring.string_similarity import similarity_engine
+from sincere_singularities.scoring.wish_index import ExtraWishIndex, get_extra_wish_index
+from sincere_singularities.utils import encode_sentences
+
+
+@dataclass(frozen=True, slots=True)
+class FieldScores:
+    """The scores of the customer information fields of an order [0, 1]."""
+
+    name: float
+    address: float
+    delivery_time: float
+    extra_wish: float
+
+
+def _customer_information(order: Order) -> CustomerInformation:
+    if not order.customer_information:
+        raise ValueError("missing customer_information")
+    return order.customer_information
+
+
+class _FieldScoring:
+    """The scoring of a single order, split into the cheap checks and the sentences that need to be encoded."""
+
+    def __init__(
+        self,
+        submitted: CustomerInformation,
+        expected: CustomerInformation,
+        extra_wish_index: ExtraWishIndex | None,
+        *,
+        name: float,
+        address: float,
+    ) -> None:
+        self.submitted = submitted
+        self.expected = expected
+        self.extra_wish_index = extra_wish_index
+        self.name = name
+        self.address = address
+
+        # Delivery times are compared numerically, unless they can't be parsed
+        self.delivery_time = score_delivery_time(self.expected.delivery_time, self.submitted.delivery_time)
+        self.extra_wish = trivial_similarity(self.expected.extra_wish, self.submitted.extra_wish)
+        # Canonical extra wishes are already encoded in the index, only the user's input has to be encoded
+        self.extra_wish_indexed = extra_wish_index is not None and self.expected.extra_wish in extra_wish_index
+
+    @property
+    def sentences(self) -> list[str]:
+        """list[str]: The sentences that need to be encoded to finish the scoring."""
+        sentences: list[str] = []
+        if self.delivery_time is None:
+            sentences.extend((self.expected.delivery_time, self.submitted.delivery_time))
+        if self.extra_wish is None:
+            if not self.extra_wish_indexed:
+                sentences.append(self.expected.extra_wish)
+            sentences.append(self.submitted.extra_wish)
+        return sentences
+
+    def finish(self, embeddings: Mapping[str, Embeddings]) -> FieldScores:
+        """
+        Finish the scoring with the embeddings of the sentences.
+
+        Args:
+            embeddings (Mapping[str, Embeddings]): The embeddings by their sentences.
+
+        Returns:
+            FieldScores: The scores of the fields.
+        """
+        delivery_time = self.delivery_time
+        if delivery_time is None:
+            delivery_time = float(
+                embeddings[self.expected.delivery_time] @ embeddings[self.submitted.delivery_time],
+            )
+
+        extra_wish = self.extra_wish
+        if extra_wish is None:
+            if self.extra_wish_indexed:
+                assert self.extra_wish_index
+                extra_wish = self.extra_wish_index.score(
+                    self.expected.extra_wish,
+                    embeddings[self.submitted.extra_wish],
+                )
+            else:
+                extra_wish = float(embeddings[self.expected.extra_wish] @ embeddings[self.submitted.extra_wish])
+
+        return FieldScores(name=self.name, address=self.address, delivery_time=delivery_time, extra_wish=extra_wish)
+
+    def finish_lexical(self) -> FieldScores:
+        """
+        Finish the scoring using pattern matching instead of the model.
+
+        Returns:
+            FieldScores: The scores of the fields.
+        """
+        pairs = [(self.expected.delivery_time, self.submitted.delivery_time)] if self.delivery_time is None else []
+        if self.extra_wish is None:
+            pairs.append((self.expected.extra_wish, self.submitted.extra_wish))
+        similarities = iter(similarity_engine.ratio_many(pairs))
+
+        delivery_time = next(similarities) if self.delivery_time is None else self.delivery_time
+        extra_wish = next(similarities) if self.extra_wish is None else self.extra_wish
+        return FieldScores(name=self.name, address=self.address, delivery_time=delivery_time, extra_wish=extra_wish)
+
+
+def _extra_wish_index() -> ExtraWishIndex | None:
+    backend = minilm_model.backend
+    return get_extra_wish_index(backend) if backend else None
+
+
+def _prepare_scorings(
+    orders: Sequence[tuple[Order, Order]],
+    extra_wish_index: ExtraWishIndex | None,
+) -> list[_FieldScoring]:
+    customer_informations = [
+        (_customer_information(submitted), _customer_information(expected)) for submitted, expected in orders
+    ]
+    # The names and addresses of every order are pattern matched in one batch
+    pattern_similarities = iter(
+        similarity_engine.ratio_many(
+            [
+                pair
+                for submitted, expected in customer_informations
+                for pair in ((expected.name, submitted.name), (expected.address, submitted.address))
+            ]
+        )
+    )
+    return [
+        _FieldScoring(
+            submitted,
+            expected,
+            extra_wish_index,
+            name=next(pattern_similarities),
+            address=next(pattern_similarities),
+        )
+        for submitted, expected in customer_informations
+    ]
+
+
+def score_order_fields(submitted: Order, expected: Order, *, semantic: bool = True) -> FieldScores:
+    """
+    Score the customer information fields of a submitted order against the expected order.
+
+    Names and addresses are pattern matched. Every sentence that needs a semantic comparison is encoded in a single
+    forward pass. This blocks, so in the bot `score_order_fields_async` should be used instead.
+
+    Args:
+        submitted (Order): The order submitted by the user.
+        expected (Order): The correct order.
+        semantic (bool, optional): Whether to use the model. If False (or if the model isn't loaded yet), the cheap
+            pattern matching is used instead. Defaults to True.
+
+    Returns:
+        FieldScores: The scores of the fields.
+    """
+    if not semantic:
+        return _prepare_scorings([(submitted, expected)], None)[0].finish_lexical()
+    return score_orders_bulk([(submitted, expected)])[0]
+
+
+def score_orders_bulk(orders: Sequence[tuple[Order, Order]]) -> list[FieldScores]:
+    """
+    Score the customer information fields of many (submitted, expected) order pairs, e.g. for offline analysis.
+
+    The names and addresses of every order are pattern matched in one batch, and every sentence of every order that
+    needs a semantic comparison is encoded in a single forward pass.
+
+    Args:
+        orders (Sequence[tuple[Order, Order]]): The submitted and expected orders.
+
+    Returns:
+        list[FieldScores]: The scores of the fields of each order pair.
+    """
+    extra_wish_index = _extra_wish_index()
+    scorings = _prepare_scorings(orders, extra_wish_index)
+    if not minilm_model.ready:
+        return [scoring.finish_lexical() for scoring in scorings]
+
+    sentences = list(dict.fromkeys(sentence for scoring in scorings for sentence in scoring.sentences))
+    embeddings = dict(zip(sentences, encode_sentences(sentences), strict=True)) if sentences else {}
+    return [scoring.finish(embeddings) for scoring in scorings]
+
+
+async def score_order_fields_async(
+    submitted: Order,
+    expected: Order,
+    batcher: SentenceBatcher = sentence_batcher,
+) -> FieldScores:
+    """
+    Score the customer information fields of a submitted order against the expected order, off the event loop.
+
+    Every sentence that needs a semantic comparison is handed to the batcher at once, so they're encoded in the same
+    forward pass (together with the other game sessions' sentences).
+
+    Args:
+        submitted (Order): The order submitted by the user.
+        expected (Order): The correct order.
+        batcher (SentenceBatcher, optional): The sentence batcher. Defaults to sentence_batcher.
+
+    Raises:
+        ScoringQueueFullError: Raised when the scoring executor is full.
+        TimeoutError: Raised when the batch didn't finish within the executor's timeout.
+
+    Returns:
+        FieldScores: The scores of the fields.
+    """
+    scoring = _prepare_scorings([(submitted, expected)], _extra_wish_index())[0]
+    sentences = list(dict.fromkeys(scoring.sentences))
+    if not sentences:
+        return scoring.finish({})
+    if not minilm_model.ready:
+        return scoring.finish_lexical()
+
+    embeddings = await asyncio.gather(*(batcher.encode(sentence) for sentence in sentences))
+    return scoring.finish(dict(zip(sentences, embeddings, strict=True)))
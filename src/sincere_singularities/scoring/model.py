@@ -0,0 +1,138 @@
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sincere_singularities.scoring.backends import EMBEDDING_BACKEND, EmbeddingBackend, create_backend
+from sincere_singularities.scoring.model_store import MODEL_DIR, MODEL_OFFLINE, ModelStoreError, resolve_model_path
+from sincere_singularities.scoring.wish_index import get_extra_wish_index
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+class ModelNotReadyError(Exception):
+    """Raised when the model is needed, but it isn't loaded yet."""
+
+
+class ModelProvider:
+    """
+    Provides the MiniLM SentenceTransformer model, which is loaded lazily in a background thread.
+
+    Loading torch and the model takes seconds, so nothing should wait for it at import time. Until the model is
+    ready, `model` is None and callers are expected to fall back to a cheaper comparison.
+    """
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        model_dir: Path = MODEL_DIR,
+        backend_name: str = EMBEDDING_BACKEND,
+        *,
+        offline: bool = MODEL_OFFLINE,
+    ) -> None:
+        """
+        Initialize the model provider. This doesn't load the model yet.
+
+        Args:
+            model_name (str, optional): The name of the SentenceTransformer model. Defaults to MODEL_NAME.
+            model_dir (Path, optional): The directory of the local model store. Defaults to MODEL_DIR.
+            backend_name (str, optional): The embedding backend to serve the model with.
+                Defaults to EMBEDDING_BACKEND.
+            offline (bool, optional): Whether the model must be loaded from the local model store.
+                Defaults to MODEL_OFFLINE.
+        """
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.backend_name = backend_name
+        self.offline = offline
+        self.device: str | None = None
+        self.error: Exception | None = None
+        self._model: SentenceTransformer | None = None
+        self._backend: EmbeddingBackend | None = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        """bool: Whether the model is loaded and serving."""
+        return self._ready.is_set()
+
+    @property
+    def model(self) -> "SentenceTransformer | None":
+        """SentenceTransformer | None: The loaded model, or None if it isn't ready yet."""
+        return self._model if self.ready else None
+
+    @property
+    def backend(self) -> EmbeddingBackend | None:
+        """EmbeddingBackend | None: The backend serving the model, or None if it isn't ready yet."""
+        return self._backend if self.ready else None
+
+    def start_loading(self) -> None:
+        """Start loading the model in a background thread. Does nothing if it's already loading or loaded."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        """
+        Start loading the model (if it isn't already) and block until it's ready.
+
+        Args:
+            timeout (float | None, optional): The maximum amount of seconds to wait. Defaults to None (no timeout).
+
+        Returns:
+            bool: Whether the model is ready.
+        """
+        self.start_loading()
+        return self._ready.wait(timeout)
+
+    def _resolve_model(self) -> str:
+        # Prefer the local model store, so starting up doesn't depend on the Hugging Face Hub
+        model_path = resolve_model_path(self.model_name, self.model_dir)
+        if model_path:
+            return str(model_path)
+        if self.offline:
+            raise ModelStoreError(
+                f"The {self.model_name} model isn't in {self.model_dir}, run `sincere_singularities prepare-model`"
+            )
+        return self.model_name
+
+    def _load(self) -> None:
+        if self.offline:
+            # Making sure the libraries don't try to reach the Hugging Face Hub
+            os.environ["HF_HUB_OFFLINE"] = "1"
+            os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+        try:
+            model_name_or_path = self._resolve_model()
+            # Imported here, because importing torch alone takes seconds
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            # Use GPU if available
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model = SentenceTransformer(model_name_or_path, device=device)
+            backend = create_backend(self.backend_name, model)
+            # Warm up, so the first scored order doesn't pay for the lazy initialization of torch
+            backend.encode(["Warming up"])
+            # Precomputing the embeddings of the canonical extra wishes
+            get_extra_wish_index(backend)
+        except Exception as err:  # noqa: BLE001
+            self.error = err
+            print(f"Error: Couldn't load the {self.model_name} model: {err}")
+            return
+
+        self.device = device
+        self._model = model
+        self._backend = backend
+        self._ready.set()
+
+
+# The MiniLM SentenceTransformer Model
+minilm_model = ModelProvider()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODEL_DIR = Path(os.getenv("MODEL_DIR") or Path.home() / ".cache" / "sincere_singularities" / "models")
+MODEL_OFFLINE = (os.getenv("MODEL_OFFLINE") or "").lower() in ("1", "true", "yes")
+MANIFEST_FILENAME = "manifest.json"
+# Contains the version of the model which should be loaded
+CURRENT_FILENAME = "CURRENT"
+
+
+class ModelStoreError(Exception):
+    """Raised when the local model store is missing a model or is corrupted."""
+
+
+def compute_checksums(model_path: Path) -> dict[str, str]:
+    """
+    Compute the SHA-256 checksum of every file of a model.
+
+    Args:
+        model_path (Path): The directory of the model.
+
+    Returns:
+        dict[str, str]: The checksums by the files' paths relative to the model directory.
+    """
+    checksums = {}
+    for file in sorted(model_path.rglob("*")):
+        if not file.is_file() or file.name == MANIFEST_FILENAME:
+            continue
+        digest = hashlib.sha256()
+        with file.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        checksums[file.relative_to(model_path).as_posix()] = digest.hexdigest()
+    return checksums
+
+
+def combined_checksum(checksums: dict[str, str]) -> str:
+    """
+    Combine the checksums of a model's files into the checksum of the whole model.
+
+    Args:
+        checksums (dict[str, str]): The checksums by the files' relative paths.
+
+    Returns:
+        str: The SHA-256 checksum of the model.
+    """
+    digest = hashlib.sha256()
+    for relative_path, checksum in sorted(checksums.items()):
+        digest.update(f"{relative_path}\0{checksum}\n".encode())
+    return digest.hexdigest()
+
+
+def verify_model(model_path: Path) -> str:
+    """
+    Verify the files of a stored model against its manifest.
+
+    Args:
+        model_path (Path): The directory of the stored model version.
+
+    Raises:
+        ModelStoreError: Raised when the manifest is missing or the files don't match it.
+
+    Returns:
+        str: The checksum of the model.
+    """
+    manifest_path = model_path / MANIFEST_FILENAME
+    if not manifest_path.is_file():
+        raise ModelStoreError(f"The model at {model_path} has no manifest")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    checksums = compute_checksums(model_path)
+    if checksums != manifest["files"] or combined_checksum(checksums) != manifest["sha256"]:
+        raise ModelStoreError(f"The model at {model_path} doesn't match its manifest, run `prepare-model` again")
+    return str(manifest["sha256"])
+
+
+def resolve_model_path(model_name: str, model_dir: Path = MODEL_DIR, *, verify: bool = True) -> Path | None:
+    """
+    Get the directory of the current version of a model in the local store.
+
+    Args:
+        model_name (str): The name of the model.
+        model_dir (Path, optional): The directory of the model store. Defaults to MODEL_DIR.
+        verify (bool, optional): Whether to verify the model's checksum. Defaults to True.
+
+    Returns:
+        Path | None: The directory of the model, or None if the model isn't stored.
+    """
+    current_path = model_dir / model_name / CURRENT_FILENAME
+    if not current_path.is_file():
+        return None
+    model_path = model_dir / model_name / current_path.read_text(encoding="utf-8").strip()
+    if verify:
+        verify_model(model_path)
+    return model_path
+
+
+def prepare_model(
+    model_name: str,
+    model_dir: Path = MODEL_DIR,
+    source: Path | None = None,
+    expected_sha256: str | None = None,
+) -> Path:
+    """
+    Put a model into the local store, so it can be loaded without network access.
+
+    The model is either downloaded from the Hugging Face Hub or copied from a local directory. It's stored in a
+    directory named after (the beginning of) its checksum, which then becomes the current version of the model.
+
+    Args:
+        model_name (str): The name of the model.
+        model_dir (Path, optional): The directory of the model store. Defaults to MODEL_DIR.
+        source (Path | None, optional): A local directory to copy the model from. Defaults to None (download it).
+        expected_sha256 (str | None, optional): The checksum the model must have. Defaults to None (don't check).
+
+    Raises:
+        ModelStoreError: Raised when the model doesn't have the expected checksum.
+
+    Returns:
+        Path: The directory of the stored model.
+    """
+    store_path = model_dir / model_name
+    store_path.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=store_path) as temporary_directory:
+        staging_path = Path(temporary_directory) / "model"
+        if source:
+            shutil.copytree(source, staging_path, ignore=shutil.ignore_patterns(MANIFEST_FILENAME))
+        else:
+            # Imported here, because importing torch alone takes seconds
+            from sentence_transformers import SentenceTransformer
+
+            SentenceTransformer(model_name, device="cpu").save(str(staging_path))
+
+        checksums = compute_checksums(staging_path)
+        checksum = combined_checksum(checksums)
+        if expected_sha256 and checksum != expected_sha256.lower():
+            raise ModelStoreError(f"The model {model_name} has the checksum {checksum}, expected {expected_sha256}")
+
+        manifest = {"model_name": model_name, "sha256": checksum, "files": checksums}
+        (staging_path / MANIFEST_FILENAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        version = checksum[:12]
+        model_path = store_path / version
+        if model_path.exists():
+            shutil.rmtree(model_path)
+        staging_path.rename(model_path)
+
+    (store_path / CURRENT_FILENAME).write_text(version, encoding="utf-8")
+    return model_path
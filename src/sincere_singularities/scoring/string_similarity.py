@@ -0,0 +1,158 @@
+import difflib
+import os
+from collections.abc import Callable, Sequence
+from typing import Protocol, cast
+
+import numpy as np
+from dotenv import load_dotenv
+from rapidfuzz import fuzz, process
+
+load_dotenv()
+
+STRING_SIMILARITY_ENGINE = os.getenv("STRING_SIMILARITY_ENGINE") or "rapidfuzz"
+
+
+class SimilarityEngine(Protocol):
+    """A way of measuring the lexical similarity of strings."""
+
+    name: str
+
+    def ratio(self, first: str, second: str) -> float:
+        """
+        Measure of the strings' similarity as a float.
+
+        Args:
+            first (str): The first string.
+            second (str): The second string.
+
+        Returns:
+            float: The similarity of the two strings [0, 1]
+        """
+        ...
+
+    def ratio_many(self, pairs: Sequence[tuple[str, str]]) -> list[float]:
+        """
+        Measure of the similarity of multiple string pairs.
+
+        Args:
+            pairs (Sequence[tuple[str, str]]): The string pairs to compare.
+
+        Returns:
+            list[float]: The similarity of each pair [0, 1]
+        """
+        ...
+
+
+class DifflibEngine:
+    """
+    Gestalt Pattern Matching with difflib's SequenceMatcher.
+
+    It's pure Python (and quadratic in the worst case), but it's kept as the reference the other engines are checked
+    against.
+    """
+
+    name = "difflib"
+
+    def ratio(self, first: str, second: str) -> float:
+        """
+        Measure of the strings' similarity as a float.
+
+        Args:
+            first (str): The first string.
+            second (str): The second string.
+
+        Returns:
+            float: The similarity of the two strings [0, 1]
+        """
+        return difflib.SequenceMatcher(None, first, second).ratio()
+
+    def ratio_many(self, pairs: Sequence[tuple[str, str]]) -> list[float]:
+        """
+        Measure of the similarity of multiple string pairs.
+
+        Args:
+            pairs (Sequence[tuple[str, str]]): The string pairs to compare.
+
+        Returns:
+            list[float]: The similarity of each pair [0, 1]
+        """
+        return [self.ratio(first, second) for first, second in pairs]
+
+
+class RapidFuzzEngine:
+    """
+    The normalized Indel similarity of RapidFuzz, which is implemented in C++.
+
+    It's 2 * (longest common subsequence) / (total length), the same formula as difflib's ratio. difflib matches
+    blocks greedily, which doesn't always find the longest common subsequence, so this scores the same or higher.
+    """
+
+    name = "rapidfuzz"
+    scorer: Callable[..., float] = staticmethod(fuzz.ratio)
+
+    def ratio(self, first: str, second: str) -> float:
+        """
+        Measure of the strings' similarity as a float.
+
+        Args:
+            first (str): The first string.
+            second (str): The second string.
+
+        Returns:
+            float: The similarity of the two strings [0, 1]
+        """
+        # RapidFuzz scores are percentages
+        return self.scorer(first, second) / 100
+
+    def ratio_many(self, pairs: Sequence[tuple[str, str]]) -> list[float]:
+        """
+        Measure of the similarity of multiple string pairs, in a single call into RapidFuzz.
+
+        Args:
+            pairs (Sequence[tuple[str, str]]): The string pairs to compare.
+
+        Returns:
+            list[float]: The similarity of each pair [0, 1]
+        """
+        if not pairs:
+            return []
+        firsts, seconds = zip(*pairs, strict=True)
+        similarities = process.cpdist(firsts, seconds, scorer=self.scorer, dtype=np.float64) / 100
+        return cast(list[float], similarities.tolist())
+
+
+class RapidFuzzTokenEngine(RapidFuzzEngine):
+    """RapidFuzz's Indel similarity of the sorted words, so the order of the words doesn't matter (e.g. in names)."""
+
+    name = "rapidfuzz-token"
+    scorer = staticmethod(fuzz.token_sort_ratio)
+
+
+SIMILARITY_ENGINES: dict[str, Callable[[], SimilarityEngine]] = {
+    DifflibEngine.name: DifflibEngine,
+    RapidFuzzEngine.name: RapidFuzzEngine,
+    RapidFuzzTokenEngine.name: RapidFuzzTokenEngine,
+}
+
+
+def create_similarity_engine(name: str) -> SimilarityEngine:
+    """
+    Create a string similarity engine by its name.
+
+    Args:
+        name (str): The name of the engine (see SIMILARITY_ENGINES).
+
+    Raises:
+        ValueError: Raised when there's no engine with that name.
+
+    Returns:
+        SimilarityEngine: The engine.
+    """
+    try:
+        engine_type = SIMILARITY_ENGINES[name]
+    except KeyError:
+        raise ValueError(f"String similarity engine named {name!r} doesn't exist") from None
+    return engine_type()
+
+
+similarity_engine = create_similarity_engine(STRING_SIMILARITY_ENGINE)
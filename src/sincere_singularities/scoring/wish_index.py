@@ -0,0 +1,96 @@
+import functools
+from collections.abc import Sequence
+
+import numpy as np
+
+from sincere_singularities.data.extra_wishes import EXTRA_WISHES_WITH_ADDITIONS
+from sincere_singularities.scoring.backends import EmbeddingBackend, Embeddings
+
+
+class ExtraWishIndex:
+    """
+    The precomputed embeddings of every canonical extra wish.
+
+    Expected extra wishes always come from `EXTRA_WISHES_WITH_ADDITIONS`, so they're encoded once into a matrix, and
+    a user's input only needs to be encoded itself to be scored against them.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, wishes: Sequence[str] = tuple(EXTRA_WISHES_WITH_ADDITIONS)) -> None:
+        """
+        Initialize the index by encoding every wish.
+
+        Args:
+            backend (EmbeddingBackend): The backend to encode the wishes with.
+            wishes (Sequence[str], optional): The canonical wishes. Defaults to the keys of
+                EXTRA_WISHES_WITH_ADDITIONS.
+        """
+        self.wishes = list(wishes)
+        self.wish_indexes = {wish: index for index, wish in enumerate(self.wishes)}
+        # One normalized embedding (row) per wish
+        self.embeddings = backend.encode(self.wishes)
+
+    def __contains__(self, wish: object) -> bool:
+        return wish in self.wish_indexes
+
+    def __len__(self) -> int:
+        return len(self.wishes)
+
+    def score(self, wish: str, embedding: Embeddings) -> float:
+        """
+        Measure the similarity of a canonical wish and an encoded sentence.
+
+        Args:
+            wish (str): The canonical wish.
+            embedding (Embeddings): The normalized embedding of the sentence.
+
+        Raises:
+            KeyError: Raised when the wish isn't in the index.
+
+        Returns:
+            float: The cosine similarity [0, 1]
+        """
+        return float(self.embeddings[self.wish_indexes[wish]] @ embedding)
+
+    def similarities(self, embedding: Embeddings) -> Embeddings:
+        """
+        Measure the similarity of every canonical wish and an encoded sentence.
+
+        Args:
+            embedding (Embeddings): The normalized embedding of the sentence.
+
+        Returns:
+            Embeddings: The cosine similarity to each wish, in the order of `wishes`.
+        """
+        similarities: Embeddings = self.embeddings @ embedding
+        return similarities
+
+    def nearest(self, embedding: Embeddings, k: int = 3) -> list[tuple[str, float]]:
+        """
+        Get the canonical wishes closest to an encoded sentence.
+
+        Args:
+            embedding (Embeddings): The normalized embedding of the sentence.
+            k (int, optional): The amount of wishes to return. Defaults to 3.
+
+        Returns:
+            list[tuple[str, float]]: The closest wishes and their similarity, the closest first.
+        """
+        similarities = self.similarities(embedding)
+        k = min(k, len(self.wishes))
+        closest_indexes = np.argpartition(-similarities, k - 1)[:k]
+        closest_indexes = closest_indexes[np.argsort(-similarities[closest_indexes])]
+        return [(self.wishes[index], float(similarities[index])) for index in closest_indexes]
+
+
+@functools.cache
+def get_extra_wish_index(backend: EmbeddingBackend) -> ExtraWishIndex:
+    """
+    Get the extra wish index of a backend. It's only built the first time.
+
+    Args:
+        backend (EmbeddingBackend): The backend.
+
+    Returns:
+        ExtraWishIndex: The extra wish index.
+    """
+    return ExtraWishIndex(backend)
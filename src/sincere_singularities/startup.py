@@ -0,0 +1,166 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# How long importing the bot may take, in milliseconds
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS") or 1500)
+# How long importing the bot and starting its services may take, in milliseconds
+STARTUP_READY_BUDGET_MS = float(os.getenv("STARTUP_READY_BUDGET_MS") or 2500)
+
+# Written to stderr once the bot is imported, the import times after it are of the services' background threads
+IMPORTED_MARKER = "# imported"
+# Run in a fresh interpreter, so every module is imported again. The services are started like in `main`, but the
+# process exits without closing them, so nothing is written to the database
+_STARTUP_SCRIPT = f"""
+IMPORTED_MARKER = {IMPORTED_MARKER!r}
+import json, os, sys, time
+started = time.perf_counter()
+import sincere_singularities.bot
+from sincere_singularities.app import app
+imported = time.perf_counter()
+print(IMPORTED_MARKER, file=sys.stderr, flush=True)
+app.start()
+ready = time.perf_counter()
+print(json.dumps({{"import": imported - started, "ready": ready - started}}), flush=True)
+sys.stderr.flush()
+os._exit(0)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class StartupReport:
+    """How long the bot takes to start, the median of the runs."""
+
+    # Seconds to import the bot
+    import_time: float
+    # Seconds to import the bot and start its services
+    ready_time: float
+    # Seconds spent importing each top-level package (e.g. "disnake") while importing the bot, by `-X importtime`
+    package_import_times: dict[str, float]
+    # The `-X importtime` output of the last run
+    importtime_log: str
+
+
+def parse_importtime(log: str) -> dict[str, float]:
+    """
+    Sum the import times of `-X importtime` by top-level package.
+
+    Args:
+        log (str): The `-X importtime` output.
+
+    Returns:
+        dict[str, float]: The seconds spent importing the modules of each package (excluding the modules they import
+            from other packages), the slowest first.
+    """
+    package_times: defaultdict[str, float] = defaultdict(float)
+    for line in log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, _, module = line.removeprefix("import time:").split("|")
+        # The header line
+        if not self_time.strip().isdigit():
+            continue
+        package_times[module.strip().split(".")[0]] += int(self_time) / 1_000_000
+    return dict(sorted(package_times.items(), key=lambda item: item[1], reverse=True))
+
+
+def measure_startup(repeats: int = 3) -> StartupReport:
+    """
+    Start the bot's services in fresh interpreters, recording the import times.
+
+    Args:
+        repeats (int, optional): The amount of runs. Defaults to 3.
+
+    Raises:
+        RuntimeError: Raised when starting fails.
+
+    Returns:
+        StartupReport: The report.
+    """
+    import_times: list[float] = []
+    ready_times: list[float] = []
+    log = ""
+    for _ in range(repeats):
+        process = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if process.returncode:
+            raise RuntimeError(f"Starting failed:\n{process.stderr[-2000:]}")
+        times = json.loads(process.stdout.strip().splitlines()[-1])
+        import_times.append(times["import"])
+        ready_times.append(times["ready"])
+        log = process.stderr
+
+    return StartupReport(
+        import_time=statistics.median(import_times),
+        ready_time=statistics.median(ready_times),
+        package_import_times=parse_importtime(log.partition(IMPORTED_MARKER)[0]),
+        importtime_log=log,
+    )
+
+
+def over_budget(report: StartupReport, import_budget_ms: float, ready_budget_ms: float) -> list[str]:
+    """
+    Check a report against the budgets.
+
+    Args:
+        report (StartupReport): The report.
+        import_budget_ms (float): How long importing may take, in milliseconds.
+        ready_budget_ms (float): How long importing and starting may take, in milliseconds.
+
+    Returns:
+        list[str]: A description of every exceeded budget.
+    """
+    exceeded = []
+    if report.import_time * 1000 > import_budget_ms:
+        exceeded.append(f"importing took {report.import_time * 1000:.0f} ms (budget: {import_budget_ms:.0f} ms)")
+    if report.ready_time * 1000 > ready_budget_ms:
+        exceeded.append(f"getting ready took {report.ready_time * 1000:.0f} ms (budget: {ready_budget_ms:.0f} ms)")
+    return exceeded
+
+
+def format_startup_report(report: StartupReport, packages: int = 10) -> str:
+    """
+    Format a report as a table.
+
+    Args:
+        report (StartupReport): The report.
+        packages (int, optional): The amount of packages listed, the slowest first. Defaults to 10.
+
+    Returns:
+        str: The table.
+    """
+    lines = [
+        f"{'import':<26}{report.import_time * 1000:>10.1f} ms",
+        f"{'ready':<26}{report.ready_time * 1000:>10.1f} ms",
+        "",
+        f"{'package':<26}{'import time':>13}",
+    ]
+    lines.extend(
+        f"{package:<26}{seconds * 1000:>10.1f} ms"
+        for package, seconds in list(report.package_import_times.items())[:packages]
+    )
+    return "\n".join(lines)
+
+
+def write_importtime_log(report: StartupReport, path: Path) -> None:
+    """
+    Write the `-X importtime` output of a report, e.g. to inspect it with tuna.
+
+    Args:
+        report (StartupReport): The report.
+        path (Path): The file.
+    """
+    path.write_text(report.importtime_log, encoding="utf-8")
@@ -1,14 +1,19 @@
-import difflib
+import functools
 import json
 import random
+from collections.abc import Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TypeAlias, TypeVar, cast, get_args, get_origin
 
 import dacite
 import disnake
-import torch
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+
+from sincere_singularities.scoring.backends import Embeddings
+from sincere_singularities.scoring.cache import embedding_cache, trivial_similarity
+from sincere_singularities.scoring.model import ModelNotReadyError, minilm_model
+from sincere_singularities.scoring.string_similarity import similarity_engine
 
 CURRENT_DIR = Path(__file__).parent.resolve()
 DISNAKE_COLORS = {
@@ -20,11 +25,6 @@ DISNAKE_COLORS = {
     ":fortune_cookie:": disnake.Color.from_rgb(227, 189, 1133),
 }
 
-# Use GPU if available
-device = "cuda" if torch.cuda.is_available() else "cpu"
-# Load the MiniLM SentenceTransformer Model
-minilm_model = SentenceTransformer("all-MiniLM-L6-v2", device=device)
-
 
 @dataclass(unsafe_hash=True)
 class RestaurantJsonType:
@@ -72,12 +72,20 @@ def load_json(filename: str, json_type: type[T]) -> T:
         return typed_json
 
 
-RESTAURANT_JSON = load_json("restaurants.json", RestaurantsType)
+@functools.cache
+def load_restaurants() -> RestaurantsType:
+    """
+    Get the restaurants of `restaurants.json`, the file is only parsed the first time.
+
+    Returns:
+        RestaurantsType: The restaurants.
+    """
+    return load_json("restaurants.json", RestaurantsType)
 
 
 def check_pattern_similarity(first: str, second: str) -> float:
     """
-    Measure of the strings' similarity as a float using Gestalt Pattern Matching Algorithm.
+    Measure of the strings' similarity as a float using the configured string similarity engine.
 
     Args:
         first (str): The first string.
@@ -86,7 +94,7 @@ def check_pattern_similarity(first: str, second: str) -> float:
     Returns:
         float: The similarity of the two strings [0, 1]
     """
-    return difflib.SequenceMatcher(None, first, second).ratio()
+    return similarity_engine.ratio(first, second)
 
 
 def compare_sentences(first: str, second: str) -> float:
@@ -100,11 +108,81 @@ def compare_sentences(first: str, second: str) -> float:
     Returns:
         float: The similarity of the two strings [0, 1]
     """
-    # Encode sentences in batch to speed up the process
-    embeddings = minilm_model.encode([first, second], convert_to_tensor=True, device=device)
-    # Check Similarity using Cosine Similarity
-    similarity = util.pytorch_cos_sim(embeddings[0], embeddings[1])
-    return similarity.item()  # type: ignore[no-any-return]
+    return compare_sentence_pairs([(first, second)])[0]
+
+
+def compare_sentence_pairs(pairs: Sequence[tuple[str, str]]) -> list[float]:
+    """
+    Measure of the similarity of multiple string pairs using Sentence Transformer's MiniLM.
+
+    Equal strings and pairs with one empty string are scored without the model. Every other distinct string is
+    encoded only once, in a single forward pass. While the model is still loading, the strings are compared lexically
+    instead.
+
+    Args:
+        pairs (Sequence[tuple[str, str]]): The string pairs to compare.
+
+    Returns:
+        list[float]: The similarity of each pair [0, 1]
+    """
+    similarities = [trivial_similarity(first, second) for first, second in pairs]
+    remaining_pairs = [pair for pair, similarity in zip(pairs, similarities, strict=True) if similarity is None]
+    if not remaining_pairs:
+        return [similarity or 0.0 for similarity in similarities]
+
+    if not minilm_model.ready:
+        # The model isn't ready yet, fall back to the cheap lexical comparison
+        remaining_similarities = similarity_engine.ratio_many(remaining_pairs)
+    else:
+        sentences = list(dict.fromkeys(sentence for pair in remaining_pairs for sentence in pair))
+        sentence_indexes = {sentence: index for index, sentence in enumerate(sentences)}
+        # Encode sentences in batch to speed up the process
+        embeddings = encode_sentences(sentences)
+        # Check Similarity using Cosine Similarity (the dot product of the normalized embeddings)
+        remaining_similarities = [
+            float(embeddings[sentence_indexes[first]] @ embeddings[sentence_indexes[second]])
+            for first, second in remaining_pairs
+        ]
+
+    remaining_similarities.reverse()
+    return [remaining_similarities.pop() if similarity is None else similarity for similarity in similarities]
+
+
+def encode_sentences(sentences: Sequence[str], *, use_cache: bool = True) -> Embeddings:
+    """
+    Encode sentences into normalized embeddings using Sentence Transformer's MiniLM.
+
+    Embeddings are served from the embedding cache when possible, only the other sentences are run through the model.
+
+    Args:
+        sentences (Sequence[str]): The sentences to encode.
+        use_cache (bool, optional): Whether to look the sentences up in the embedding cache. Defaults to True. When
+            False (the caller already looked them up), every sentence is encoded, and the embeddings are still cached.
+
+    Raises:
+        ModelNotReadyError: Raised when the model isn't loaded yet.
+
+    Returns:
+        Embeddings: One normalized embedding (row) per sentence.
+    """
+    backend = minilm_model.backend
+    if backend is None:
+        raise ModelNotReadyError(f"The {minilm_model.model_name} model isn't loaded yet")
+
+    if not sentences:
+        return np.empty((0, 0), dtype=np.float32)
+
+    cached_embeddings = {
+        sentence: embedding_cache.get(sentence) if use_cache else None for sentence in dict.fromkeys(sentences)
+    }
+    embeddings = {sentence: embedding for sentence, embedding in cached_embeddings.items() if embedding is not None}
+    missing_sentences = [sentence for sentence, embedding in cached_embeddings.items() if embedding is None]
+    if missing_sentences:
+        for sentence, embedding in zip(missing_sentences, backend.encode(missing_sentences), strict=True):
+            embedding_cache.put(sentence, embedding)
+            embeddings[sentence] = embedding
+
+    return np.stack([embeddings[sentence] for sentence in sentences])
 
 
 def generate_random_avatar_url() -> str:
@@ -0,0 +1,61 @@
+import pytest
+
+from sincere_singularities.scoring.delivery_time import parse_delivery_time, score_delivery_time
+
+
+@pytest.mark.parametrize(
+    ("expected", "given"),
+    [
+        ("10:00", "22:00"),
+        ("10:30", "22:30"),
+        ("11:15", "23:15"),
+        ("11:59", "23:59"),
+        ("12:00", "00:00"),
+        ("12:59", "00:59"),
+    ],
+)
+def test_expected_times_are_24_hour(expected: str, given: str) -> None:
+    """The expected time is generated on the 24-hour clock, so it doesn't match the time 12 hours apart."""
+    assert score_delivery_time(expected, given) == 0.0
+
+
+@pytest.mark.parametrize(
+    ("expected", "given"),
+    [
+        ("22:30", "10:30"),
+        ("10:30", "10:30"),
+        ("23:15", "11:15"),
+        ("00:00", "12:00"),
+        ("12:00", "12:00"),
+    ],
+)
+def test_given_12_hour_times_are_ambiguous(expected: str, given: str) -> None:
+    """The user's time without AM/PM could be in the morning or in the evening."""
+    assert score_delivery_time(expected, given) == 1.0
+
+
+@pytest.mark.parametrize(
+    ("expected", "given", "score"),
+    [
+        ("10:30", "10:30 pm", 0.0),
+        ("22:30", "10:30 pm", 1.0),
+        ("12:30", "12:30 am", 0.0),
+        ("00:30", "12:30 am", 1.0),
+        ("10:30", "07:30", 0.0),
+        ("19:00", "7 in the evening", 1.0),
+        ("07 o'clock", "19:00", 1.0),
+        ("19:00", "19:30", 0.5),
+        ("23:50", "00:10", 2 / 3),
+    ],
+)
+def test_score_delivery_time(expected: str, given: str, score: float) -> None:
+    """Times are scored by how many minutes they are apart."""
+    assert score_delivery_time(expected, given) == pytest.approx(score)
+
+
+def test_parse_delivery_time() -> None:
+    """Only times with minutes are on the 24-hour clock when parsing generated times."""
+    assert parse_delivery_time("10:30") == ((630, 630), (1350, 1350))
+    assert parse_delivery_time("10:30", twenty_four_hour=True) == ((630, 630),)
+    assert parse_delivery_time("7 o'clock", twenty_four_hour=True) == ((420, 420), (1140, 1140))
+    assert parse_delivery_time("25:00") is None
@@ -0,0 +1,54 @@
+import pytest
+
+from sincere_singularities.scoring.string_similarity import (
+    DifflibEngine,
+    RapidFuzzEngine,
+    RapidFuzzTokenEngine,
+    create_similarity_engine,
+)
+
+# Representative pairs of expected and entered names, addresses and extra wishes
+ORDER_STRING_PAIRS = [
+    ("John Smith", "Jon Smith"),
+    ("John Smith", "john smith"),
+    ("Michael Johnson", "Samantha Lee"),
+    ("742 Evergreen Terrace", "742 Evergreen Terace"),
+    ("1600 Pennsylvania Avenue NW", "1600 Pensylvania Ave NW"),
+    ("Please ring the doorbell twice.", "ring the doorbell twice please"),
+    ("Extra napkins, please!", "extra napkin"),
+    ("No onions on the burger.", "No onion on burger"),
+    ("Margherita Pizza", "Pepperoni Pizza"),
+    ("Leave it at the front door.", ""),
+    ("", ""),
+]
+# How far the RapidFuzz engine may score from the difflib reference
+PARITY_TOLERANCE = 0.01
+
+
+@pytest.mark.parametrize(("first", "second"), ORDER_STRING_PAIRS)
+def test_rapidfuzz_matches_difflib(first: str, second: str) -> None:
+    """RapidFuzz computes difflib's ratio, on typical order strings they score the same."""
+    reference = DifflibEngine().ratio(first, second)
+    assert RapidFuzzEngine().ratio(first, second) == pytest.approx(reference, abs=PARITY_TOLERANCE)
+
+
+def test_rapidfuzz_scores_reordered_words_higher() -> None:
+    """Difflib matches blocks greedily, so it can miss the longest common subsequence that RapidFuzz finds."""
+    reference = DifflibEngine().ratio("Maria Garcia", "Garcia Maria")
+    assert RapidFuzzEngine().ratio("Maria Garcia", "Garcia Maria") > reference
+    assert RapidFuzzTokenEngine().ratio("Maria Garcia", "Garcia Maria") == 1.0
+
+
+@pytest.mark.parametrize("name", ["difflib", "rapidfuzz", "rapidfuzz-token"])
+def test_ratio_many_matches_ratio(name: str) -> None:
+    """Scoring a batch gives the same similarities as scoring every pair."""
+    engine = create_similarity_engine(name)
+    expected = [engine.ratio(first, second) for first, second in ORDER_STRING_PAIRS]
+    assert engine.ratio_many(ORDER_STRING_PAIRS) == pytest.approx(expected)
+    assert engine.ratio_many([]) == []
+
+
+def test_unknown_engine() -> None:
+    """Engines are looked up by their name."""
+    with pytest.raises(ValueError, match="doesn't exist"):
+        create_similarity_engine("levenshtein")